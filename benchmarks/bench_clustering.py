@@ -0,0 +1,127 @@
+"""Runtime / memory / quality benchmark of the clustering engines.
+
+Datasets, smallest to largest:
+    heroes        the 130-hero aggregated table (what the dashboard clusters)
+    tournaments   every hero x tournament row of the normalized CSV
+    tournaments-xN  the tournament rows resampled N times with small jitter
+
+For each engine and size: best-of-N fit time, peak traced memory
+(tracemalloc, numpy allocations included), silhouette (on a sample above
+SILHOUETTE_SAMPLE rows) and Davies-Bouldin index. Engines skip sizes above
+their MAX_ROWS (Ward and HDBSCAN are quadratic-ish).
+
+    python benchmarks/bench_clustering.py [--k 5] [--runs 3] [--scale 1 4] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from clustering import ENGINES, fit_clusters     # noqa: E402
+from hero_stats import HeroStats                 # noqa: E402
+
+SILHOUETTE_SAMPLE = 5000
+MAX_ROWS = {
+    "Agglomerative (Ward)": 20000,
+    "HDBSCAN": 40000,
+}
+FEATURES = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+
+
+def hero_matrix():
+    stats = HeroStats.from_aggregated(pd.read_csv(os.path.join(ROOT, "mlbb_heroes_aggregated.csv")))
+    return stats.feature_matrix(FEATURES)
+
+
+def tournament_matrix():
+    """Per hero x tournament row: picks, bans, win rate, ban rate"""
+    df = pd.read_csv(os.path.join(ROOT, "mlbb_dataset_normalized.csv"))
+    picks = df["pick_total"].to_numpy(dtype=np.float64)
+    bans = df["ban_count"].to_numpy(dtype=np.float64)
+    wins = df["pick_wins"].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(picks > 0, wins / picks * 100, 0.0)
+        ban_rate = np.where(picks + bans > 0, bans / (picks + bans) * 100, 0.0)
+    return np.column_stack([picks, bans, win_rate, ban_rate])
+
+
+def resampled(X, factor, seed=42):
+    """X repeated `factor` times with 1% Gaussian jitter (synthetic larger tables)"""
+    rng = np.random.default_rng(seed)
+    rows = X[rng.integers(0, len(X), size=len(X) * factor)]
+    return rows + rng.normal(0, 0.01, rows.shape) * X.std(axis=0)
+
+
+def bench(engine, X, k, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fit_clusters(engine, X, k)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    fit_clusters(engine, X, k)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    labels = result.labels
+    quality = {"silhouette": None, "davies_bouldin": None}
+    if 1 < len(np.unique(labels)) < len(X):
+        sample = min(len(X), SILHOUETTE_SAMPLE)
+        quality["silhouette"] = float(silhouette_score(X, labels, sample_size=sample, random_state=42))
+        quality["davies_bouldin"] = float(davies_bouldin_score(X, labels))
+    return {"fit_ms": best * 1000, "peak_mb": peak / 2 ** 20,
+            "clusters": int(result.n_clusters), **quality}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=int, nargs="*", default=[4, 8],
+                        help="resampling factors of the tournament rows")
+    parser.add_argument("--engines", nargs="*", default=list(ENGINES))
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tournaments = tournament_matrix()
+    datasets = {"heroes": hero_matrix(), "tournaments": tournaments}
+    for factor in args.scale:
+        datasets[f"tournaments-x{factor}"] = resampled(tournaments, factor)
+
+    results = []
+    header = f"{'dataset':<18}{'rows':>8}  {'engine':<22}{'fit ms':>10}{'peak MB':>9}{'k':>4}{'silh.':>8}{'DB':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, X in datasets.items():
+        X_scaled = StandardScaler().fit_transform(X)
+        for engine in args.engines:
+            if len(X) > MAX_ROWS.get(engine, float("inf")):
+                print(f"{name:<18}{len(X):>8}  {engine:<22}{'skipped (> MAX_ROWS)':>20}")
+                continue
+            row = {"dataset": name, "rows": len(X), "engine": engine, **bench(engine, X_scaled, args.k, args.runs)}
+            results.append(row)
+            silhouette = f"{row['silhouette']:.3f}" if row["silhouette"] is not None else "-"
+            db = f"{row['davies_bouldin']:.3f}" if row["davies_bouldin"] is not None else "-"
+            print(f"{name:<18}{len(X):>8}  {engine:<22}{row['fit_ms']:>10.1f}{row['peak_mb']:>9.1f}"
+                  f"{row['clusters']:>4}{silhouette:>8}{db:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Import-time profile of the entry points and the heavy libraries.
+
+Every measurement runs in a fresh interpreter with `python -X importtime`
+(best of --runs), so numbers are cold-start costs as a Streamlit worker
+spawn or container start would see them.
+
+    python benchmarks/bench_imports.py [--runs 5] [--json out.json]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points: their module-level imports are what every run pays up front
+ENTRY_POINTS = ["streamlit.py", "latests.py"]
+
+MODULES = [
+    "hero_analysis", "hero_store", "winrate_stats", "hero_stats", "dataset_comparison",
+    "numpy", "pandas", "matplotlib.pyplot", "seaborn",
+    "sklearn.preprocessing", "sklearn.cluster", "sklearn.metrics", "sklearn.decomposition",
+]
+
+
+def top_level_imports(path):
+    """Import statements executed unconditionally when the script starts"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_time_us(statement, runs):
+    """Best-of-`runs` cumulative import time (microseconds) of `statement`"""
+    best = None
+    for _ in range(runs):
+        # Repo modules go at the end of sys.path so streamlit.py does not
+        # shadow the streamlit package
+        code = f"import sys; sys.path.remove(''); sys.path.append({ROOT!r})\n{statement}"
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{statement!r} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+        # "import time: self [us] | cumulative | imported package"; top-level rows
+        # are not indented, and their cumulative times add up to the total
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if not name.startswith("  "):
+                total += int(cumulative)
+        best = total if best is None else min(best, total)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {"entry_points": {}, "modules": {}}
+
+    print(f"{'Entry point (module-level imports)':<45}{'ms':>10}")
+    for script in ENTRY_POINTS:
+        statements = top_level_imports(os.path.join(ROOT, script))
+        ms = import_time_us("\n".join(statements), args.runs) / 1000
+        results["entry_points"][script] = round(ms, 1)
+        print(f"{script:<45}{ms:>10.1f}")
+
+    print(f"\n{'Module':<45}{'ms':>10}")
+    for module in MODULES:
+        ms = import_time_us(f"import {module}", args.runs) / 1000
+        results["modules"][module] = round(ms, 1)
+        print(f"{module:<45}{ms:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
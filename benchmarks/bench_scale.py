@@ -0,0 +1,303 @@
+"""Scale benchmark of the analysis pipeline on synthetic data (synthetic_data.py).
+
+For each size (hero x tournament rows) the stages latests.py / the
+dashboard run, in order:
+
+    load        read the normalized CSV
+    aggregate   HeroStats.from_tournament_rows(...).to_frame() (dashboard / report path)
+    chunked     chunked_aggregate.aggregate() on the same file (one worker)
+    scale       derived features + StandardScaler
+    kmeans      clustering.fit_clusters('K-Means')
+    silhouette  KMeans + silhouette for K = 2..10 (the elbow panel)
+    pca         2-component PCA
+    chart:NAME  each report.py chart rendered to PNG (Agg)
+
+Stages after aggregation work on one row per hero. The hero pool stays the
+real one unless --rows-per-hero grows it with the data. Each stage records
+its best-of---runs wall time, then one traced run for peak traced memory
+(tracemalloc, numpy allocations included). The process peak RSS is recorded
+after each size; it only grows, so sizes run smallest first. Stages above
+their MAX_ROWS are recorded as skipped. Generated data is kept in --data-dir
+and reused.
+
+Results go to --out as JSON, with a markdown table next to it. With
+--baseline (an earlier --out file), each stage is compared with the same
+size, hero pool and stage in the baseline. Slower by more than --tolerance and
+MIN_REGRESSION_MS counts as a regression, and the exit status is 1.
+
+    python benchmarks/bench_scale.py [--sizes 1e3 1e4 1e5 1e6] [--runs 3] [--rows-per-hero 0]
+                                     [--out bench_scale.json] [--baseline old.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np                                # noqa: E402
+import pandas as pd                               # noqa: E402
+from sklearn.cluster import KMeans                # noqa: E402
+from sklearn.decomposition import PCA             # noqa: E402
+from sklearn.metrics import silhouette_score      # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic_data                            # noqa: E402
+from chunked_aggregate import aggregate          # noqa: E402
+from clustering import fit_clusters              # noqa: E402
+from hero_stats import HeroStats                 # noqa: E402
+from report import CHARTS, render_chart          # noqa: E402
+
+FEATURES = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+CHART_NAMES = [name for name in CHARTS if name != "elbow"]     # elbow = the silhouette stage
+DATA_DIR = os.path.join(tempfile.gettempdir(), "mlbb_synthetic")
+MIN_REGRESSION_MS = 50      # smaller slowdowns are noise
+# Hero rows above which a stage is skipped (quadratic silhouette, one label per hero)
+MAX_ROWS = {
+    "silhouette": 20000,
+    "chart:clusters": 20000,
+}
+
+
+# ---------------------------
+# Stages: fn(ctx) -> value stored under the stage's key for later stages
+# ---------------------------
+def stage_load(ctx):
+    return pd.read_csv(ctx["path"])
+
+
+def stage_aggregate(ctx):
+    return HeroStats.from_tournament_rows(ctx["load"]).to_frame()
+
+
+def stage_chunked(ctx):
+    return aggregate(ctx["path"], workers=1)[0]
+
+
+def stage_scale(ctx):
+    return StandardScaler().fit_transform(HeroStats.from_aggregated(ctx["aggregate"]).feature_matrix(FEATURES))
+
+
+def stage_kmeans(ctx):
+    return fit_clusters("K-Means", ctx["scale"], ctx["k"])
+
+
+def stage_silhouette(ctx):
+    X = ctx["scale"]
+    scores = []
+    for k in range(2, min(11, len(X))):
+        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(X)
+        scores.append(silhouette_score(X, kmeans.labels_))
+    return scores
+
+
+def stage_pca(ctx):
+    return PCA(n_components=2).fit_transform(ctx["scale"])
+
+
+def chart_stage(name):
+    def stage(ctx):
+        params = {"n_clusters": ctx["k"], "engine": "K-Means", "count_scale": 1.0}
+        return render_chart(name, ctx["aggregate"], params, os.path.join(ctx["chart_dir"], f"{name}.png"))
+    return stage
+
+
+STAGES = {
+    "load": stage_load,
+    "aggregate": stage_aggregate,
+    "chunked": stage_chunked,
+    "scale": stage_scale,
+    "kmeans": stage_kmeans,
+    "silhouette": stage_silhouette,
+    "pca": stage_pca,
+    **{f"chart:{name}": chart_stage(name) for name in CHART_NAMES},
+}
+# Stage -> the stage whose value it uses (run first when only some stages are asked for)
+REQUIRES = {"aggregate": "load", "scale": "aggregate", "kmeans": "scale", "silhouette": "scale",
+            "pca": "scale", **{f"chart:{name}": "aggregate" for name in CHART_NAMES}}
+
+
+def with_requirements(stages):
+    """`stages` plus what they need, in STAGES order"""
+    wanted = set()
+    for stage in stages:
+        while stage is not None and stage not in wanted:
+            wanted.add(stage)
+            stage = REQUIRES.get(stage)
+    return [stage for stage in STAGES if stage in wanted]
+
+
+def dataset(size, heroes, seed, data_dir, profile):
+    """Path of the synthetic CSV for one size (generated once, then reused)"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{size}_{heroes}_{seed}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        frame = synthetic_data.generate(size, heroes, seed, profile)
+        problems = synthetic_data.validate(frame)
+        if problems:
+            raise ValueError(f"Synthetic data violates invariants: {'; '.join(problems)}")
+        frame.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        print(f"  generated {len(frame)} rows in {time.perf_counter() - start:.1f}s -> {path}")
+    return path
+
+
+def bench_stage(fn, ctx, runs, memory):
+    best, value = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        value = fn(ctx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn(ctx)
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return value, best * 1000, peak
+
+
+def peak_rss_mb():
+    scale = 1 if sys.platform == "darwin" else 1024        # bytes on macOS, kB elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+def environment():
+    import matplotlib as mpl
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "sklearn": sklearn.__version__, "matplotlib": mpl.__version__, "platform": platform.platform(),
+            "cpus": os.cpu_count(), "commit": commit, "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+# ---------------------------
+# Baseline / report
+# ---------------------------
+def compare(results, baseline, tolerance):
+    """Adds baseline_ms / change to each result; returns the regressions"""
+    base = {(r["size"], r["heroes"], r["stage"]): r["ms"] for r in baseline["results"] if r.get("ms") is not None}
+    regressions = []
+    for r in results:
+        old = base.get((r["size"], r["heroes"], r["stage"]))     # same rows and hero pool only
+        if old is None or r["ms"] is None:
+            continue
+        r["baseline_ms"] = old
+        r["change"] = r["ms"] / old - 1 if old > 0 else None
+        if r["ms"] > old * (1 + tolerance) and r["ms"] - old > MIN_REGRESSION_MS:
+            r["regression"] = True
+            regressions.append(r)
+    return regressions
+
+
+def markdown(report):
+    sizes = report["sizes"]
+    lines = [f"# Scale benchmark ({report['environment']['date']}, commit {report['environment']['commit']})", "",
+             "| stage | " + " | ".join(f"{s['rows']:,} rows / {s['heroes']} heroes" for s in sizes) + " |",
+             "|---|" + "---:|" * len(sizes)]
+    cells = {(r["size"], r["stage"]): r for r in report["results"]}
+    for stage in dict.fromkeys(r["stage"] for r in report["results"]):
+        row = []
+        for s in sizes:
+            r = cells.get((s["size"], stage))
+            if r is None:
+                row.append("")
+            elif r["ms"] is None:
+                row.append(f"skipped ({r['skipped']})")
+            else:
+                text = f"{r['ms']:,.1f} ms"
+                if r["peak_mb"] is not None:
+                    text += f", {r['peak_mb']:,.1f} MB"
+                if r.get("change") is not None:
+                    text += f" ({r['change']:+.0%}{' ⚠' if r.get('regression') else ''})"
+                row.append(text)
+        lines.append(f"| {stage} | " + " | ".join(row) + " |")
+    lines.append("| peak RSS | " + " | ".join(f"{s['rss_mb']:,.0f} MB" for s in sizes) + " |")
+    if report.get("baseline"):
+        lines += ["", f"Changes vs {report['baseline']} (⚠ = slower than tolerance {report['tolerance']:.0%})"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="*", default=[1e3, 1e4, 1e5, 1e6],
+                        help="rows per dataset (1e7 needs a few GB of RAM)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rows-per-hero", type=int, default=0,
+                        help="grow the hero pool to rows / N heroes (0 = the real pool)")
+    parser.add_argument("--stages", nargs="*", default=list(STAGES), choices=list(STAGES),
+                        help="stages to run (their inputs are added)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced runs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", default="bench_scale.json")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    profile = synthetic_data.Profile.from_csv(os.path.join(ROOT, synthetic_data.NORMALIZED_CSV))
+    results, sizes = [], []
+    chart_dir = tempfile.mkdtemp(prefix="bench_scale_")
+    header = f"{'rows':>10}{'heroes':>8}  {'stage':<18}{'ms':>12}{'peak MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for size in sorted(int(s) for s in args.sizes):
+        heroes = max(len(profile.heroes), size // args.rows_per_hero) if args.rows_per_hero else len(profile.heroes)
+        ctx = {"path": dataset(size, heroes, args.seed, args.data_dir, profile), "k": args.k, "chart_dir": chart_dir}
+        rows = None
+        for stage in with_requirements(args.stages):
+            hero_rows = len(ctx["aggregate"]) if "aggregate" in ctx else None
+            if hero_rows is not None and hero_rows > MAX_ROWS.get(stage, float("inf")):
+                results.append({"size": size, "heroes": heroes, "stage": stage, "ms": None, "peak_mb": None,
+                                "skipped": f"> {MAX_ROWS[stage]} heroes"})
+                print(f"{rows or size:>10}{heroes:>8}  {stage:<18}{'skipped (> MAX_ROWS)':>22}")
+                continue
+            ctx[stage], ms, peak = bench_stage(STAGES[stage], ctx, args.runs, not args.no_memory)
+            rows = len(ctx["load"]) if "load" in ctx else rows
+            results.append({"size": size, "heroes": heroes, "stage": stage, "ms": ms, "peak_mb": peak, "skipped": None})
+            print(f"{rows or size:>10}{heroes:>8}  {stage:<18}{ms:>12.1f}"
+                  f"{'-' if peak is None else f'{peak:.1f}':>10}")
+        sizes.append({"size": size, "rows": rows or size, "heroes": len(ctx.get("aggregate", [])) or heroes,
+                      "rss_mb": peak_rss_mb()})
+        del ctx
+
+    report = {"environment": environment(), "args": vars(args), "sizes": sizes, "results": results,
+              "baseline": args.baseline, "tolerance": args.tolerance}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    md_path = os.path.splitext(args.out)[0] + ".md"
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write(markdown(report))
+    print(f"\nSaved {args.out} and {md_path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regressions (> {args.tolerance:.0%} and {MIN_REGRESSION_MS} ms slower):")
+        for r in regressions:
+            print(f"  {r['size']:>10} rows  {r['stage']:<18}{r['baseline_ms']:>10.1f} -> {r['ms']:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Out-of-core aggregation of the normalized hero x tournament rows.
+
+Streams the input in fixed-size pieces - byte ranges of a CSV (cut at line
+boundaries) or Parquet row groups - and reduces each piece to per-hero
+partial sums and per-(hero, role) row counts. Partials are at most one row
+per hero (per role), so memory is bounded by the piece size and the hero
+count, not by the input size. Pieces run on a process pool and are merged
+as they complete; the result is the mlbb_heroes_aggregated.csv layout,
+with the same rules as hero_store / HeroStats:
+
+    Primary_Role      most frequent Role_Normalized (ties: alphabetical), Other -> Tank
+    overall_win_rate  total_wins / total_picks * 100, rounded to 2 places
+
+Side columns (total_blue_picks, ...) are added when the input has them.
+CSV pieces assume no quoted newlines inside fields (true of the scraper's
+output).
+
+    python chunked_aggregate.py [input.csv|input.parquet] [--out mlbb_heroes_aggregated.csv]
+                                [--chunk-mb 16] [--workers N] [--check expected.csv]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+AGGREGATED_CSV = "mlbb_heroes_aggregated.csv"
+CHUNK_MB = 16
+MAX_PENDING = 8             # pieces in flight per worker
+
+# Input column -> aggregated column
+COUNT_COLUMNS = {
+    "pick_total": "total_picks",
+    "pick_wins": "total_wins",
+    "pick_losses": "total_losses",
+    "ban_count": "total_bans",
+}
+SIDE_COLUMNS = {
+    "blue_total": "total_blue_picks",
+    "blue_wins": "total_blue_wins",
+    "red_total": "total_red_picks",
+    "red_wins": "total_red_wins",
+}
+ROLE_COLUMN = "Role_Normalized"
+ROLE_FALLBACK = {"Other": "Tank"}
+
+
+# ---------------------------
+# Pieces
+# ---------------------------
+def csv_pieces(path, chunk_bytes):
+    """(header, [(start, end)]) byte ranges of `path`, each starting at a line"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        ranges = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()                # finish the line the cut fell into
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def parquet_pieces(path):
+    import pyarrow.parquet as pq
+
+    return list(range(pq.ParquetFile(path).num_row_groups))
+
+
+def _partial(frame, columns):
+    """Per-hero sums + per-(hero, role) row counts of one piece"""
+    sums = frame.groupby("hero", sort=False)[columns].sum(min_count=1)
+    roles = frame[ROLE_COLUMN].fillna("Other")
+    role_counts = frame.groupby(["hero", roles], sort=False).size()
+    return sums, role_counts
+
+
+def csv_partial(path, header, start, end, columns):
+    """Worker: read one byte range and reduce it"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    frame = pd.read_csv(io.BytesIO(header + data), usecols=["hero", ROLE_COLUMN] + columns)
+    return _partial(frame, columns)
+
+
+def parquet_partial(path, row_group, columns):
+    """Worker: read one row group and reduce it"""
+    import pyarrow.parquet as pq
+
+    table = pq.ParquetFile(path).read_row_group(row_group, columns=["hero", ROLE_COLUMN] + columns)
+    return _partial(table.to_pandas(), columns)
+
+
+def input_columns(path):
+    """Count (+ side, when present) columns of the input"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        names = pq.ParquetFile(path).schema_arrow.names
+    else:
+        names = pd.read_csv(path, nrows=0).columns.tolist()
+    missing = [c for c in ["hero", ROLE_COLUMN, *COUNT_COLUMNS] if c not in names]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    columns = list(COUNT_COLUMNS)
+    if all(c in names for c in SIDE_COLUMNS):
+        columns += list(SIDE_COLUMNS)
+    return columns
+
+
+# ---------------------------
+# Reduce
+# ---------------------------
+class Totals:
+    """Running merge of partials; order of arrival does not matter"""
+
+    def __init__(self):
+        self.sums = None
+        self.role_counts = None
+
+    def add(self, partial):
+        sums, role_counts = partial
+        if self.sums is None:
+            self.sums, self.role_counts = sums, role_counts
+            return
+        # fill_value=0 keeps a hero missing from one side; NaN + NaN stays NaN (no side data)
+        self.sums = self.sums.add(sums, fill_value=0)
+        self.role_counts = self.role_counts.add(role_counts, fill_value=0)
+
+    def frame(self):
+        """Aggregated frame (mlbb_heroes_aggregated.csv layout), sorted by hero"""
+        sums = self.sums.sort_index()
+        counts = self.role_counts.rename("n").reset_index()
+        counts.columns = ["hero", "role", "n"]
+        primary = (counts.sort_values(["hero", "n", "role"], ascending=[True, False, True])
+                   .drop_duplicates("hero").set_index("hero")["role"].replace(ROLE_FALLBACK))
+
+        out = pd.DataFrame({"hero": sums.index, "Primary_Role": primary.reindex(sums.index).to_numpy()})
+        for column, aggregated in COUNT_COLUMNS.items():
+            out[aggregated] = sums[column].fillna(0).astype(np.int64).to_numpy()
+        picks = out["total_picks"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["overall_win_rate"] = np.where(picks > 0, out["total_wins"] / picks * 100, 0.0).round(2)
+        for column, aggregated in SIDE_COLUMNS.items():
+            if column in sums.columns:
+                out[aggregated] = sums[column].astype("Int64").to_numpy()
+        return out
+
+
+def aggregate(path=NORMALIZED_CSV, chunk_mb=CHUNK_MB, workers=None):
+    """Aggregate a normalized CSV / Parquet file piece by piece; returns (frame, pieces)"""
+    columns = input_columns(path)
+    if path.endswith(".parquet"):
+        tasks = [(parquet_partial, (path, rg, columns)) for rg in parquet_pieces(path)]
+    else:
+        header, ranges = csv_pieces(path, int(chunk_mb * 2 ** 20))
+        tasks = [(csv_partial, (path, header, start, end, columns)) for start, end in ranges]
+
+    totals = Totals()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        for fn, args in tasks:
+            totals.add(fn(*args))
+    else:
+        # Bounded submission: only MAX_PENDING pieces per worker are in flight
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for fn, args in tasks:
+                pending.add(pool.submit(fn, *args))
+                if len(pending) >= workers * MAX_PENDING:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        totals.add(future.result())
+            for future in pending:
+                totals.add(future.result())
+    if totals.sums is None:
+        raise ValueError(f"{path} has no rows")
+    return totals.frame(), len(tasks)
+
+
+def peak_rss_mb():
+    """Peak resident set of this process and its (finished) workers"""
+    import resource
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024        # bytes on macOS, kB elsewhere
+    return own * scale / 2 ** 20, children * scale / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked per-hero aggregation")
+    parser.add_argument("input", nargs="?", default=NORMALIZED_CSV)
+    parser.add_argument("--out", default=AGGREGATED_CSV)
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_MB, help="CSV piece size")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--check", help="compare the result with this aggregated CSV instead of writing")
+    args = parser.parse_args()
+
+    start = time.time()
+    frame, pieces = aggregate(args.input, args.chunk_mb, args.workers)
+    elapsed = time.time() - start
+    own, children = peak_rss_mb()
+    print(f"{len(frame)} heroes from {pieces} pieces in {elapsed:.2f}s "
+          f"(peak RSS {own:.0f} MB main, {children:.0f} MB largest worker)")
+
+    if args.check:
+        expected = pd.read_csv(args.check)
+        actual = pd.read_csv(io.StringIO(frame.to_csv(index=False)))[expected.columns]
+        if actual.equals(expected):
+            print(f"Identical to {args.check}")
+        else:
+            diff = actual.compare(expected)
+            print(f"Differs from {args.check} in {len(diff)} rows:")
+            print(diff.head(20).to_string())
+            sys.exit(1)
+        return
+
+    # CRLF like the existing aggregated CSV, so an unchanged dataset gives an identical file
+    frame.to_csv(args.out, index=False, lineterminator="\r\n")
+    print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Bootstrap stability of the K-Means hero clustering.
+
+Refits the clustering on B bootstrap resamples of the heroes, spread over a
+process pool. The scaled feature matrix is placed in shared memory once and
+every worker maps it instead of receiving a pickled copy per task. Each fit
+labels all heroes (nearest centre), and the labels are aligned to the
+reference clustering (fit on the full data) by Hungarian matching.
+
+Reported per run:
+    coassignment  (H, H) fraction of resamples in which two heroes share a cluster
+    ari           (B,)   adjusted Rand index of each resample vs the reference
+    confidence    (H,)   fraction of resamples keeping a hero in its reference cluster
+
+    python cluster_stability.py [--k 3 4 5] [--boot 500] [--workers N]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+N_BOOT = 500
+CHUNK = 25                  # resamples per task
+RANDOM_STATE = 42
+
+# Worker-side view of the shared feature matrix
+_shared = {}
+
+
+def _attach(name, shape, dtype):
+    from threadpoolctl import threadpool_limits
+
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)     # 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    _shared["shm"] = shm
+    _shared["X"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    # One BLAS/OpenMP thread per worker; the pool provides the parallelism
+    _shared["limits"] = threadpool_limits(1)
+
+
+def _fit_resamples(X, n_clusters, seeds, n_init):
+    """Labels of every hero for each seed's bootstrap fit, (len(seeds), H) int16"""
+    from sklearn.cluster import KMeans
+
+    labels = np.empty((len(seeds), len(X)), dtype=np.int16)
+    for row, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        sample = rng.integers(0, len(X), size=len(X))
+        model = KMeans(n_clusters=n_clusters, random_state=int(seed) % (2 ** 31), n_init=n_init)
+        model.fit(X[sample])
+        labels[row] = model.predict(X)
+    return labels
+
+
+def _worker(n_clusters, seeds, n_init):
+    return _fit_resamples(_shared["X"], n_clusters, seeds, n_init)
+
+
+def align_labels(labels, reference, n_clusters):
+    """Relabel each row of `labels` to best match `reference` (Hungarian matching)"""
+    from scipy.optimize import linear_sum_assignment
+
+    aligned = np.empty_like(labels)
+    for b, row in enumerate(labels):
+        overlap = np.zeros((n_clusters, n_clusters), dtype=np.int64)
+        np.add.at(overlap, (row, reference), 1)
+        source, target = linear_sum_assignment(-overlap)
+        mapping = np.empty(n_clusters, dtype=labels.dtype)
+        mapping[source] = target
+        aligned[b] = mapping[row]
+    return aligned
+
+
+def coassignment_matrix(labels, n_clusters):
+    """(H, H) fraction of rows in which each pair of heroes shares a label"""
+    onehot = np.zeros(labels.shape + (n_clusters,), dtype=np.float32)
+    np.put_along_axis(onehot, labels[..., None].astype(np.int64), 1.0, axis=2)
+    return np.einsum("bhk,bgk->hg", onehot, onehot) / len(labels)
+
+
+def bootstrap_stability(X_scaled, n_clusters, n_boot=N_BOOT, workers=None, n_init=10,
+                        random_state=RANDOM_STATE, reference=None):
+    """Refit K-Means on `n_boot` resamples; returns a dict of stability statistics
+
+    `reference` defaults to the full-data fit with the same settings as the
+    dashboard / latests.py (KMeans(random_state=42, n_init=10)).
+    """
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import adjusted_rand_score
+
+    X = np.ascontiguousarray(X_scaled, dtype=np.float64)
+    if reference is None:
+        reference = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init).fit_predict(X)
+    reference = np.asarray(reference)
+
+    seeds = np.random.SeedSequence(random_state).generate_state(n_boot)
+    chunks = [seeds[i:i + CHUNK] for i in range(0, n_boot, CHUNK)]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        parts = [_fit_resamples(X, n_clusters, chunk, n_init) for chunk in chunks]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(shm.name, X.shape, X.dtype)) as pool:
+                parts = list(pool.map(_worker, [n_clusters] * len(chunks), chunks,
+                                      [n_init] * len(chunks)))
+        finally:
+            shm.close()
+            shm.unlink()
+    labels = align_labels(np.vstack(parts), reference, n_clusters)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "n_clusters": n_clusters,
+        "n_boot": n_boot,
+        "reference": reference,
+        "labels": labels,
+        "coassignment": coassignment_matrix(labels, n_clusters),
+        "ari": np.array([adjusted_rand_score(reference, row) for row in labels]),
+        "confidence": (labels == reference).mean(axis=0),
+        "elapsed": elapsed,
+    }
+
+
+def hero_confidence_frame(heroes, report):
+    """Per-hero reference cluster, assignment confidence and most frequent alternative"""
+    import pandas as pd
+
+    labels, reference = report["labels"], report["reference"]
+    counts = np.zeros((len(heroes), report["n_clusters"]), dtype=np.int64)
+    np.add.at(counts, (np.broadcast_to(np.arange(len(heroes)), labels.shape), labels), 1)
+    counts[np.arange(len(heroes)), reference] = -1
+    return pd.DataFrame({
+        "hero": heroes,
+        "cluster": reference,
+        "confidence": report["confidence"].round(3),
+        "alt_cluster": counts.argmax(axis=1),
+    }).sort_values("confidence")
+
+
+def summarize(report):
+    ari = report["ari"]
+    lo, hi = np.quantile(ari, [0.025, 0.975])
+    return (f"K={report['n_clusters']}: ARI {ari.mean():.3f} (95% {lo:.3f}-{hi:.3f}), "
+            f"mean hero confidence {report['confidence'].mean():.3f}, "
+            f"{(report['confidence'] < 0.8).sum()} heroes < 0.8 "
+            f"[{report['n_boot']} resamples in {report['elapsed']:.1f}s]")
+
+
+def main():
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    from hero_stats import HeroStats
+
+    parser = argparse.ArgumentParser(description="Bootstrap stability of the hero clustering")
+    parser.add_argument("--data", default="mlbb_heroes_aggregated.csv")
+    parser.add_argument("--k", type=int, nargs="+", default=[5])
+    parser.add_argument("--boot", type=int, default=N_BOOT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="mlbb_cluster_stability.csv",
+                        help="per-hero confidence for the first K")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    stats = HeroStats.from_aggregated(df)
+    X_scaled = StandardScaler().fit_transform(
+        stats.feature_matrix(['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate'])
+    )
+
+    for i, k in enumerate(args.k):
+        report = bootstrap_stability(X_scaled, k, n_boot=args.boot, workers=args.workers)
+        print(summarize(report))
+        if i == 0:
+            frame = hero_confidence_frame(stats.heroes, report)
+            frame.to_csv(args.out, index=False)
+            print(f"  Least stable: {', '.join(f'{h} ({c:.2f})' for h, c in frame[['hero', 'confidence']].head(8).values)}")
+            print(f"  Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Clustering engines behind one interface.
+
+Every engine takes the scaled feature matrix and a target number of clusters
+and returns a ClusterResult with dense labels 0..n-1 and one centre per label
+(in the scaled space, for PCA plots). HDBSCAN picks its own number of
+clusters; its noise points become one extra label, reported as `noise_label`.
+
+    result = fit_clusters("Gaussian Mixture", X_scaled, n_clusters=5)
+"""
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+RANDOM_STATE = 42
+
+
+class ClusterResult(NamedTuple):
+    labels: np.ndarray
+    centers: np.ndarray
+    model: Any
+    noise_label: Optional[int] = None
+
+    @property
+    def n_clusters(self):
+        return len(self.centers)
+
+
+def _label_means(X, labels):
+    n = labels.max() + 1
+    sums = np.zeros((n, X.shape[1]))
+    np.add.at(sums, labels, X)
+    return sums / np.bincount(labels, minlength=n)[:, None]
+
+
+def _kmeans(X, n_clusters, random_state):
+    from sklearn.cluster import KMeans
+
+    model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit(X)
+    return ClusterResult(model.labels_, model.cluster_centers_, model)
+
+
+def _minibatch_kmeans(X, n_clusters, random_state):
+    from sklearn.cluster import MiniBatchKMeans
+
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3,
+                            batch_size=1024).fit(X)
+    return ClusterResult(model.labels_, model.cluster_centers_, model)
+
+
+def _gaussian_mixture(X, n_clusters, random_state):
+    from sklearn.mixture import GaussianMixture
+
+    model = GaussianMixture(n_components=n_clusters, covariance_type="full",
+                            random_state=random_state, n_init=3).fit(X)
+    labels = model.predict(X)
+    # Empty components are dropped so labels stay dense
+    used, labels = np.unique(labels, return_inverse=True)
+    return ClusterResult(labels, model.means_[used], model)
+
+
+def _agglomerative(X, n_clusters, random_state):
+    from sklearn.cluster import AgglomerativeClustering
+
+    model = AgglomerativeClustering(n_clusters=n_clusters, linkage="ward").fit(X)
+    return ClusterResult(model.labels_, _label_means(X, model.labels_), model)
+
+
+def _hdbscan(X, n_clusters, random_state):
+    from sklearn.cluster import HDBSCAN
+
+    # n_clusters only sets the scale: smallest cluster ~ a quarter of an even split
+    model = HDBSCAN(min_cluster_size=max(5, len(X) // (4 * n_clusters)), min_samples=3).fit(X)
+    labels = model.labels_.copy()
+    noise_label = None
+    if (labels < 0).any():
+        noise_label = int(labels.max()) + 1
+        labels[labels < 0] = noise_label
+    return ClusterResult(labels, _label_means(X, labels), model, noise_label)
+
+
+# Display name -> engine; the first entry is the default
+ENGINES = {
+    "K-Means": _kmeans,
+    "MiniBatch K-Means": _minibatch_kmeans,
+    "Gaussian Mixture": _gaussian_mixture,
+    "Agglomerative (Ward)": _agglomerative,
+    "HDBSCAN": _hdbscan,
+}
+
+
+def fit_clusters(engine, X_scaled, n_clusters, random_state=RANDOM_STATE):
+    """Fit one of ENGINES on the scaled feature matrix"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown clustering engine: {engine} (choose from {', '.join(ENGINES)})")
+    return ENGINES[engine](np.asarray(X_scaled, dtype=np.float64), n_clusters, random_state)
@@ -0,0 +1,110 @@
+"""Multi-dataset comparison in one shared feature space.
+
+Each dataset contributes its feature moments (count, sum, sum of outer
+products). The union StandardScaler + PCA are derived from the combined
+moments, so adding a dataset only costs its own moments and transform;
+nothing is refitted on the concatenated rows except the union clustering.
+"""
+import numpy as np
+
+from hero_stats import HeroStats
+
+FEATURES = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+
+
+def is_tournament_rows(df):
+    """True for mlbb_dataset_normalized.csv-style (hero x tournament) frames"""
+    return "tournament_year" in df.columns and "pick_total" in df.columns
+
+
+def aggregate_window(df, start_year=None, end_year=None):
+    """HeroStats store for the tournaments of a year window of hero x tournament rows"""
+    return HeroStats.from_tournament_rows(df).window(start_year, end_year)
+
+
+def parse_windows(text):
+    """'2018-2021, 2024' -> [(2018, 2021), (2024, 2024)]"""
+    windows = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            windows.append((int(start), int(end)))
+        else:
+            windows.append((int(part), int(part)))
+    return windows
+
+
+def feature_moments(X):
+    """Sufficient statistics of a feature matrix: (n, sum, sum of outer products)"""
+    X = np.asarray(X, dtype=np.float64)
+    return X.shape[0], X.sum(axis=0), X.T @ X
+
+
+class UnionProjection:
+    """StandardScaler + 2D PCA of the union of several datasets, from moments"""
+
+    def __init__(self, mean, scale, components, explained_variance_ratio):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.components_ = components
+        self.explained_variance_ratio_ = explained_variance_ratio
+
+    @classmethod
+    def from_moments(cls, moments, n_components=2):
+        n = sum(m[0] for m in moments)
+        s1 = sum(m[1] for m in moments)
+        s2 = sum(m[2] for m in moments)
+
+        mean = s1 / n
+        cov = s2 / n - np.outer(mean, mean)     # population covariance, as StandardScaler
+        scale = np.sqrt(np.clip(np.diag(cov), 0, None))
+        scale[scale == 0] = 1.0
+
+        # PCA of the standardized union = eigendecomposition of its correlation matrix
+        corr = cov / np.outer(scale, scale)
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        order = np.argsort(eigvals)[::-1]
+        eigvals, eigvecs = eigvals[order], eigvecs[:, order]
+
+        # Deterministic signs: largest-magnitude loading positive
+        signs = np.sign(eigvecs[np.abs(eigvecs).argmax(axis=0), range(eigvecs.shape[1])])
+        eigvecs = eigvecs * signs
+
+        ratio = eigvals / eigvals.sum()
+        return cls(mean, scale, eigvecs[:, :n_components].T, ratio[:n_components])
+
+    def scale(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def project(self, X_scaled):
+        return X_scaled @ self.components_.T
+
+
+def fit_union_clusters(scaled_list, n_clusters, random_state=42):
+    """KMeans fitted once on the union; returns (model, per-dataset labels)"""
+    from sklearn.cluster import KMeans
+
+    X_union = np.vstack(scaled_list)
+    model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit(X_union)
+    labels, start = [], 0
+    for X in scaled_list:
+        labels.append(model.labels_[start:start + len(X)])
+        start += len(X)
+    return model, labels
+
+
+def cluster_moves(base, other):
+    """Heroes present in both frames with their cluster/category before and after
+
+    Both frames need hero, cluster, category, pca1, pca2 and the FEATURES.
+    """
+    merged = base.merge(other, on="hero", suffixes=("_base", "_other"))
+    merged["moved"] = merged["cluster_base"] != merged["cluster_other"]
+    merged["delta_picks"] = merged["total_picks_other"] - merged["total_picks_base"]
+    merged["delta_win_rate"] = (merged["overall_win_rate_other"] - merged["overall_win_rate_base"]).round(2)
+    merged["shift"] = np.hypot(merged["pca1_other"] - merged["pca1_base"],
+                               merged["pca2_other"] - merged["pca2_base"])
+    return merged
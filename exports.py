@@ -0,0 +1,174 @@
+"""On-demand exports of a clustering result: CSV, Parquet, JSON, Excel.
+
+Nothing is serialised until an export is requested. The bytes are cached
+per (result key, format) - the result key identifies the dataset version
+and clustering settings, so a rerun with the same result never serialises
+twice. Small exports stay in an in-memory LRU. Exports of frames above
+SPILL_BYTES (in memory) are written straight to a file in EXPORT_DIR, with
+no serialised copy held while writing, and read back for each download.
+EXPORT_DIR is pruned to DISK_BYTES, oldest first, and files unused for
+MAX_AGE seconds are removed.
+
+Parquet needs pyarrow, Excel needs openpyxl or xlsxwriter; formats whose
+library is missing are left out of available_formats().
+
+    data = export(df, "Parquet", key)           # bytes
+"""
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "mlbb_exports")
+SPILL_BYTES = 8 * 2 ** 20   # larger frames are serialised to disk
+DISK_BYTES = 512 * 2 ** 20  # EXPORT_DIR size cap
+MAX_AGE = 7 * 24 * 3600     # spilled exports unused this long are removed
+MEMORY_ENTRIES = 16         # in-memory LRU size
+FILE_STEM = "mlbb_heroes_clustered"
+
+
+# Writers: (frames, target) with target a path or a binary buffer
+def _csv(frames, target):
+    next(iter(frames.values())).to_csv(target, index=False, encoding="utf-8")
+
+
+def _parquet(frames, target):
+    next(iter(frames.values())).to_parquet(target, index=False)
+
+
+def _json(frames, target):
+    next(iter(frames.values())).to_json(target, orient="records", force_ascii=False)
+
+
+def _excel(frames, target):
+    """One sheet per frame (Heroes, plus any summary sheets)"""
+    import pandas as pd
+
+    with pd.ExcelWriter(target) as writer:
+        for name, frame in frames.items():
+            frame.to_excel(writer, sheet_name=name[:31], index=False)
+
+
+# Format -> (extension, MIME type, writer, required module)
+FORMATS = {
+    "CSV": ("csv", "text/csv", _csv, None),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", _parquet, "pyarrow"),
+    "JSON": ("json", "application/json", _json, None),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", _excel,
+              ("openpyxl", "xlsxwriter")),
+}
+
+
+def _installed(modules):
+    if modules is None:
+        return True
+    if isinstance(modules, str):
+        modules = (modules,)
+    return any(importlib.util.find_spec(m) is not None for m in modules)
+
+
+def available_formats():
+    return [name for name, (_, _, _, modules) in FORMATS.items() if _installed(modules)]
+
+
+def file_name(fmt, stem=FILE_STEM):
+    return f"{stem}.{FORMATS[fmt][0]}"
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+def result_key(*parts):
+    """Stable key for a clustering result from the values that determine it"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class ExportCache:
+    """Thread-safe cache of serialised exports (download callables run off the script thread)"""
+
+    def __init__(self, directory=EXPORT_DIR, spill_bytes=SPILL_BYTES, entries=MEMORY_ENTRIES,
+                 disk_bytes=DISK_BYTES, max_age=MAX_AGE):
+        self.directory = directory
+        self.spill_bytes = spill_bytes
+        self.entries = entries
+        self.disk_bytes = disk_bytes
+        self.max_age = max_age
+        self._memory = OrderedDict()        # (key, fmt) -> bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{FORMATS[fmt][0]}")
+
+    @staticmethod
+    def _read(path):
+        os.utime(path)                      # pruning goes by last use
+        with open(path, "rb") as f:
+            return f.read()
+
+    def get(self, frames, fmt, key):
+        """Cached bytes; serialises on a miss"""
+        with self._lock:
+            if (key, fmt) in self._memory:
+                self._memory.move_to_end((key, fmt))
+                return self._memory[(key, fmt)]
+        path = self._path(key, fmt)
+        try:
+            return self._read(path)
+        except FileNotFoundError:
+            pass
+
+        writer = FORMATS[fmt][2]
+        if sum(int(f.memory_usage(deep=True).sum()) for f in frames.values()) > self.spill_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp.{FORMATS[fmt][0]}"
+            writer(frames, tmp)
+            os.replace(tmp, path)
+            self.prune()
+            return self._read(path)
+
+        buf = io.BytesIO()
+        writer(frames, buf)
+        data = buf.getvalue()
+        with self._lock:
+            self._memory[(key, fmt)] = data
+            while len(self._memory) > self.entries:
+                self._memory.popitem(last=False)
+        return data
+
+    def prune(self):
+        """Remove spilled exports older than max_age, then the least recently used above disk_bytes"""
+        files = []
+        for name in os.listdir(self.directory):
+            if ".tmp." in name:             # still being written
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:       # removed by another thread
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        now, total = time.time(), sum(size for _, size, _ in files)
+        for mtime, size, path in sorted(files):
+            if total <= self.disk_bytes and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+_cache = ExportCache()
+
+
+def export(frame, fmt, key, sheets=None):
+    """Serialised `frame` in `fmt` (bytes); `sheets` adds Excel summary sheets"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (choose from {', '.join(FORMATS)})")
+    frames = {"Heroes": frame, **(sheets or {})}
+    return _cache.get(frames, fmt, key)
@@ -0,0 +1,59 @@
+"""Shared analysis rules for latests.py and streamlit.py."""
+
+CATEGORY_COLOR_MAP = {
+    "META": "#FF4444",
+    "PRIORITY BAN": "#FF8800",
+    "POPULAR BUT WEAK": "#FFDD00",
+    "HIGH WIN RATE": "#44FF44",
+    "SITUATIONAL": "#4444FF"
+}
+
+CATEGORY_EMOJI = {
+    "META": "🔴",
+    "PRIORITY BAN": "🟠",
+    "POPULAR BUT WEAK": "🟡",
+    "HIGH WIN RATE": "🟢",
+    "SITUATIONAL": "🔵"
+}
+
+# Label -> HeroStats feature used as the win rate in the category rules
+WIN_RATE_BASES = {
+    "Raw win rate": "overall_win_rate",
+    "Wilson lower bound (95%)": "win_rate_lower",
+    "Bayesian shrunk": "win_rate_shrunk",
+}
+
+
+def categorize_cluster(avg_picks, avg_bans, avg_winrate, avg_banrate, count_scale=1.0):
+    """Category label for one cluster's average stats
+
+    The pick / ban cutoffs were set on the all-time totals; `count_scale`
+    shrinks them for smaller slices (e.g. one patch's share of all picks).
+    """
+    if avg_picks > 1000 * count_scale and avg_winrate > 52:
+        return "META"
+    elif avg_bans > 500 * count_scale and avg_banrate > 40:
+        return "PRIORITY BAN"
+    elif avg_picks > 500 * count_scale and avg_winrate < 48:
+        return "POPULAR BUT WEAK"
+    elif avg_winrate > 54:
+        return "HIGH WIN RATE"
+    else:
+        return "SITUATIONAL"
+
+
+def categorize_clusters(stats, clusters, win_rate_feature="overall_win_rate", count_scale=1.0):
+    """Return ({cluster: category}, {cluster: color}) for a HeroStats store
+
+    `win_rate_feature` picks the win rate the META / HIGH WIN RATE cutoffs
+    apply to; "win_rate_lower" keeps low-sample heroes out of META.
+    """
+    means = stats.group_means(clusters, ["total_picks", "total_bans", win_rate_feature, "ban_rate"])
+
+    cluster_categories = {}
+    cluster_colors = {}
+    for cluster_id in sorted(set(int(c) for c in clusters)):
+        category = categorize_cluster(*means[cluster_id], count_scale=count_scale)
+        cluster_categories[cluster_id] = category
+        cluster_colors[cluster_id] = CATEGORY_COLOR_MAP[category]
+    return cluster_categories, cluster_colors
@@ -0,0 +1,282 @@
+"""Read-only HTTP API over the aggregated hero stats, clusters and year windows.
+
+    python hero_api.py [--host 127.0.0.1] [--port 8000] [--verbose]
+
+Endpoints (JSON, GET only):
+    /                          data version, hero count, endpoint list
+    /heroes                    all heroes: totals, win-rate intervals, cluster, category
+    /heroes/<hero>             one hero
+    /roles/<role>              heroes whose Primary_Role is <role>
+    /windows/<start>-<end>     totals over a tournament_year window (?role=Mage)
+    /clusters                  per cluster: category, size and heroes
+    /clusters/<id>
+
+Every response body is serialised once per data version and kept in an LRU
+together with its gzip encoding and ETag, so repeated requests cost a dict
+lookup; If-None-Match gets a 304. Source files are re-checked at most every
+RELOAD_SECONDS and a changed file starts a new data version.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import hero_store
+from dataset_comparison import parse_windows
+from hero_analysis import categorize_clusters
+from hero_stats import HeroStats
+from winrate_stats import add_win_rate_intervals
+
+AGGREGATED_CSV = "mlbb_heroes_aggregated.csv"
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+CLUSTERED_CSV = "mlbb_heroes_clustered.csv"
+
+RELOAD_SECONDS = 2.0        # how often source files are stat()ed
+RESPONSE_CACHE_SIZE = 1024  # rendered responses (all versions share the LRU)
+WINDOW_CACHE_SIZE = 64      # computed year-window frames
+GZIP_MIN_BYTES = 512        # smaller bodies are sent uncompressed
+
+ENDPOINTS = ["/heroes", "/heroes/<hero>", "/roles/<role>",
+             "/windows/<start>-<end>?role=<role>", "/clusters", "/clusters/<id>"]
+
+
+def _json_default(value):
+    # numpy scalars that slip through to_dict()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _records(frame):
+    """JSON-safe records (NaN -> null)"""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+# ---------------------------
+# Data
+# ---------------------------
+class HeroData:
+    """Pipeline outputs loaded into memory, reloaded when a source file changes"""
+
+    def __init__(self, db_path=hero_store.DB_PATH, normalized=NORMALIZED_CSV,
+                 aggregated=AGGREGATED_CSV, clustered=CLUSTERED_CSV):
+        self.db_path = db_path
+        self.normalized = normalized
+        self.aggregated = aggregated
+        self.clustered = clustered
+        self.version = None
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _sources(self):
+        return [self.db_path, self.normalized, self.aggregated, self.clustered]
+
+    def _current_signature(self):
+        signature = []
+        for path in self._sources():
+            if os.path.exists(path):
+                info = os.stat(path)
+                signature.append((path, info.st_mtime_ns, info.st_size))
+        return tuple(signature)
+
+    def refresh(self, force=False):
+        """Reload if a source changed; stat()s at most once per RELOAD_SECONDS"""
+        now = time.monotonic()
+        if not force and now - self._checked < RELOAD_SECONDS:
+            return
+        with self._lock:
+            self._checked = now
+            signature = self._current_signature()
+            if signature == self._signature:
+                return
+            self._load()
+            self._signature = signature
+            self.version = hashlib.blake2b(repr(signature).encode(), digest_size=8).hexdigest()
+            print(f"Loaded data version {self.version} ({len(self.heroes)} heroes)")
+
+    def _load(self):
+        import pandas as pd
+
+        # Hero x tournament rows (needed for year windows): store first, then CSV
+        rows = None
+        if not hero_store.is_stale(self.db_path, self.normalized):
+            conn = hero_store.connect(self.db_path, read_only=True)
+            try:
+                rows = hero_store.load_tournament_rows(conn).dropna(axis=1, how="all")
+            finally:
+                conn.close()
+        elif os.path.exists(self.normalized):
+            rows = pd.read_csv(self.normalized)
+
+        if rows is not None:
+            stats = HeroStats.from_tournament_rows(rows)
+            frame = stats.to_frame()
+        elif os.path.exists(self.aggregated):
+            stats = None
+            frame = HeroStats.from_aggregated(pd.read_csv(self.aggregated)).to_frame()
+        else:
+            raise FileNotFoundError(f"No hero data found ({self.normalized}, {self.aggregated})")
+        add_win_rate_intervals(frame)
+
+        # Cluster assignments from the clustering output; categories derived as in the dashboard
+        clusters = {}
+        if os.path.exists(self.clustered):
+            clustered = pd.read_csv(self.clustered)
+            if "category" not in clustered.columns:
+                cluster_categories, _ = categorize_clusters(
+                    HeroStats.from_aggregated(clustered), clustered["cluster"].to_numpy()
+                )
+                clustered["category"] = clustered["cluster"].map(cluster_categories)
+            frame = frame.merge(clustered[["hero", "cluster", "category"]], on="hero", how="left")
+            frame["cluster"] = frame["cluster"].astype("Int64")
+            for cluster_id, group in clustered.groupby("cluster"):
+                clusters[int(cluster_id)] = {
+                    "cluster": int(cluster_id),
+                    "category": group["category"].iloc[0],
+                    "size": len(group),
+                    "heroes": sorted(group["hero"]),
+                }
+
+        # Swap everything in at the end so requests never see a half-loaded version
+        heroes = {r["hero"].lower(): r for r in _records(frame)}
+        self.stats, self.frame, self.heroes, self.clusters = stats, frame, heroes, clusters
+
+
+# ---------------------------
+# Routing / response cache
+# ---------------------------
+class HeroApi:
+    def __init__(self, data):
+        self.data = data
+        # Both caches are keyed on the data version, so stale entries simply age out
+        self.response = lru_cache(maxsize=RESPONSE_CACHE_SIZE)(self._render)
+        self.window_records = lru_cache(maxsize=WINDOW_CACHE_SIZE)(self._window_records)
+
+    def _window_records(self, version, start, end):
+        frame = self.data.stats.window(start, end).to_frame()
+        frame = frame[frame["total_matches"] > 0].reset_index(drop=True)
+        add_win_rate_intervals(frame)
+        return _records(frame)
+
+    def _route(self, parts, params):
+        """(status, payload) for a path split into segments"""
+        data = self.data
+        if not parts:
+            return 200, {"version": data.version, "heroes": len(data.heroes), "endpoints": ENDPOINTS}
+
+        if parts[0] == "heroes" and len(parts) == 1:
+            return 200, {"version": data.version, "heroes": list(data.heroes.values())}
+        if parts[0] == "heroes" and len(parts) == 2:
+            record = data.heroes.get(parts[1].lower())
+            if record is None:
+                return 404, {"error": f"Unknown hero: {parts[1]}"}
+            return 200, record
+
+        if parts[0] == "roles" and len(parts) == 2:
+            role = parts[1].lower()
+            heroes = [r for r in data.heroes.values() if r["Primary_Role"].lower() == role]
+            if not heroes:
+                return 404, {"error": f"Unknown role: {parts[1]}"}
+            return 200, {"role": heroes[0]["Primary_Role"], "heroes": heroes}
+
+        if parts[0] == "windows" and len(parts) == 2:
+            if data.stats is None:
+                return 503, {"error": "Year windows need hero x tournament rows (store or normalized CSV)"}
+            try:
+                windows = parse_windows(parts[1])
+            except ValueError:
+                windows = []
+            if len(windows) != 1:
+                return 400, {"error": "Expected /windows/<start>-<end> or /windows/<year>"}
+            start, end = windows[0]
+            heroes = self.window_records(data.version, start, end)
+            role = params.get("role", [None])[0]
+            if role:
+                heroes = [r for r in heroes if r["Primary_Role"].lower() == role.lower()]
+            return 200, {"start": start, "end": end, "role": role, "heroes": heroes}
+
+        if parts[0] == "clusters" and len(parts) == 1:
+            return 200, {"version": data.version, "clusters": list(data.clusters.values())}
+        if parts[0] == "clusters" and len(parts) == 2:
+            try:
+                return 200, data.clusters[int(parts[1])]
+            except (ValueError, KeyError):
+                return 404, {"error": f"Unknown cluster: {parts[1]}"}
+
+        return 404, {"error": "Not found", "endpoints": ENDPOINTS}
+
+    def _render(self, version, path, query):
+        """(status, body, gzipped body, etag) for one request target"""
+        parts = [unquote(p) for p in path.strip("/").split("/") if p]
+        status, payload = self._route(parts, parse_qs(query))
+        body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+        gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return status, body, gzipped, etag
+
+
+def make_handler(api, verbose=False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"       # keep-alive for polling clients
+        disable_nagle_algorithm = True      # headers and body go out as separate writes
+
+        def do_GET(self):
+            api.data.refresh()
+            url = urlsplit(self.path)
+            status, body, gzipped, etag = api.response(api.data.version, url.path, url.query)
+
+            if status == 200 and etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            use_gzip = gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+            payload = gzipped if use_gzip else body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only MLBB hero stats API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    api = HeroApi(HeroData())
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api, args.verbose))
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Hero similarity index: nearest neighbours in the scaled feature space.
+
+One partition per view of the data: "all" (all-time totals) and one per
+tournament_year when the source has years. Each partition standardizes its
+own vectors (as StandardScaler would), then precomputes every hero's
+K_STORED nearest neighbours - a BLAS distance matrix for small partitions,
+a sklearn BallTree above BRUTE_FORCE_MAX - so lookups are a table read.
+
+The index is saved as one .npz (no pickles). Rebuilding against changed data
+reuses every partition whose raw feature matrix is unchanged, so a new
+tournament only recomputes its year and the all-time partition.
+
+    python hero_similarity.py build
+    python hero_similarity.py similar <hero> [year]
+    python hero_similarity.py replace <hero> [year]
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+from dataset_comparison import FEATURES
+
+INDEX_FILE = "mlbb_similarity_index.npz"
+K_STORED = 20               # neighbours precomputed per hero
+BRUTE_FORCE_MAX = 2048      # below this many vectors, a BLAS matrix beats a tree
+
+
+def _fingerprint(heroes, roles, X):
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\0".join(heroes).encode())
+    h.update("\0".join(roles).encode())
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _standardize(X):
+    """Population z-scores, constant columns left at 0"""
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    return (X - mean) / scale
+
+
+def _neighbour_table(vectors, k):
+    """(indices, distances) of each vector's k nearest others, nearest first"""
+    n = len(vectors)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int32), np.empty((n, 0))
+
+    if n <= BRUTE_FORCE_MAX:
+        sq = np.einsum("ij,ij->i", vectors, vectors)
+        d2 = sq[:, None] + sq[None, :] - 2.0 * (vectors @ vectors.T)
+        np.fill_diagonal(d2, np.inf)
+        idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(d2, idx, axis=1)
+        order = np.argsort(part, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+        dist = np.sqrt(np.clip(np.take_along_axis(part, order, axis=1), 0, None))
+        return idx.astype(np.int32), dist
+
+    from sklearn.neighbors import BallTree
+
+    dist, idx = BallTree(vectors).query(vectors, k=k + 1)
+    return idx[:, 1:].astype(np.int32), dist[:, 1:]
+
+
+class Partition:
+    """Scaled vectors + precomputed neighbours for one view (all-time or one year)"""
+
+    def __init__(self, heroes, roles, vectors, neighbours, distances, fingerprint):
+        self.heroes = list(heroes)
+        self.roles = list(roles)
+        self.vectors = vectors
+        self.neighbours = neighbours
+        self.distances = distances
+        self.fingerprint = fingerprint
+        self.index = {h: i for i, h in enumerate(self.heroes)}
+
+    @classmethod
+    def build(cls, heroes, roles, X, fingerprint=None):
+        vectors = _standardize(np.asarray(X, dtype=np.float64))
+        neighbours, distances = _neighbour_table(vectors, K_STORED)
+        return cls(heroes, roles, vectors, neighbours, distances,
+                   fingerprint or _fingerprint(heroes, roles, X))
+
+    def query(self, hero, k=5, role=None, exclude=()):
+        """[(hero, distance)] nearest to `hero`, optionally same role / minus `exclude`"""
+        i = self.index[hero]
+        exclude = set(exclude)
+        hits = []
+        for j, d in zip(self.neighbours[i], self.distances[i]):
+            name = self.heroes[j]
+            if name in exclude or (role is not None and self.roles[j] != role):
+                continue
+            hits.append((name, float(d)))
+            if len(hits) == k:
+                return hits
+
+        # Filters left too few precomputed neighbours: exact scan of this partition
+        d = np.sqrt(((self.vectors - self.vectors[i]) ** 2).sum(axis=1))
+        hits = []
+        for j in np.argsort(d):
+            name = self.heroes[j]
+            if j == i or name in exclude or (role is not None and self.roles[j] != role):
+                continue
+            hits.append((name, float(d[j])))
+            if len(hits) == k:
+                break
+        return hits
+
+
+class SimilarityIndex:
+    def __init__(self, partitions):
+        self.partitions = partitions        # {"all" | year: Partition}
+
+    # ---------------------------
+    # Build / incremental rebuild
+    # ---------------------------
+    @classmethod
+    def build(cls, stats, features=FEATURES, previous=None):
+        """Index a HeroStats store; partitions unchanged since `previous` are reused"""
+        views = {"all": stats}
+        for year in sorted(set(int(y) for y in stats.years) - {0}):
+            views[year] = stats.window(year, year)
+
+        partitions = {}
+        for key, view in views.items():
+            played = view.total_matches > 0
+            if played.sum() < 2:
+                continue
+            heroes = [h for h, keep in zip(view.heroes, played) if keep]
+            roles = [view.role_names[c] for c in view.role_codes[played]]
+            X = view.feature_matrix(features)[played]
+            fingerprint = _fingerprint(heroes, roles, X)
+
+            old = previous.partitions.get(key) if previous is not None else None
+            if old is not None and old.fingerprint == fingerprint:
+                partitions[key] = old
+            else:
+                partitions[key] = Partition.build(heroes, roles, X, fingerprint)
+        return cls(partitions)
+
+    def rebuilt_keys(self, previous):
+        """Partitions that were recomputed relative to `previous`"""
+        return [k for k, p in self.partitions.items()
+                if previous is None or previous.partitions.get(k) is not p]
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def partition(self, year=None):
+        return self.partitions["all" if year is None else year]
+
+    def most_similar(self, hero, k=5, year=None, role=None):
+        """Heroes closest to `hero` in the (year's) scaled feature space"""
+        return self.partition(year).query(hero, k=k, role=role)
+
+    def replacements(self, hero, k=5, year=None, exclude=()):
+        """Closest heroes of the same role, e.g. if `hero` is banned"""
+        partition = self.partition(year)
+        role = partition.roles[partition.index[hero]]
+        return partition.query(hero, k=k, role=role, exclude=exclude)
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path=INDEX_FILE):
+        arrays = {}
+        for key, p in self.partitions.items():
+            arrays[f"{key}/heroes"] = np.array(p.heroes)
+            arrays[f"{key}/roles"] = np.array(p.roles)
+            arrays[f"{key}/vectors"] = p.vectors
+            arrays[f"{key}/neighbours"] = p.neighbours
+            arrays[f"{key}/distances"] = p.distances
+            arrays[f"{key}/fingerprint"] = np.array(p.fingerprint)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        partitions = {}
+        with np.load(path) as data:
+            for key in sorted({name.split("/", 1)[0] for name in data.files}):
+                partitions["all" if key == "all" else int(key)] = Partition(
+                    data[f"{key}/heroes"].tolist(), data[f"{key}/roles"].tolist(),
+                    data[f"{key}/vectors"], data[f"{key}/neighbours"],
+                    data[f"{key}/distances"], str(data[f"{key}/fingerprint"]),
+                )
+        return cls(partitions)
+
+
+def update_index(stats, path=INDEX_FILE):
+    """Load the saved index, rebuild what changed, save it back; returns (index, rebuilt keys)"""
+    previous = SimilarityIndex.load(path) if os.path.exists(path) else None
+    index = SimilarityIndex.build(stats, previous=previous)
+    rebuilt = index.rebuilt_keys(previous)
+    if rebuilt or previous is None or set(previous.partitions) != set(index.partitions):
+        index.save(path)
+    return index, rebuilt
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from hero_stats import HeroStats
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "similar", "replace"):
+        print(__doc__)
+        sys.exit(1)
+
+    if sys.argv[1] == "build":
+        stats = HeroStats.from_tournament_rows(pd.read_csv("mlbb_dataset_normalized.csv"))
+        index, rebuilt = update_index(stats)
+        print(f"{len(index.partitions)} partitions in {INDEX_FILE}; rebuilt: {rebuilt or 'none'}")
+        sys.exit(0)
+
+    index = SimilarityIndex.load()
+    hero = sys.argv[2]
+    year = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    hits = index.most_similar(hero, year=year) if sys.argv[1] == "similar" else index.replacements(hero, year=year)
+    for name, distance in hits:
+        print(f"  {name:<15} {distance:.3f}")
@@ -0,0 +1,331 @@
+"""Compact in-memory hero stats store.
+
+Heroes are mapped to dense int ids once. Picks / wins / losses / bans are
+held as contiguous int32 arrays shaped (n_tournaments, n_heroes); the
+aggregated totals and every derived rate are computed lazily and cached.
+Arrays handed out are read-only, so consumers (sklearn, matplotlib) get
+them without copies.
+"""
+import numpy as np
+from functools import cached_property
+
+COUNT_FIELDS = ("picks", "wins", "losses", "bans")
+
+# Optional side counts: store field -> (tournament-row column, aggregated column)
+SIDE_FIELDS = {
+    "blue_picks": ("blue_total", "total_blue_picks"),
+    "blue_wins": ("blue_wins", "total_blue_wins"),
+    "red_picks": ("red_total", "total_red_picks"),
+    "red_wins": ("red_wins", "total_red_wins"),
+}
+
+# Normalized-dataset role -> Primary_Role used by the aggregated file
+ROLE_FALLBACK = {"Other": "Tank"}
+
+# Feature name -> HeroStats attribute (names match the aggregated CSV columns)
+FEATURE_ATTRS = {
+    "total_picks": "total_picks",
+    "total_wins": "total_wins",
+    "total_losses": "total_losses",
+    "total_bans": "total_bans",
+    "total_matches": "total_matches",
+    "overall_win_rate": "win_rate",
+    "ban_rate": "ban_rate",
+    "win_rate_lower": "win_rate_lower",
+    "win_rate_upper": "win_rate_upper",
+    "win_rate_shrunk": "win_rate_shrunk",
+    "blue_win_rate": "blue_win_rate",
+    "red_win_rate": "red_win_rate",
+    "side_bias": "side_bias",
+}
+
+
+def _readonly(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+class HeroStats:
+    """Hero x tournament counts keyed by dense integer hero ids"""
+
+    def __init__(self, heroes, roles, picks, wins, losses, bans, tournaments=None, years=None,
+                 sides=None):
+        self.heroes = list(heroes)
+        self.hero_index = {h: i for i, h in enumerate(self.heroes)}
+        self.tournaments = list(tournaments) if tournaments is not None else ["all"]
+        self.years = np.asarray(years if years is not None else [0], dtype=np.int16)
+
+        # Roles as small integer codes + lookup table
+        self.role_names = sorted(set(roles))
+        role_index = {r: i for i, r in enumerate(self.role_names)}
+        self.role_codes = _readonly(np.array([role_index[r] for r in roles], dtype=np.int8))
+
+        shape = (len(self.tournaments), len(self.heroes))
+        self.picks = _readonly(np.ascontiguousarray(picks, dtype=np.int32).reshape(shape))
+        self.wins = _readonly(np.ascontiguousarray(wins, dtype=np.int32).reshape(shape))
+        self.losses = _readonly(np.ascontiguousarray(losses, dtype=np.int32).reshape(shape))
+        self.bans = _readonly(np.ascontiguousarray(bans, dtype=np.int32).reshape(shape))
+
+        # Blue/red side counts (SIDE_FIELDS), only when the source has side columns
+        self.sides = {
+            k: _readonly(np.ascontiguousarray(v, dtype=np.int32).reshape(shape))
+            for k, v in (sides or {}).items()
+        }
+        self._features = {}
+
+    # ---------------------------
+    # Constructors
+    # ---------------------------
+    @classmethod
+    def from_aggregated(cls, df):
+        """Build from an aggregated frame (mlbb_heroes_aggregated.csv layout).
+
+        Hero ids follow the frame's row order, so arrays align with `df`.
+        """
+        sides = None
+        columns = [agg for _, agg in SIDE_FIELDS.values()]
+        if all(c in df.columns for c in columns) and df[columns].notna().any().any():     # all-NaN = no side data
+            sides = {k: df[agg].fillna(0).to_numpy() for k, (_, agg) in SIDE_FIELDS.items()}
+        return cls(
+            heroes=df["hero"].tolist(),
+            roles=df["Primary_Role"].tolist(),
+            picks=df["total_picks"].to_numpy(),
+            wins=df["total_wins"].to_numpy(),
+            losses=df["total_losses"].to_numpy(),
+            bans=df["total_bans"].to_numpy(),
+            sides=sides,
+        )
+
+    @classmethod
+    def from_tournament_rows(cls, df):
+        """Build from hero x tournament rows (mlbb_dataset_normalized.csv layout)"""
+        hero_codes, heroes = _factorize(df["hero"].to_numpy())
+        t_codes, tournaments = _factorize(df["tournament_title"].to_numpy(), sort=False)
+
+        shape = (len(tournaments), len(heroes))
+        counts = {}
+        for field, column in zip(COUNT_FIELDS, ("pick_total", "pick_wins", "pick_losses", "ban_count")):
+            arr = np.zeros(shape, dtype=np.int32)
+            np.add.at(arr, (t_codes, hero_codes), df[column].to_numpy(dtype=np.int32))
+            counts[field] = arr
+
+        # Side columns: rows from layouts without side stats are empty -> 0
+        sides = None
+        if all(col in df.columns for col, _ in SIDE_FIELDS.values()):
+            sides = {}
+            for field, (column, _) in SIDE_FIELDS.items():
+                arr = np.zeros(shape, dtype=np.int32)
+                np.add.at(arr, (t_codes, hero_codes), df[column].fillna(0).to_numpy(dtype=np.int32))
+                sides[field] = arr
+
+        years = np.zeros(len(tournaments), dtype=np.int16)
+        years[t_codes] = df["tournament_year"].to_numpy()
+
+        # Most frequent role per hero
+        role_codes, role_names = _factorize(df["Role_Normalized"].fillna("Other").to_numpy())
+        role_counts = np.zeros((len(heroes), len(role_names)), dtype=np.int32)
+        np.add.at(role_counts, (hero_codes, role_codes), 1)
+        roles = [ROLE_FALLBACK.get(r, r) for r in role_names[role_counts.argmax(axis=1)]]
+
+        return cls(heroes, roles, tournaments=tournaments, years=years, sides=sides, **counts)
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    def __len__(self):
+        return len(self.heroes)
+
+    def hero_id(self, hero):
+        return self.hero_index[hero]
+
+    def ids(self, heroes):
+        return np.fromiter((self.hero_index[h] for h in heroes), dtype=np.int32)
+
+    def role_mask(self, role):
+        """Boolean mask over hero ids for one Primary_Role"""
+        if role not in self.role_names:
+            return np.zeros(len(self.heroes), dtype=bool)
+        return self.role_codes == self.role_names.index(role)
+
+    def year_mask(self, start=None, end=None):
+        """Boolean mask over tournaments within [start, end]"""
+        mask = np.ones(len(self.tournaments), dtype=bool)
+        if start is not None:
+            mask &= self.years >= start
+        if end is not None:
+            mask &= self.years <= end
+        return mask
+
+    def window(self, start=None, end=None):
+        """New store holding only the tournaments of a year window"""
+        return self.select(self.year_mask(start, end))
+
+    def select(self, mask):
+        """New store holding only the tournaments where `mask` is True"""
+        mask = np.asarray(mask, dtype=bool)
+        roles = [self.role_names[c] for c in self.role_codes]
+        return HeroStats(
+            self.heroes, roles,
+            self.picks[mask], self.wins[mask], self.losses[mask], self.bans[mask],
+            tournaments=[t for t, keep in zip(self.tournaments, mask) if keep],
+            years=self.years[mask],
+            sides={k: v[mask] for k, v in self.sides.items()},
+        )
+
+    # ---------------------------
+    # Aggregated totals (lazy)
+    # ---------------------------
+    @cached_property
+    def total_picks(self):
+        return _readonly(self.picks.sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_wins(self):
+        return _readonly(self.wins.sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_losses(self):
+        return _readonly(self.losses.sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_bans(self):
+        return _readonly(self.bans.sum(axis=0, dtype=np.int32))
+
+    # ---------------------------
+    # Derived rates (lazy)
+    # ---------------------------
+    @cached_property
+    def total_matches(self):
+        return _readonly(self.total_picks + self.total_bans)
+
+    @cached_property
+    def ban_rate(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _readonly(self.total_bans / self.total_matches * 100)
+
+    @cached_property
+    def win_rate(self):
+        """Overall win rate in %, rounded like the aggregated CSV"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(self.total_picks > 0, self.total_wins / self.total_picks * 100, 0.0)
+        return _readonly(rate.round(2))
+
+    # ---------------------------
+    # Side stats (lazy)
+    # ---------------------------
+    @property
+    def has_sides(self):
+        return bool(self.sides)
+
+    @cached_property
+    def total_blue_picks(self):
+        return _readonly(self.sides["blue_picks"].sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_blue_wins(self):
+        return _readonly(self.sides["blue_wins"].sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_red_picks(self):
+        return _readonly(self.sides["red_picks"].sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def total_red_wins(self):
+        return _readonly(self.sides["red_wins"].sum(axis=0, dtype=np.int32))
+
+    @cached_property
+    def blue_win_rate(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            picks = self.total_blue_picks
+            return _readonly(np.where(picks > 0, self.total_blue_wins / picks * 100, np.nan).round(2))
+
+    @cached_property
+    def red_win_rate(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            picks = self.total_red_picks
+            return _readonly(np.where(picks > 0, self.total_red_wins / picks * 100, np.nan).round(2))
+
+    @cached_property
+    def side_bias(self):
+        """Blue minus red win rate in percentage points"""
+        return _readonly((self.blue_win_rate - self.red_win_rate).round(2))
+
+    @cached_property
+    def _win_rate_intervals(self):
+        from winrate_stats import win_rate_intervals
+
+        return {k: _readonly(v) for k, v in win_rate_intervals(self.total_wins, self.total_picks).items()}
+
+    @property
+    def win_rate_lower(self):
+        """Wilson 95% lower bound of the win rate in %"""
+        return self._win_rate_intervals["win_rate_lower"]
+
+    @property
+    def win_rate_upper(self):
+        return self._win_rate_intervals["win_rate_upper"]
+
+    @property
+    def win_rate_shrunk(self):
+        """Empirical-Bayes shrunk win rate in %"""
+        return self._win_rate_intervals["win_rate_shrunk"]
+
+    def feature_matrix(self, features):
+        """Cached (n_heroes, n_features) float64 matrix for sklearn"""
+        key = tuple(features)
+        if key not in self._features:
+            X = np.empty((len(self.heroes), len(key)), dtype=np.float64)
+            for j, name in enumerate(key):
+                X[:, j] = getattr(self, FEATURE_ATTRS[name])
+            self._features[key] = _readonly(X)
+        return self._features[key]
+
+    def group_means(self, labels, features):
+        """Per-label mean of each feature, as an (n_labels, n_features) array
+
+        Replaces repeated `df[df['cluster'] == k][col].mean()` scans with one
+        bincount per feature.
+        """
+        labels = np.asarray(labels)
+        n_groups = labels.max() + 1
+        sizes = np.bincount(labels, minlength=n_groups)
+        X = self.feature_matrix(features)
+        means = np.empty((n_groups, X.shape[1]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for j in range(X.shape[1]):
+                means[:, j] = np.bincount(labels, weights=X[:, j], minlength=n_groups) / sizes
+        return means
+
+    def to_frame(self):
+        """Aggregated view in the mlbb_heroes_aggregated.csv layout (+ derived columns)"""
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "hero": self.heroes,
+            "Primary_Role": [self.role_names[c] for c in self.role_codes],
+            "total_picks": self.total_picks,
+            "total_wins": self.total_wins,
+            "total_losses": self.total_losses,
+            "total_bans": self.total_bans,
+            "overall_win_rate": self.win_rate,
+            "total_matches": self.total_matches,
+            "ban_rate": self.ban_rate,
+        })
+        if self.has_sides:
+            for _, column in SIDE_FIELDS.values():
+                frame[column] = getattr(self, column)
+            frame["blue_win_rate"] = self.blue_win_rate
+            frame["red_win_rate"] = self.red_win_rate
+            frame["side_bias"] = self.side_bias
+        return frame
+
+
+def _factorize(values, sort=True):
+    """Return (codes, uniques) for a 1-D object array"""
+    if sort:
+        uniques, codes = np.unique(values, return_inverse=True)
+        return codes, uniques
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, np.array(list(index), dtype=object)
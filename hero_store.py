@@ -0,0 +1,240 @@
+"""Embedded analytical store (SQLite) over the hero x tournament data.
+
+Loads mlbb_dataset_normalized.csv-style rows into `tournament_stats`,
+indexed on hero, tournament_year and Role_Normalized, and keeps two
+pre-aggregated tables refreshed on every load (SQLite has no
+materialised views):
+
+    hero_totals       - one row per hero, same columns as mlbb_heroes_aggregated.csv
+    hero_year_totals  - one row per (hero, tournament_year), for year windows
+
+Usage:
+    python hero_store.py [normalized.csv] [db path]     build / rebuild the store
+    python hero_store.py query "SELECT ..."             ad hoc query
+"""
+import csv
+import os
+import sqlite3
+import sys
+
+DB_PATH = "mlbb_store.sqlite"
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+
+# Column -> SQLite type. Side / %T columns are optional in the CSV.
+COLUMNS = {
+    "hero": "TEXT NOT NULL",
+    "pick_total": "INTEGER",
+    "pick_wins": "INTEGER",
+    "pick_losses": "INTEGER",
+    "ban_count": "INTEGER",
+    "win_rate": "REAL",
+    "tournament_year": "INTEGER",
+    "tournament_title": "TEXT",
+    "tournament_url": "TEXT",
+    "Lane": "TEXT",
+    "Role_Normalized": "TEXT",
+    "blue_total": "INTEGER",
+    "blue_wins": "INTEGER",
+    "blue_losses": "INTEGER",
+    "red_total": "INTEGER",
+    "red_wins": "INTEGER",
+    "red_losses": "INTEGER",
+    "pick_pct": "REAL",
+    "ban_pct": "REAL",
+    "pb_total": "INTEGER",
+    "pb_pct": "REAL",
+}
+INTEGER_COLUMNS = {c for c, t in COLUMNS.items() if t.startswith("INTEGER")}
+REAL_COLUMNS = {c for c, t in COLUMNS.items() if t.startswith("REAL")}
+
+SCHEMA = f"""
+DROP TABLE IF EXISTS tournament_stats;
+CREATE TABLE tournament_stats ({", ".join(f"{c} {t}" for c, t in COLUMNS.items())});
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_stats_hero ON tournament_stats(hero);
+CREATE INDEX IF NOT EXISTS idx_stats_year ON tournament_stats(tournament_year);
+CREATE INDEX IF NOT EXISTS idx_stats_role ON tournament_stats(Role_Normalized);
+CREATE INDEX IF NOT EXISTS idx_stats_role_year ON tournament_stats(Role_Normalized, tournament_year);
+"""
+
+# Primary_Role = most frequent Role_Normalized (ties: alphabetical), 'Other' -> 'Tank',
+# the same rule hero_stats.HeroStats uses.
+REFRESH_AGGREGATES = """
+DROP TABLE IF EXISTS hero_roles;
+CREATE TABLE hero_roles AS
+WITH role_counts AS (
+    SELECT hero, COALESCE(Role_Normalized, 'Other') AS role, COUNT(*) AS n
+    FROM tournament_stats GROUP BY hero, role
+), ranked AS (
+    SELECT hero, role, ROW_NUMBER() OVER (PARTITION BY hero ORDER BY n DESC, role) AS rn
+    FROM role_counts
+)
+SELECT hero, CASE role WHEN 'Other' THEN 'Tank' ELSE role END AS Primary_Role
+FROM ranked WHERE rn = 1;
+CREATE UNIQUE INDEX idx_roles_hero ON hero_roles(hero);
+
+DROP TABLE IF EXISTS hero_year_totals;
+CREATE TABLE hero_year_totals AS
+SELECT s.hero, r.Primary_Role, s.tournament_year,
+       SUM(pick_total) AS total_picks, SUM(pick_wins) AS total_wins,
+       SUM(pick_losses) AS total_losses, SUM(ban_count) AS total_bans,
+       SUM(blue_total) AS total_blue_picks, SUM(blue_wins) AS total_blue_wins,
+       SUM(red_total) AS total_red_picks, SUM(red_wins) AS total_red_wins,
+       COUNT(*) AS tournaments
+FROM tournament_stats s JOIN hero_roles r USING (hero)
+GROUP BY s.hero, s.tournament_year;
+CREATE INDEX idx_year_totals_year ON hero_year_totals(tournament_year);
+CREATE INDEX idx_year_totals_role ON hero_year_totals(Primary_Role, tournament_year);
+
+DROP TABLE IF EXISTS hero_totals;
+CREATE TABLE hero_totals AS
+SELECT hero, Primary_Role,
+       SUM(total_picks) AS total_picks, SUM(total_wins) AS total_wins,
+       SUM(total_losses) AS total_losses, SUM(total_bans) AS total_bans,
+       ROUND(CASE WHEN SUM(total_picks) > 0
+                  THEN SUM(total_wins) * 100.0 / SUM(total_picks) ELSE 0 END, 2) AS overall_win_rate,
+       SUM(total_blue_picks) AS total_blue_picks, SUM(total_blue_wins) AS total_blue_wins,
+       SUM(total_red_picks) AS total_red_picks, SUM(total_red_wins) AS total_red_wins
+FROM hero_year_totals
+GROUP BY hero ORDER BY hero;
+CREATE UNIQUE INDEX idx_totals_hero ON hero_totals(hero);
+"""
+
+# Column list of the aggregated CSV
+AGGREGATED_COLUMNS = ["hero", "Primary_Role", "total_picks", "total_wins",
+                      "total_losses", "total_bans", "overall_win_rate"]
+SIDE_COLUMNS = ["total_blue_picks", "total_blue_wins", "total_red_picks", "total_red_wins"]
+
+
+# ---------------------------
+# Build
+# ---------------------------
+def connect(db_path=DB_PATH, read_only=False):
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def _convert(column, value):
+    if value is None or value == "":
+        return None
+    if column in INTEGER_COLUMNS:
+        return int(float(value))
+    if column in REAL_COLUMNS:
+        return float(value)
+    return value
+
+
+def build_store(csv_path=NORMALIZED_CSV, db_path=DB_PATH):
+    """(Re)load the normalized CSV into the store and refresh the aggregates"""
+    conn = connect(db_path)
+    with conn:
+        conn.executescript(SCHEMA)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            columns = [c for c in reader.fieldnames if c in COLUMNS]
+            placeholders = ", ".join("?" for _ in columns)
+            conn.executemany(
+                f"INSERT INTO tournament_stats ({', '.join(columns)}) VALUES ({placeholders})",
+                ([_convert(c, row[c]) for c in columns] for row in reader),
+            )
+        conn.executescript(INDEXES)
+        refresh_aggregates(conn)
+    conn.execute("ANALYZE")
+    return conn
+
+
+def refresh_aggregates(conn):
+    """Rebuild hero_roles / hero_year_totals / hero_totals from tournament_stats"""
+    conn.executescript(REFRESH_AGGREGATES)
+
+
+def is_stale(db_path=DB_PATH, csv_path=NORMALIZED_CSV):
+    """True if the store is missing or older than its source CSV"""
+    if not os.path.exists(db_path):
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(db_path)
+
+
+# ---------------------------
+# Queries
+# ---------------------------
+def _where(roles=None, start_year=None, end_year=None, heroes=None, title_like=None,
+           role_column="Role_Normalized"):
+    clauses, params = [], []
+    if roles:
+        clauses.append(f"{role_column} IN ({', '.join('?' for _ in roles)})")
+        params.extend(roles)
+    if start_year is not None:
+        clauses.append("tournament_year >= ?")
+        params.append(start_year)
+    if end_year is not None:
+        clauses.append("tournament_year <= ?")
+        params.append(end_year)
+    if heroes:
+        clauses.append(f"hero IN ({', '.join('?' for _ in heroes)})")
+        params.extend(heroes)
+    if title_like:
+        clauses.append("tournament_title LIKE ?")
+        params.append(title_like)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query(conn, sql, params=()):
+    """Run SQL and return a pandas DataFrame"""
+    import pandas as pd
+
+    return pd.read_sql_query(sql, conn, params=list(params))
+
+
+def load_aggregated(conn, with_sides=False):
+    """Pre-aggregated per-hero totals (mlbb_heroes_aggregated.csv layout)"""
+    columns = AGGREGATED_COLUMNS + (SIDE_COLUMNS if with_sides else [])
+    return query(conn, f"SELECT {', '.join(columns)} FROM hero_totals ORDER BY hero")
+
+
+def aggregate_window(conn, start_year=None, end_year=None, roles=None):
+    """Per-hero totals for a year window, summed from hero_year_totals"""
+    where, params = _where(roles, start_year, end_year, role_column="Primary_Role")
+    return query(conn, f"""
+        SELECT hero, Primary_Role,
+               SUM(total_picks) AS total_picks, SUM(total_wins) AS total_wins,
+               SUM(total_losses) AS total_losses, SUM(total_bans) AS total_bans,
+               ROUND(CASE WHEN SUM(total_picks) > 0
+                          THEN SUM(total_wins) * 100.0 / SUM(total_picks) ELSE 0 END, 2) AS overall_win_rate
+        FROM hero_year_totals{where}
+        GROUP BY hero ORDER BY hero
+    """, params)
+
+
+def load_tournament_rows(conn, roles=None, start_year=None, end_year=None, heroes=None, title_like=None):
+    """Filtered hero x tournament rows, e.g. Fighters in MPL PH since 2023:
+
+        load_tournament_rows(conn, roles=["Fighter"], start_year=2023,
+                             title_like="MPL Philippines%")
+    """
+    where, params = _where(roles, start_year, end_year, heroes, title_like)
+    return query(conn, f"SELECT * FROM tournament_stats{where}", params)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "query":
+        conn = connect(DB_PATH, read_only=True)
+        try:
+            print(query(conn, sys.argv[2]).to_string(index=False))
+        finally:
+            conn.close()
+        sys.exit(0)
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else NORMALIZED_CSV
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+    conn = build_store(csv_path, db_path)
+    rows = conn.execute("SELECT COUNT(*) FROM tournament_stats").fetchone()[0]
+    heroes = conn.execute("SELECT COUNT(*) FROM hero_totals").fetchone()[0]
+    conn.close()
+    print(f"Loaded {rows} rows ({heroes} heroes) from {csv_path} into {db_path}")
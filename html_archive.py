@@ -0,0 +1,158 @@
+"""Content-addressed archive of fetched Liquipedia pages.
+
+Pages are stored once per SHA-256 of their raw bytes under
+objects/<2 hex>/<digest>.<codec>, compressed with zstd (optionally with a
+trained dictionary, which suits many near-identical wiki pages) or zlib
+when the zstandard package is not installed. index.jsonl records every
+fetch (url, digest, codec, time) so the latest copy of each URL can be
+re-parsed offline.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+try:
+    import zstandard as zstd
+except ImportError:         # optional dependency
+    zstd = None
+
+ARCHIVE_DIR = "html_archive"
+ZSTD_LEVEL = 10
+DICT_SIZE = 112640          # 110 KB, zstd's default dictionary size
+DICT_SAMPLES = 200
+
+
+class HtmlArchive:
+    def __init__(self, root=ARCHIVE_DIR, level=ZSTD_LEVEL):
+        self.root = root
+        self.level = level
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._dicts = {}
+
+        self.current_path = os.path.join(root, "current-dict")
+        self.dict_id = self._current_dict()
+
+    def _current_dict(self):
+        """Id of the dictionary new writes use: the one train_dictionary() last recorded
+
+        Ids are random, so archives from before the current-dict file fall back
+        to the most recently written dictionary.
+        """
+        if os.path.exists(self.current_path):
+            with open(self.current_path, encoding="utf-8") as f:
+                return int(f.read().strip())
+        dicts = [name for name in os.listdir(self.root) if name.startswith("dict-") and name.endswith(".zstd")]
+        if not dicts:
+            return None
+        newest = max(dicts, key=lambda name: os.path.getmtime(os.path.join(self.root, name)))
+        return int(newest[5:-5])
+
+    # ---------------------------
+    # Codecs
+    # ---------------------------
+    def _dictionary(self, dict_id):
+        if dict_id not in self._dicts:
+            with open(os.path.join(self.root, f"dict-{dict_id}.zstd"), "rb") as f:
+                self._dicts[dict_id] = zstd.ZstdCompressionDict(f.read())
+        return self._dicts[dict_id]
+
+    def _compress(self, data):
+        if zstd is None:
+            return "zz", zlib.compress(data, 9)
+        if self.dict_id is not None:
+            cctx = zstd.ZstdCompressor(level=self.level, dict_data=self._dictionary(self.dict_id))
+            return f"zd{self.dict_id}", cctx.compress(data)
+        return "zst", zstd.ZstdCompressor(level=self.level).compress(data)
+
+    def _decompress(self, codec, blob):
+        if codec == "zz":
+            return zlib.decompress(blob)
+        if zstd is None:
+            raise RuntimeError(f"zstandard is required to read '{codec}' archive objects")
+        if codec == "zst":
+            return zstd.ZstdDecompressor().decompress(blob)
+        dctx = zstd.ZstdDecompressor(dict_data=self._dictionary(int(codec[2:])))
+        return dctx.decompress(blob)
+
+    def _object_path(self, digest, codec):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.{codec}")
+
+    def _find_object(self, digest):
+        folder = os.path.join(self.root, "objects", digest[:2])
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.startswith(digest + "."):
+                    return name.split(".", 1)[1]
+        return None
+
+    # ---------------------------
+    # Read / write
+    # ---------------------------
+    def put(self, url, data):
+        """Store raw page bytes (deduplicated by content) and log the fetch"""
+        digest = hashlib.sha256(data).hexdigest()
+        codec = self._find_object(digest)
+
+        if codec is None:
+            codec, blob = self._compress(data)
+            path = self._object_path(digest, codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+
+        entry = {"url": url, "sha256": digest, "codec": codec,
+                 "size": len(data), "fetched_at": int(time.time())}
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def get(self, entry):
+        """Raw page bytes for an index entry"""
+        with open(self._object_path(entry["sha256"], entry["codec"]), "rb") as f:
+            return self._decompress(entry["codec"], f.read())
+
+    def entries(self):
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def latest(self):
+        """{url: newest index entry}"""
+        return {e["url"]: e for e in self.entries()}
+
+    # ---------------------------
+    # Dictionary training
+    # ---------------------------
+    def train_dictionary(self, size=DICT_SIZE, samples=DICT_SAMPLES):
+        """Train a zstd dictionary on archived pages; new writes use it"""
+        if zstd is None:
+            raise RuntimeError("zstandard is required to train a dictionary")
+        pages = [self.get(e) for e in list(self.latest().values())[-samples:]]
+        if not pages:
+            raise RuntimeError("Archive is empty")
+
+        trained = zstd.train_dictionary(size, pages)
+        dict_id = trained.dict_id()
+        path = os.path.join(self.root, f"dict-{dict_id}.zstd")
+        with open(path + ".tmp", "wb") as f:
+            f.write(trained.as_bytes())
+        os.replace(path + ".tmp", path)
+        with open(self.current_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(str(dict_id))
+        os.replace(self.current_path + ".tmp", self.current_path)
+        self.dict_id = dict_id
+        return dict_id
+
+    def stats(self):
+        """(objects, raw bytes, stored bytes) for the latest copy of every URL"""
+        latest = self.latest().values()
+        stored = sum(os.path.getsize(self._object_path(e["sha256"], e["codec"])) for e in latest)
+        return len(latest), sum(e["size"] for e in latest), stored
@@ -6,14 +6,31 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 from sklearn.decomposition import PCA
+from hero_stats import HeroStats
+from hero_analysis import CATEGORY_COLOR_MAP, categorize_clusters
+from winrate_stats import add_win_rate_intervals
+from clustering import fit_clusters
+from patches import PATCH_AGGREGATES, PatchAggregates, current_patch_view
+from cluster_stability import bootstrap_stability, hero_confidence_frame, summarize
+from role_clustering import fit_role_clusters, tier_list
+import hero_store
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
-# Load dataset
-df = pd.read_csv('mlbb_heroes_aggregated.csv')
+# Load dataset (pre-aggregated totals from the store when it is up to date)
+if not hero_store.is_stale():
+    conn = hero_store.connect(hero_store.DB_PATH, read_only=True)
+    try:
+        df = hero_store.load_aggregated(conn)
+    finally:
+        conn.close()
+else:
+    df = pd.read_csv('mlbb_heroes_aggregated.csv')
 
-df['total_matches'] = df['total_picks'] + df['total_bans']
-df['ban_rate'] = df['total_bans'] / df['total_matches'] * 100
+stats = HeroStats.from_aggregated(df)
+df['total_matches'] = stats.total_matches
+df['ban_rate'] = stats.ban_rate
 
 print("Dataset Shape:", df.shape)
 print("\nFirst 5 rows:")
@@ -116,7 +133,7 @@ plt.title('Correlation Matrix')
 plt.show()
 
 features = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
-X = df[features].copy()
+X = stats.feature_matrix(features)
 
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
@@ -162,48 +179,26 @@ plt.show()
 optimal_k = 5
 print(f"\nUsing K = {optimal_k} clusters (as specified)")
 
-# Apply K-Means with K=5
-kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
-clusters = kmeans.fit_predict(X_scaled)
+# Clustering engine: any key of clustering.ENGINES ('K-Means', 'Gaussian Mixture', ...)
+clustering_engine = 'K-Means'
+clustering = fit_clusters(clustering_engine, X_scaled, optimal_k)
+clusters = clustering.labels
 
 df['cluster'] = clusters
 
 print("\nCluster Distribution:")
 print(df['cluster'].value_counts().sort_index())
 
-# Determine category for each cluster first
-cluster_categories = {}
-cluster_colors = {}
-category_color_map = {
-    "META": "#FF4444",
-    "PRIORITY BAN": "#FF8800",
-    "POPULAR BUT WEAK": "#FFDD00",
-    "HIGH WIN RATE": "#44FF44",
-    "SITUATIONAL": "#4444FF"
-}
+# Win rate used by the META / HIGH WIN RATE rules: 'overall_win_rate',
+# 'win_rate_lower' (Wilson 95% lower bound) or 'win_rate_shrunk'
+category_win_rate = 'overall_win_rate'
 
-for cluster_id in sorted(df['cluster'].unique()):
-    cluster_data = df[df['cluster'] == cluster_id]
-    
-    avg_picks = cluster_data['total_picks'].mean()
-    avg_bans = cluster_data['total_bans'].mean()
-    avg_winrate = cluster_data['overall_win_rate'].mean()
-    avg_banrate = cluster_data['ban_rate'].mean()
-    
-    # Determine cluster category
-    if avg_picks > 1000 and avg_winrate > 52:
-        category = "META"
-    elif avg_bans > 500 and avg_banrate > 40:
-        category = "PRIORITY BAN"
-    elif avg_picks > 500 and avg_winrate < 48:
-        category = "POPULAR BUT WEAK"
-    elif avg_winrate > 54:
-        category = "HIGH WIN RATE"
-    else:
-        category = "SITUATIONAL"
-    
-    cluster_categories[cluster_id] = category
-    cluster_colors[cluster_id] = category_color_map[category]
+# Per-cluster feature means in one pass (same order as `features`)
+cluster_means = stats.group_means(clusters, features)
+
+# Determine category for each cluster first
+category_color_map = CATEGORY_COLOR_MAP
+cluster_categories, cluster_colors = categorize_clusters(stats, clusters, category_win_rate)
 
 # Add category to dataframe
 df['category'] = df['cluster'].map(cluster_categories)
@@ -253,7 +248,7 @@ plt.ylabel(f'Principal Component 2 ({pca.explained_variance_ratio_[1]:.1%} varia
 plt.grid(True, alpha=0.3)
 
 # Plot cluster centers
-centers_pca = pca.transform(kmeans.cluster_centers_)
+centers_pca = pca.transform(clustering.centers)
 plt.scatter(centers_pca[:, 0], centers_pca[:, 1], 
            c='white', s=400, marker='X', 
            edgecolors='black', linewidths=3,
@@ -270,10 +265,7 @@ print("="*70)
 for cluster_id in sorted(df['cluster'].unique()):
     cluster_data = df[df['cluster'] == cluster_id]
     
-    avg_picks = cluster_data['total_picks'].mean()
-    avg_bans = cluster_data['total_bans'].mean()
-    avg_winrate = cluster_data['overall_win_rate'].mean()
-    avg_banrate = cluster_data['ban_rate'].mean()
+    avg_picks, avg_bans, avg_winrate, avg_banrate = cluster_means[cluster_id]
     
     category = cluster_categories[cluster_id]
     
@@ -295,6 +287,54 @@ print(f"  Number of clusters: {optimal_k}")
 print(f"  Total heroes clustered: {len(df)}")
 print(f"{'='*70}")
 
+# Cluster stability over bootstrap resamples (serial here; `python cluster_stability.py`
+# runs B=500 across a process pool)
+stability = bootstrap_stability(X_scaled, optimal_k, n_boot=100, workers=1, reference=clusters)
+df['cluster_confidence'] = stability['confidence']
+print(f"\nCLUSTER STABILITY:")
+print(f"  {summarize(stability)}")
+print(hero_confidence_frame(stats.heroes, stability).head(10).to_string(index=False))
+
 # Print category distribution
 print(f"\nCATEGORY DISTRIBUTION:")
-print(df['category'].value_counts())
\ No newline at end of file
+print(df['category'].value_counts())
+
+# Per-role tier lists: each Primary_Role clustered on its own (`python role_clustering.py --lane`
+# also splits by lane, from the normalized rows)
+role_df, role_results, _ = fit_role_clusters(df, optimal_k, clustering_engine, category_win_rate, workers=1)
+print(f"\n{'='*70}")
+print(f"PER-ROLE TIER LISTS")
+print(f"{'='*70}")
+print(tier_list(role_df).to_string(index=False, max_colwidth=80))
+
+# Win rate reliability: heroes that look strong only because of small samples
+add_win_rate_intervals(df)
+suspect = df[(df['overall_win_rate'] > 52) & (df['win_rate_lower'] < 50)]
+print(f"\n{'='*70}")
+print(f"WIN RATE RELIABILITY (raw > 52% but Wilson lower bound < 50%): {len(suspect)} heroes")
+print(f"{'='*70}")
+print(suspect.sort_values('total_picks')[['hero', 'total_picks', 'overall_win_rate',
+                                          'win_rate_lower', 'win_rate_upper', 'win_rate_shrunk']].to_string(index=False))
+
+# Current patch META (needs `python patches.py build`)
+if os.path.exists(PATCH_AGGREGATES):
+    patch, patch_df = current_patch_view(PatchAggregates.load(), optimal_k, clustering_engine, category_win_rate)
+    print(f"\n{'='*70}")
+    print(f"CURRENT PATCH {patch}: {len(patch_df)} heroes played")
+    print(f"{'='*70}")
+    print(patch_df['category'].value_counts().to_string())
+    meta = patch_df[patch_df['category'] == 'META'].sort_values('total_picks', ascending=False)
+    print(meta[['hero', 'Primary_Role', 'total_picks', 'overall_win_rate', 'ban_rate']].to_string(index=False)
+          if len(meta) else "  No META heroes on this patch")
+
+# Side bias (datasets scraped with the Blue/Red side columns)
+if stats.has_sides:
+    df['blue_win_rate'] = stats.blue_win_rate
+    df['red_win_rate'] = stats.red_win_rate
+    df['side_bias'] = stats.side_bias
+    side_df = df[(df['total_blue_picks'] >= 20) & (df['total_red_picks'] >= 20)]
+    print(f"\n{'='*70}")
+    print(f"SIDE BIAS (blue - red win rate, >= 20 picks per side)")
+    print(f"{'='*70}")
+    print(side_df.sort_values('side_bias', key=abs, ascending=False)
+          [['hero', 'blue_win_rate', 'red_win_rate', 'side_bias']].head(15).to_string(index=False))
\ No newline at end of file
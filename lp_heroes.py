@@ -1,6 +1,11 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from functools import lru_cache
 import csv
+import json
+import os
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -26,72 +31,189 @@ headers = {
 }
 
 BASE = "https://liquipedia.net"
+API = f"{BASE}/mobilelegends/api.php"
+
+REQUEST_TIMEOUT = 20
+RETRIES = 3
+MAX_THREADS = 15
+REGISTRY_FILE = "mlbb_heroes_registry.json"
+OUTPUT_CSV = "mlbb_heroes.csv"
+
+
+# ---------------------------------
+# HTTP session (pooled connections + retries)
+# ---------------------------------
+def make_session():
+    """Session that reuses connections across all hero page requests"""
+    session = requests.Session()
+    retry = Retry(total=RETRIES, backoff_factor=1.5,
+                  status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_THREADS, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    session.cookies.update(cookies)
+    return session
+
+
+# ---------------------------------
+# Hero registry (cache between runs)
+# ---------------------------------
+def load_registry(path=REGISTRY_FILE):
+    """Return {Portal title: {"url", "revid", "Name", "Role", "Lane"}} from the last run
+
+    "Name" is the name in the hero page's infobox.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("heroes", {})
+
+
+def save_registry(registry, path=REGISTRY_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated": int(time.time()), "heroes": registry}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def hero_lookup(path=REGISTRY_FILE):
+    """Importable lookup table: lowercase hero name -> {"Name", "Role", "Lane"}
+
+    Keys match the lowercase `hero` column used by the datasets: the Portal
+    title, plus the infobox name where it differs.
+    """
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    return _hero_lookup(path, mtime)
+
+
+@lru_cache(maxsize=4)
+def _hero_lookup(path, mtime):
+    lookup = {}
+    for title, meta in load_registry(path).items():
+        entry = {"Name": meta.get("Name") or title, "Role": meta.get("Role"), "Lane": meta.get("Lane")}
+        lookup[title.lower()] = entry
+        lookup.setdefault(entry["Name"].lower(), entry)
+    return lookup
+
 
 # ---------------------------------
 # STEP 1 — Fetch hero list
 # ---------------------------------
-print("Fetching hero list...")
-resp = requests.get(f"{BASE}/mobilelegends/Portal:Heroes", headers=headers, cookies=cookies)
-soup = BeautifulSoup(resp.text, "html.parser")
+def fetch_hero_list(session):
+    print("Fetching hero list...")
+    resp = session.get(f"{BASE}/mobilelegends/Portal:Heroes", timeout=REQUEST_TIMEOUT)
+    soup = BeautifulSoup(resp.text, "html.parser")
 
-all_heroes_header = soup.find("div", string=lambda s: s and "All Heroes" in s)
-if not all_heroes_header:
-    raise Exception("Cannot find All Heroes grid")
+    all_heroes_header = soup.find("div", string=lambda s: s and "All Heroes" in s)
+    if not all_heroes_header:
+        raise Exception("Cannot find All Heroes grid")
 
-hero_grid = all_heroes_header.find_next("div")
+    hero_grid = all_heroes_header.find_next("div")
 
-hero_links = []
-for a in hero_grid.select("div.sapphire-theme-dark-bg.zoom-container > a"):
-    href = a.get("href")
-    title = a.get("title")
-    if href and title:
-        hero_links.append({
-            "name": title.strip(),
-            "url": BASE + href
-        })
+    hero_links = []
+    for a in hero_grid.select("div.sapphire-theme-dark-bg.zoom-container > a"):
+        href = a.get("href")
+        title = a.get("title")
+        if href and title:
+            hero_links.append({
+                "name": title.strip(),
+                "url": BASE + href
+            })
 
-print(f"Heroes found: {len(hero_links)}")   # should be 130
+    print(f"Heroes found: {len(hero_links)}")   # should be 130
+    return hero_links
 
 
 # ---------------------------------
-# STEP 2 — Parse a hero page
+# STEP 2 — Detect changed pages
 # ---------------------------------
-def parse_hero_page(hero):
+def fetch_revisions(session, titles):
+    """Return {page title: last revision id} using batched MediaWiki API calls"""
+    revisions = {}
+    for i in range(0, len(titles), 50):     # API limit: 50 titles per query
+        batch = titles[i:i + 50]
+        resp = session.get(API, params={
+            "action": "query",
+            "prop": "info",
+            "titles": "|".join(batch),
+            "format": "json",
+        }, timeout=REQUEST_TIMEOUT)
+        data = resp.json().get("query", {})
 
-    url = hero["url"]
+        # Map normalized titles (e.g. underscores) back to what we asked for
+        renamed = {n["to"]: n["from"] for n in data.get("normalized", [])}
+        for page in data.get("pages", {}).values():
+            title = renamed.get(page.get("title"), page.get("title"))
+            if "lastrevid" in page:
+                revisions[title] = page["lastrevid"]
+    return revisions
 
-    try:
-        resp = requests.get(url, headers=headers, cookies=cookies)
-        soup = BeautifulSoup(resp.text, "html.parser")
 
-        # Extract name cleanly (remove [e][h])
-        header = soup.find("div", class_="infobox-header")
+def heroes_to_refresh(hero_links, registry, revisions):
+    """Heroes that are new since the last run, whose page revision changed or without an infobox name"""
+    stale = []
+    for hero in hero_links:
+        cached = registry.get(hero["name"])
+        if (cached is None
+                or "Name" not in cached
+                or cached.get("revid") is None
+                or cached.get("revid") != revisions.get(hero["name"])):
+            stale.append(hero)
+    return stale
 
-        if header:
-            for btn in header.find_all("span", class_="infobox-buttons"):
-                btn.decompose()     # removes [e][h]
 
-            hero_name = header.get_text(strip=True)
-        else:
-            hero_name = hero["name"]
+# ---------------------------------
+# STEP 3 — Parse a hero page (infobox only)
+# ---------------------------------
+INFOBOX_ONLY = SoupStrainer("div", class_="fo-nttax-infobox")
+
+
+def parse_infobox(html, fallback_name):
+    """Return (name, role, lane) from the infobox block of a hero page"""
+    soup = BeautifulSoup(html, "html.parser", parse_only=INFOBOX_ONLY)
+    if not soup.find("div", class_="infobox-header"):
+        # Infobox wrapper renamed: fall back to parsing the whole page
+        soup = BeautifulSoup(html, "html.parser")
+
+    header = soup.find("div", class_="infobox-header")
+    if header:
+        # Skip the [e][h] edit buttons without mutating the tree
+        hero_name = "".join(
+            s for s in header.find_all(string=True)
+            if not s.find_parent("span", class_="infobox-buttons")
+        ).strip()
+    else:
+        hero_name = fallback_name
+
+    role = None
+    lane = None
+
+    for desc in soup.find_all("div", class_="infobox-cell-2 infobox-description"):
+        label = desc.get_text(strip=True)
+        value_div = desc.find_next_sibling("div")
+
+        if not value_div:
+            continue
+
+        value = value_div.get_text(" ", strip=True)
+
+        if label == "Role:":
+            role = value
 
-        role = None
-        lane = None
+        if label == "Lane:":
+            lane = value
 
-        for desc in soup.find_all("div", class_="infobox-cell-2 infobox-description"):
-            label = desc.get_text(strip=True)
-            value_div = desc.find_next_sibling("div")
+    return hero_name or fallback_name, role, lane
 
-            if not value_div:
-                continue
-            
-            value = value_div.get_text(" ", strip=True)
 
-            if label == "Role:":
-                role = value
+def parse_hero_page(session, hero):
 
-            if label == "Lane:":
-                lane = value
+    url = hero["url"]
+
+    try:
+        resp = session.get(url, timeout=REQUEST_TIMEOUT)
+        hero_name, role, lane = parse_infobox(resp.content, hero["name"])
 
         print("✓", hero_name)
         return {"Name": hero_name, "Role": role, "Lane": lane}
@@ -102,26 +224,64 @@ def parse_hero_page(hero):
 
 
 # ---------------------------------
-# STEP 3 — Multithreaded scraping
+# STEP 4 — Incremental refresh
 # ---------------------------------
-dataset = []
-MAX_THREADS = 15
+def refresh_registry(session=None, registry_path=REGISTRY_FILE, max_threads=MAX_THREADS):
+    """Update the cached registry, scraping only new or changed hero pages"""
+    session = session or make_session()
+    registry = load_registry(registry_path)
+    hero_links = fetch_hero_list(session)
+
+    try:
+        revisions = fetch_revisions(session, [h["name"] for h in hero_links])
+    except (requests.RequestException, ValueError) as e:
+        print("⚠ Revision lookup failed, refreshing every hero:", str(e)[:80])
+        revisions = {}
+
+    stale = heroes_to_refresh(hero_links, registry, revisions)
+    listed = {h["name"] for h in hero_links}
+    removed = [title for title in registry if title not in listed] if listed else []
+    for title in removed:
+        del registry[title]
+    print(f"Heroes to refresh: {len(stale)} (cached: {len(hero_links) - len(stale)}, "
+          f"removed from the portal: {len(removed)})")
+
+    if stale:
+        print("Scraping hero pages with threads...")
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            future_to_hero = {executor.submit(parse_hero_page, session, h): h for h in stale}
 
-print("Scraping hero pages with threads...")
+            for f in as_completed(future_to_hero):
+                hero = future_to_hero[f]
+                result = f.result()
+                registry[hero["name"]] = {
+                    "url": hero["url"],
+                    # Failed pages keep no revid so they are retried next run
+                    "revid": revisions.get(hero["name"]) if result["Role"] else None,
+                    "Name": result["Name"],
+                    "Role": result["Role"],
+                    "Lane": result["Lane"],
+                }
 
-with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-    futures = [executor.submit(parse_hero_page, hero) for hero in hero_links]
-    
-    for f in as_completed(futures):
-        dataset.append(f.result())
+    if stale or removed:
+        save_registry(registry, registry_path)
+
+    return registry
 
 
 # ---------------------------------
-# STEP 4 — Save CSV
+# STEP 5 — Save CSV
 # ---------------------------------
-with open("mlbb_heroes.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=["Name", "Role", "Lane"])
-    writer.writeheader()
-    writer.writerows(dataset)
+def write_csv(registry, path=OUTPUT_CSV):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Name", "Role", "Lane"])
+        writer.writeheader()
+        for title in sorted(registry):
+            meta = registry[title]
+            writer.writerow({"Name": meta.get("Name") or title, "Role": meta.get("Role"), "Lane": meta.get("Lane")})
+
 
-print("DONE! Saved: mlbb_heroes.csv")
\ No newline at end of file
+if __name__ == "__main__":
+    registry = refresh_registry()
+    write_csv(registry)
+    print(f"DONE! Saved: {OUTPUT_CSV} ({len(registry)} heroes, registry: {REGISTRY_FILE})")
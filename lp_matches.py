@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""Per-game draft scraper: picks, bans, sides and winner of every match.
+
+Walks each tournament's main page and its stage subpages (Group_Stage,
+Playoffs, ...) and reads the match popups (`brkts-popup`) of the brackets
+and matchlists. Every game becomes one row of small integer arrays, with
+the two opponents in the order of the match header ("slot" 0 and 1):
+
+    picks    (G, 2, 5) uint8    hero ids per slot, in the order listed
+    bans     (G, 2, 5) uint8    hero ids per slot, 0 = no ban
+    blue     (G,)      int8     slot on the blue side, -1 = unknown
+    winner   (G,)      int8     winning slot, -1 = unknown
+    teams    (G, 2)    uint16   index into team_names
+    match    (G,)      uint32   match number within the tournament
+    game     (G,)      uint8    game number within the match
+
+Hero id 0 is an empty slot; id i is hero_names[i - 1]. Games are grouped
+by tournament: tournament i owns rows offsets[i]:offsets[i + 1].
+
+Pages already in the HTML archive are not refetched (--refresh forces it).
+Each finished tournament is saved to DRAFTS_PARTS_DIR and recorded in the
+progress file, so an interrupted run resumes where it stopped.
+
+    python lp_matches.py [scrape] [--refresh] [--workers N]
+    python lp_matches.py merge
+    python lp_matches.py show <tournament title>
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import lp_tournament
+from lp_tournament import VALID_HEROES, VALID_HEROES_LOWER
+
+DRAFTS_NPZ = "mlbb_drafts.npz"
+DRAFTS_PARTS_DIR = "drafts"
+PROGRESS_FILE = os.path.join(DRAFTS_PARTS_DIR, "progress.json")
+SLOTS = 5                   # picks / bans per team per game
+LIQUIPEDIA = "https://liquipedia.net"
+
+# Stage subpages that never hold matches
+SKIP_SUBPAGES = {"Statistics", "Results", "Participants", "Broadcasts"}
+
+
+# ---------------------------
+# Page discovery and fetching
+# ---------------------------
+def main_page_url(tournament: Dict) -> str:
+    return tournament["url"].rsplit("/Statistics", 1)[0]
+
+
+def stage_urls(html: bytes, base_url: str) -> List[str]:
+    """Subpages of the tournament linked from its main page (Group_Stage, Playoffs, ...)"""
+    from bs4 import BeautifulSoup
+
+    prefix = urlsplit(base_url).path + "/"
+    urls = []
+    for a in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+        path = a["href"].split("#", 1)[0].split("?", 1)[0]
+        if not path.startswith(prefix):
+            continue
+        rest = path[len(prefix):]
+        if rest and ":" not in rest and rest.split("/", 1)[0] not in SKIP_SUBPAGES:
+            url = LIQUIPEDIA + path
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def get_page(url: str, latest: Dict, refresh=False):
+    """Raw page from the archive, or fetched (and archived); None when unreachable"""
+    archive = lp_tournament.get_archive()
+    entry = None if refresh else latest.get(url)
+    if entry is not None:
+        return archive.get(entry)
+    response = lp_tournament.safe_get(url)
+    if response is None:
+        return None
+    archive.put(url, response.content)
+    return response.content
+
+
+def fetch_tournament_pages(tournament: Dict, latest: Dict, refresh=False) -> tuple:
+    """I/O stage: (main page + stage pages as raw bytes, error)"""
+    base_url = main_page_url(tournament)
+    html = get_page(base_url, latest, refresh)
+    if html is None:
+        return [], "No response"
+    pages = [html]
+    for url in stage_urls(html, base_url):
+        page = get_page(url, latest, refresh)
+        if page is not None:
+            pages.append(page)
+    return pages, None
+
+
+# ---------------------------
+# Popup parsing
+# ---------------------------
+def _classes(tag) -> str:
+    return " ".join(tag.get("class") or [])
+
+
+def _hero(link):
+    return VALID_HEROES_LOWER.get((link.get("title") or "").strip().lower())
+
+
+def _opponent_name(popup, side: str) -> str:
+    opponent = popup.select_one(f".brkts-popup-header-opponent-{side}")
+    if opponent is None:
+        return ""
+    name = opponent.select_one(".name") or opponent.find("a", title=True)
+    if name is None:
+        return opponent.get_text(" ", strip=True)
+    return (name.get("title") if name.name == "a" else name.get_text(" ", strip=True)) or ""
+
+
+def _is_ban(tag, stop) -> bool:
+    """True when `tag` or one of its ancestors below `stop` is a ban container"""
+    while tag is not None and tag is not stop:
+        if "ban" in _classes(tag):
+            return True
+        tag = tag.parent
+    return False
+
+
+def _thumbs(element):
+    """Pick icon containers of a game row, left team first"""
+    return [t for t in element.find_all(lambda t: "thumbs" in _classes(t))
+            if not _is_ban(t, element) and any(_hero(a) for a in t.find_all("a", title=True))]
+
+
+def _side_groups(element) -> List[List[str]]:
+    """Hero names of the element per team, left to right"""
+    boxes = _thumbs(element)
+    if boxes:
+        return [[_hero(a) for a in box.find_all("a", title=True) if _hero(a)] for box in boxes]
+    # No containers: first half left, second half right
+    names = [_hero(a) for a in element.find_all("a", title=True) if _hero(a) and not _is_ban(a, element)]
+    return [names[:len(names) // 2], names[len(names) // 2:]]
+
+
+def _blue_slot(game) -> int:
+    """Slot on the blue side from the side-colour markers, -1 when unmarked"""
+    for slot, box in enumerate(_thumbs(game)[:2]):
+        for tag in [box] + box.find_all(True):
+            if "side-color-blue" in _classes(tag):
+                return slot
+            if "side-color-red" in _classes(tag):
+                return 1 - slot
+    return -1
+
+
+def _winner_slot(game) -> int:
+    marks = game.find_all(lambda t: any(c in _classes(t) for c in ("fa-check", "fa-times", "fa-xmark")))
+    if not marks:
+        return -1
+    if "fa-check" in _classes(marks[0]):
+        return 0
+    if "fa-check" in _classes(marks[-1]):
+        return 1
+    return -1
+
+
+def _ban_rows(popup) -> List[List[List[str]]]:
+    """Per-game [slot 0 bans, slot 1 bans] from the popup's ban table, if any"""
+    table = popup.find(lambda t: t.name == "table" and ("mapveto" in _classes(t) or "ban" in _classes(t)))
+    rows = []
+    if table is None:
+        return rows
+    for tr in table.find_all("tr"):
+        cells = [[_hero(a) for a in td.find_all("a", title=True) if _hero(a)] for td in tr.find_all("td")]
+        cells = [c for c in cells if c]
+        if cells:
+            rows.append([cells[0], cells[-1] if len(cells) > 1 else []])
+    return rows
+
+
+def parse_popup(popup) -> Dict:
+    """One match popup -> {"teams": (a, b), "games": [...]}"""
+    games = []
+    for game in popup.find_all(lambda t: "brkts-popup-body-game" in _classes(t)):
+        groups = [g for g in _side_groups(game) if g]
+        picks = (groups + [[], []])[:2]
+        # Bans shown inside the game row (rather than in a ban table)
+        ban_boxes = [b for b in game.find_all(lambda t: "ban" in _classes(t)) if not _is_ban(b.parent, game)]
+        ban_groups = [[_hero(a) for a in box.find_all("a", title=True) if _hero(a)] for box in ban_boxes]
+        bans = ([g for g in ban_groups if g] + [[], []])[:2]
+        if not any(picks):
+            continue
+        games.append({"picks": picks, "bans": bans,
+                      "blue": _blue_slot(game), "winner": _winner_slot(game)})
+
+    for game, row in zip(games, _ban_rows(popup)):
+        if not any(game["bans"]):
+            game["bans"] = row
+    return {"teams": (_opponent_name(popup, "left"), _opponent_name(popup, "right")), "games": games}
+
+
+def parse_match_pages(pages: List[bytes]) -> List[Dict]:
+    """Parse stage: every match with at least one drafted game, deduplicated across pages
+
+    The main page often embeds the same bracket as the Playoffs subpage, so a
+    match is keyed by its teams and drafts and kept once.
+    """
+    from bs4 import BeautifulSoup
+
+    seen = set()
+    matches = []
+    for html in pages:
+        soup = BeautifulSoup(html, "html.parser")
+        for popup in soup.find_all("div", class_="brkts-popup"):
+            match = parse_popup(popup)
+            if not match["games"]:
+                continue
+            key = (match["teams"], tuple(tuple(map(tuple, g["picks"])) for g in match["games"]))
+            if key in seen:
+                continue
+            seen.add(key)
+            matches.append(match)
+    return matches
+
+
+# ---------------------------
+# Integer encoding
+# ---------------------------
+def hero_vocabulary() -> List[str]:
+    return sorted(VALID_HEROES)
+
+
+def encode_matches(matches: List[Dict], hero_names: List[str]) -> Dict:
+    """Matches -> the per-game arrays of one tournament (team_names local to it)"""
+    hero_id = {h: i + 1 for i, h in enumerate(hero_names)}
+    team_id = {}
+    n_games = sum(len(m["games"]) for m in matches)
+    out = {
+        "picks": np.zeros((n_games, 2, SLOTS), dtype=np.uint8),
+        "bans": np.zeros((n_games, 2, SLOTS), dtype=np.uint8),
+        "blue": np.full(n_games, -1, dtype=np.int8),
+        "winner": np.full(n_games, -1, dtype=np.int8),
+        "teams": np.zeros((n_games, 2), dtype=np.uint16),
+        "match": np.zeros(n_games, dtype=np.uint32),
+        "game": np.zeros(n_games, dtype=np.uint8),
+    }
+    row = 0
+    for m, match in enumerate(matches):
+        teams = [team_id.setdefault(name, len(team_id)) for name in match["teams"]]
+        for g, game in enumerate(match["games"]):
+            for slot in range(2):
+                for field in ("picks", "bans"):
+                    ids = [hero_id[h] for h in game[field][slot][:SLOTS]]
+                    out[field][row, slot, :len(ids)] = ids
+            out["blue"][row] = game["blue"]
+            out["winner"][row] = game["winner"]
+            out["teams"][row] = teams
+            out["match"][row] = m + 1
+            out["game"][row] = g + 1
+            row += 1
+    out["team_names"] = np.array(list(team_id), dtype=str)
+    out["hero_names"] = np.array(hero_names, dtype=str)
+    return out
+
+
+def parse_tournament_drafts(pages: List[bytes]) -> Dict:
+    """Process-pool worker: raw pages -> encoded arrays + match count"""
+    matches = parse_match_pages(pages)
+    arrays = encode_matches(matches, hero_vocabulary())
+    arrays["n_matches"] = np.array(len(matches))
+    return arrays
+
+
+# ---------------------------
+# Resumable parts
+# ---------------------------
+def part_path(title: str) -> str:
+    name = re.sub(r"[^\w\-]+", "_", title).strip("_")[:120]
+    return os.path.join(DRAFTS_PARTS_DIR, f"{name}.npz")
+
+
+def load_progress() -> Dict:
+    if os.path.exists(PROGRESS_FILE):
+        with open(PROGRESS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return {"done": {}, "failed": {}}
+
+
+def save_progress(progress: Dict):
+    tmp = f"{PROGRESS_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(progress, f, indent=1)
+    os.replace(tmp, PROGRESS_FILE)
+
+
+def save_part(title: str, arrays: Dict):
+    path = part_path(title)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, title=np.array(title), **arrays)
+    os.replace(tmp, path)
+
+
+def merge_parts(tournaments_list: List[Dict], progress: Dict, path=DRAFTS_NPZ) -> Dict:
+    """Join the finished parts (in tournament-list order) into one dataset"""
+    parts = []
+    for t in tournaments_list:
+        if t["title"] in progress["done"] and os.path.exists(part_path(t["title"])):
+            with np.load(part_path(t["title"])) as data:
+                parts.append((t, {k: data[k] for k in data.files}))
+
+    hero_names = sorted({h for _, p in parts for h in p["hero_names"].tolist()} | set(hero_vocabulary()))
+    if len(hero_names) > 255:
+        raise ValueError(f"{len(hero_names)} heroes do not fit uint8 ids")
+    hero_id = {h: i + 1 for i, h in enumerate(hero_names)}
+    team_names, team_id = [], {}
+
+    columns = {k: [] for k in ("picks", "bans", "blue", "winner", "teams", "match", "game")}
+    offsets = [0]
+    for _, part in parts:
+        # Part-local ids -> merged ids (0 stays 0)
+        remap = np.zeros(256, dtype=np.uint8)
+        remap[1:len(part["hero_names"]) + 1] = [hero_id[h] for h in part["hero_names"].tolist()]
+        teams = np.array([team_id.setdefault(n, len(team_id)) for n in part["team_names"].tolist()]
+                         + [0], dtype=np.uint16)
+        columns["picks"].append(remap[part["picks"]])
+        columns["bans"].append(remap[part["bans"]])
+        columns["teams"].append(teams[part["teams"]])
+        for k in ("blue", "winner", "match", "game"):
+            columns[k].append(part[k])
+        offsets.append(offsets[-1] + len(part["picks"]))
+    team_names = list(team_id)
+
+    empty = encode_matches([], hero_names)
+    dataset = {k: np.concatenate(v) if v else empty[k] for k, v in columns.items()}
+    dataset.update({
+        "hero_names": np.array(hero_names, dtype=str),
+        "team_names": np.array(team_names, dtype=str),
+        "tournaments": np.array([t["title"] for t, _ in parts], dtype=str),
+        "years": np.array([t["year"] for t, _ in parts], dtype=np.uint16),
+        "offsets": np.array(offsets, dtype=np.uint32),
+    })
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, **dataset)
+    os.replace(tmp, path)
+    return dataset
+
+
+def load_drafts(path=DRAFTS_NPZ) -> Dict:
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def tournament_games(dataset: Dict, title: str) -> slice:
+    """Rows of `title` in the per-game arrays"""
+    i = dataset["tournaments"].tolist().index(title)
+    return slice(int(dataset["offsets"][i]), int(dataset["offsets"][i + 1]))
+
+
+# ---------------------------
+# Main runner
+# ---------------------------
+def main(tournaments_list: List[Dict], max_workers=lp_tournament.MAX_WORKERS,
+         parse_workers=lp_tournament.PARSE_WORKERS, refresh=False):
+    os.makedirs(DRAFTS_PARTS_DIR, exist_ok=True)
+    progress = load_progress()
+    todo = [t for t in tournaments_list if refresh or t["title"] not in progress["done"]]
+
+    print(f"\n{'='*70}")
+    print("MLBB Draft Scraper")
+    print(f"{'='*70}")
+    print(f"Tournaments: {len(tournaments_list)} ({len(tournaments_list) - len(todo)} already done)")
+    print(f"Thread workers (fetch): {max_workers}")
+    print(f"Process workers (parse): {parse_workers}")
+    print(f"{'='*70}\n")
+
+    latest = lp_tournament.get_archive().latest()
+    with ThreadPoolExecutor(max_workers=max_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+        fetches = {io_pool.submit(fetch_tournament_pages, t, latest, refresh): t for t in todo}
+        parses = {}
+        # One loop over both pools, so each tournament is saved as soon as it is parsed
+        while fetches or parses:
+            done, _ = wait([*fetches, *parses], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    t = fetches.pop(future)
+                    try:
+                        pages, error = future.result()
+                    except Exception as e:
+                        pages, error = [], str(e)
+                    if error:
+                        progress["failed"][t["title"]] = error
+                        save_progress(progress)
+                        print(f"  ✗ {t['title']}: {error}")
+                        continue
+                    parses[parse_pool.submit(parse_tournament_drafts, pages)] = (t, len(pages))
+                    continue
+
+                t, n_pages = parses.pop(future)
+                try:
+                    arrays = future.result()
+                except Exception as e:
+                    progress["failed"][t["title"]] = str(e)
+                    save_progress(progress)
+                    print(f"  ✗ {t['title']}: {str(e)[:100]}")
+                    continue
+                n_matches = int(arrays.pop("n_matches"))
+                save_part(t["title"], arrays)
+                progress["done"][t["title"]] = {"pages": n_pages, "matches": n_matches,
+                                                "games": int(len(arrays["picks"]))}
+                progress["failed"].pop(t["title"], None)
+                save_progress(progress)
+                print(f"  ✓ {t['title']}: {n_matches} matches, {len(arrays['picks'])} games from {n_pages} pages")
+
+    dataset = merge_parts(tournaments_list, progress)
+    print(f"\n{'='*70}")
+    print(f"Tournaments with drafts: {len(dataset['tournaments'])}")
+    print(f"Games: {len(dataset['picks'])}")
+    print(f"Failed: {len(progress['failed'])}")
+    print(f"Saved {DRAFTS_NPZ} ({os.path.getsize(DRAFTS_NPZ) / 1e3:.1f} kB)")
+    print(f"{'='*70}\n")
+
+
+def show(title: str, path=DRAFTS_NPZ):
+    dataset = load_drafts(path)
+    heroes = ["-"] + dataset["hero_names"].tolist()
+    teams = dataset["team_names"].tolist()
+    rows = tournament_games(dataset, title)
+    for i in range(rows.start, rows.stop):
+        a, b = (teams[t] for t in dataset["teams"][i])
+        blue, winner = int(dataset["blue"][i]), int(dataset["winner"][i])
+        print(f"Match {dataset['match'][i]} game {dataset['game'][i]}: {a} vs {b}"
+              f" | blue: {[a, b][blue] if blue >= 0 else '?'} | winner: {[a, b][winner] if winner >= 0 else '?'}")
+        for slot, name in enumerate((a, b)):
+            picks = ", ".join(heroes[h] for h in dataset["picks"][i, slot] if h)
+            bans = ", ".join(heroes[h] for h in dataset["bans"][i, slot] if h)
+            print(f"    {name:<24} picks: {picks}" + (f" | bans: {bans}" if bans else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape per-game drafts")
+    parser.add_argument("mode", nargs="?", default="scrape", choices=["scrape", "merge", "show"])
+    parser.add_argument("title", nargs="?")
+    parser.add_argument("--refresh", action="store_true", help="refetch archived pages and redo done tournaments")
+    parser.add_argument("--workers", type=int, default=lp_tournament.MAX_WORKERS)
+    args = parser.parse_args()
+
+    if args.mode == "merge":
+        os.makedirs(DRAFTS_PARTS_DIR, exist_ok=True)
+        dataset = merge_parts(lp_tournament.tournaments, load_progress())
+        print(f"{len(dataset['picks'])} games from {len(dataset['tournaments'])} tournaments in {DRAFTS_NPZ}")
+        sys.exit(0)
+    if args.mode == "show":
+        if not args.title:
+            sys.exit("show needs a tournament title")
+        show(args.title)
+        sys.exit(0)
+
+    start = time.time()
+    main(lp_tournament.tournaments, max_workers=args.workers, refresh=args.refresh)
+    print(f"Finished in {time.time() - start:.1f} seconds")
@@ -1,26 +1,38 @@
 #!/usr/bin/env python3
 
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from bs4 import BeautifulSoup
 import requests
 import csv
 import time
 import os
 import re
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional
+from functools import lru_cache
 from itertools import cycle
 import threading
+import queue
+import hashlib
+import sys
+from html_archive import HtmlArchive
+from scrape_monitor import QUARANTINE_DIR, ScrapeMonitor, quarantine
 
 # ---------------------------
 # Config
 # ---------------------------
-MAX_WORKERS = 10           # Thread pool size
+MAX_WORKERS = 10           # Thread pool size (page fetching)
+PARSE_WORKERS = os.cpu_count() or 1   # Process pool size (HTML parsing)
+PARSE_QUEUE_SIZE = 20      # Max raw pages buffered between fetch and parse stages
 REQUEST_TIMEOUT = 20
 RETRIES = 3
 RETRY_BACKOFF = 1.5
 OUTPUT_DIR = "tournaments"
+ARCHIVE_DIR = "html_archive"   # Raw pages for offline re-parsing (see reparse mode)
+ARCHIVE_PAGES = True
 MASTER_CSV = "mlbb_hero_stats_master.csv"
+MONITOR_HISTORY = "mlbb_dataset_normalized.csv"   # Reference data for the sanity / drift checks
+MONITOR_SCRAPES = True
 
 # Proxy rotation
 PROXIES_LIST = [
@@ -96,10 +108,229 @@ VALID_HEROES = {
     "X.Borg", "Yi Sun-shin", "Xavier", "Yin", "Yu Zhong", "Yve", "Zetian", "Zhask", "Zhuxin", "Zilong",
     "Popol & Kupa"  # Alternative spelling
 }
+VALID_HEROES_LOWER = {h.lower(): h for h in VALID_HEROES}
+
+class HeroStatRow(NamedTuple):
+    """One hero's stats in one tournament
+
+    Tournament fields are not repeated per row; rows are grouped per
+    tournament and only joined with its year/title/url when written out.
+    Side and %T columns are None when the page layout has no such column.
+    """
+    hero: str
+    pick_total: int
+    pick_wins: int
+    pick_losses: int
+    ban_count: int
+    blue_total: Optional[int] = None
+    blue_wins: Optional[int] = None
+    blue_losses: Optional[int] = None
+    red_total: Optional[int] = None
+    red_wins: Optional[int] = None
+    red_losses: Optional[int] = None
+    pick_pct: Optional[float] = None
+    ban_pct: Optional[float] = None
+    pb_total: Optional[int] = None
+    pb_pct: Optional[float] = None
+
+    @property
+    def win_rate(self) -> float:
+        return round((self.pick_wins / self.pick_total * 100), 2) if self.pick_total else 0
+
+# Column keys -> (group, sub-column) as read from the two-row table header:
+#   # | Hero | Pick: ∑ W L WR %T | Blue Side: ∑ W L WR | Red Side: ∑ W L WR |
+#   Bans: ∑ %T | P&B: ∑ %T | Details
+COLUMN_LABELS = {
+    "pick_total": ("pick", "total"),
+    "pick_wins": ("pick", "w"),
+    "pick_losses": ("pick", "l"),
+    "ban_count": ("bans", "total"),
+}
 
-def parse_stats_table(table, tournament):
-    """Parse MLBB Liquipedia /Statistics table"""
+# Optional columns: absent on older pages / pages without side stats
+EXTRA_COLUMN_LABELS = {
+    "blue_total": ("blue", "total"),
+    "blue_wins": ("blue", "w"),
+    "blue_losses": ("blue", "l"),
+    "red_total": ("red", "total"),
+    "red_wins": ("red", "w"),
+    "red_losses": ("red", "l"),
+    "pick_pct": ("pick", "pct"),
+    "ban_pct": ("bans", "pct"),
+    "pb_total": ("pb", "total"),
+    "pb_pct": ("pb", "pct"),
+}
+PCT_COLUMNS = {"pick_pct", "ban_pct", "pb_pct"}
+
+# Output columns (master / per-tournament CSV); new columns are appended so
+# existing consumers of the first nine keep working
+RECORD_FIELDS = ["hero", "pick_total", "pick_wins", "pick_losses", "ban_count",
+                 "win_rate", "tournament_year", "tournament_title", "tournament_url",
+                 *EXTRA_COLUMN_LABELS]
+
+# Positions used before header parsing; kept for tables without a <th> header
+LEGACY_LAYOUT = {"hero": 1, "pick_total": 2, "pick_wins": 3, "pick_losses": 4, "ban_count": 15}
+
+GROUP_ALIASES = {
+    "#": "rank", "rank": "rank",
+    "hero": "hero", "heroes": "hero",
+    "pick": "pick", "picks": "pick",
+    "blue side": "blue", "blue": "blue",
+    "red side": "red", "red": "red",
+    "ban": "bans", "bans": "bans",
+    "p&b": "pb", "picks & bans": "pb", "pick & ban": "pb",
+    "details": "details",
+}
+SUB_ALIASES = {"∑": "total", "σ": "total", "total": "total", "#": "total",
+               "w": "w", "l": "l", "wr": "wr", "win%": "wr", "%t": "pct"}
+
+_warned_layouts = set()
+
+def _header_rows(table):
+    """Header <tr>s: those in <thead>, else leading rows with <th> but no <td>"""
+    thead = table.find("thead")
+    if thead:
+        return thead.find_all("tr")
+    header = []
+    for row in table.find_all("tr"):
+        if row.find("td"):
+            break
+        if row.find("th"):
+            header.append(row)
+    return header
+
+def header_fingerprint(table) -> tuple:
+    """Per-column label paths of the header, expanding rowspan/colspan
+
+    e.g. (("#",), ("Hero",), ("Pick", "∑"), ("Pick", "W"), ...). Identical
+    layouts give identical fingerprints, so the resolved mapping is cached.
+    """
+    grid = {}       # (row, col) -> label
+    for r, row in enumerate(_header_rows(table)):
+        c = 0
+        for cell in row.find_all(["th", "td"]):
+            while (r, c) in grid:
+                c += 1
+            label = cell.get_text(" ", strip=True)
+            rowspan = int(cell.get("rowspan", 1) or 1)
+            colspan = int(cell.get("colspan", 1) or 1)
+            for dr in range(rowspan):
+                for dc in range(colspan):
+                    grid[(r + dr, c + dc)] = label
+            c += colspan
+
+    if not grid:
+        return ()
+    n_rows = max(r for r, _ in grid) + 1
+    n_cols = max(c for _, c in grid) + 1
+    columns = []
+    for c in range(n_cols):
+        path = []
+        for r in range(n_rows):
+            label = grid.get((r, c), "")
+            if label and (not path or path[-1] != label):
+                path.append(label)
+        columns.append(tuple(path))
+    return tuple(columns)
+
+@lru_cache(maxsize=64)
+def resolve_layout(fingerprint: tuple):
+    """Map column keys to cell indexes for a header fingerprint
+
+    Returns None for tables that are not hero statistics tables.
+    """
+    if not fingerprint:
+        return None
+
+    positions = {}
+    for idx, path in enumerate(fingerprint):
+        group = GROUP_ALIASES.get(path[0].lower()) if path else None
+        sub = SUB_ALIASES.get(path[-1].lower(), path[-1].lower()) if len(path) > 1 else "total"
+        if group:
+            positions.setdefault((group, sub), idx)
+
+    if not any(group == "pick" for group, _ in positions):
+        return None
+
+    layout = {"hero": positions.get(("hero", "total"), 1)}
+    for key, label in {**COLUMN_LABELS, **EXTRA_COLUMN_LABELS}.items():
+        if label in positions:
+            layout[key] = positions[label]
+    return layout
+
+def _parse_int(text: str) -> int:
+    digits = re.sub(r'\D', '', text)
+    return int(digits) if digits else 0
+
+def _parse_pct(text: str) -> Optional[float]:
+    match = re.search(r'\d+(?:\.\d+)?', text)
+    return float(match.group()) if match else None
+
+def _resolve_hero(hero_cell) -> str:
+    """Canonical hero name from the hero cell, or "" for non-hero rows"""
+    hero_name = ""
+
+    # Try finding link with href containing "/mobilelegends/" and hero name
+    hero_links = hero_cell.find_all("a", href=True)
+    for link in hero_links:
+        href = link.get("href", "")
+        # Check if this is a hero link (not team, tournament, etc.)
+        if "/mobilelegends/" in href and not any(x in href.lower() for x in ["/mpl/", "/team", "/tournament", "/league", "/special:", "/index.php"]):
+            title = link.get("title", "")
+            if title and not title.startswith("Category:"):
+                hero_name = title
+                break
+            # Fallback to link text
+            text = link.get_text(strip=True)
+            if text:
+                hero_name = text
+                break
+
+    if not hero_name:
+        return ""
+
+    # Clean hero name
+    hero_name = hero_name.replace("[e]", "").replace("[h]", "").strip()
+
+    # VALIDATION: Check if this is a valid hero name (case-insensitive);
+    # anything else (like team names) is skipped
+    # Returning the canonical string shares one object per hero across rows
+    return VALID_HEROES_LOWER.get(hero_name.lower(), "")
+
+def parse_stats_table(table, tournament) -> List[HeroStatRow]:
+    """Parse MLBB Liquipedia /Statistics table
+
+    Column positions come from the table's <th> header (resolved once per
+    layout); headerless tables fall back to LEGACY_LAYOUT. Layout drift is
+    reported instead of silently dropping rows.
+    """
     hero_data = []
+    title = tournament.get("title")
+
+    fingerprint = header_fingerprint(table)
+    if fingerprint:
+        layout = resolve_layout(fingerprint)
+        if layout is None:
+            return hero_data        # Not a hero statistics table
+    else:
+        layout = LEGACY_LAYOUT
+
+    missing = [k for k in COLUMN_LABELS if k not in layout]
+    if missing and fingerprint not in _warned_layouts:
+        _warned_layouts.add(fingerprint)
+        print(f"    ⚠ Layout drift in {title}: no {', '.join(missing)} column "
+              f"(header: {' | '.join('/'.join(p) for p in fingerprint)})")
+    if "pick_wins" not in layout or "pick_losses" not in layout:
+        return hero_data
+
+    hero_idx = layout["hero"]
+    wins_idx = layout["pick_wins"]
+    losses_idx = layout["pick_losses"]
+    total_idx = layout.get("pick_total")
+    ban_idx = layout.get("ban_count")
+    extra_idx = [(k, layout.get(k)) for k in EXTRA_COLUMN_LABELS]
+    min_cells = max(v for v in layout.values()) + 1
+
     tbody = table.find("tbody") or table
     
     # Find rows with class "dota-stat-row" (MLBB uses dota class names)
@@ -109,109 +340,51 @@ def parse_stats_table(table, tournament):
     if not rows:
         rows = tbody.find_all("tr")
 
+    short_rows = 0
     for row in rows:
         # Skip header rows
         if row.find("th") and not row.find("td"):
             continue
 
         cells = row.find_all("td")
-        if len(cells) < 6:
+        if len(cells) <= hero_idx:
             continue
 
-        # 1. HERO NAME (column index 1)
-        hero_name = ""
-        hero_cell = cells[1] if len(cells) > 1 else cells[0]
-        
-        # Try finding link with href containing "/mobilelegends/" and hero name
-        hero_links = hero_cell.find_all("a", href=True)
-        for link in hero_links:
-            href = link.get("href", "")
-            # Check if this is a hero link (not team, tournament, etc.)
-            if "/mobilelegends/" in href and not any(x in href.lower() for x in ["/mpl/", "/team", "/tournament", "/league", "/special:", "/index.php"]):
-                title = link.get("title", "")
-                if title and not title.startswith("Category:"):
-                    hero_name = title
-                    break
-                # Fallback to link text
-                text = link.get_text(strip=True)
-                if text:
-                    hero_name = text
-                    break
-        
+        hero_name = _resolve_hero(cells[hero_idx])
         if not hero_name:
             continue
 
-        # Clean hero name
-        hero_name = hero_name.replace("[e]", "").replace("[h]", "").strip()
-        
-        # VALIDATION: Check if this is a valid hero name
-        if hero_name not in VALID_HEROES:
-            # Try case-insensitive match
-            hero_match = None
-            for valid_hero in VALID_HEROES:
-                if valid_hero.lower() == hero_name.lower():
-                    hero_match = valid_hero
-                    break
-            
-            if not hero_match:
-                # Skip non-hero entries (like team names)
-                continue
-            else:
-                hero_name = hero_match
-
-        # 2. PICK DATA
-        # Table structure from HTML (20 columns total):
-        # Col 0: Rank
-        # Col 1: Hero (with icon and name)
-        # Col 2: Pick ∑ (total)
-        # Col 3: Pick W (wins)
-        # Col 4: Pick L (losses)
-        # Col 5: WR (win rate %)
-        # Col 6: %T (% of total games)
-        # Col 7-10: Blue Side stats
-        # Col 11-14: Red Side stats
-        # Col 15: Bans ∑ (ban count)
-        # Col 16: Bans %T
-        # Col 17: P&B ∑ (picks + bans total)
-        # Col 18: P&B %T
-        # Col 19: Details (show/x buttons)
-        
-        if len(cells) < 16:
+        if len(cells) < min_cells:
+            short_rows += 1
             continue
         
         try:
-            # Extract numeric values, removing all non-digit characters
-            pick_total_text = cells[2].get_text(strip=True)
-            pick_wins_text = cells[3].get_text(strip=True)
-            pick_losses_text = cells[4].get_text(strip=True)
-            ban_count_text = cells[15].get_text(strip=True)
-            
-            # Remove any non-numeric characters (commas, spaces, etc.)
-            pick_total = int(re.sub(r'\D', '', pick_total_text)) if pick_total_text else 0
-            pick_wins = int(re.sub(r'\D', '', pick_wins_text)) if pick_wins_text else 0
-            pick_losses = int(re.sub(r'\D', '', pick_losses_text)) if pick_losses_text else 0
-            ban_count = int(re.sub(r'\D', '', ban_count_text)) if ban_count_text else 0
+            pick_wins = _parse_int(cells[wins_idx].get_text(strip=True))
+            pick_losses = _parse_int(cells[losses_idx].get_text(strip=True))
+            pick_total = (_parse_int(cells[total_idx].get_text(strip=True))
+                          if total_idx is not None else pick_wins + pick_losses)
+            ban_count = _parse_int(cells[ban_idx].get_text(strip=True)) if ban_idx is not None else 0
             
             # Skip if no valid data
             if pick_total == 0 and pick_wins == 0 and pick_losses == 0:
                 continue
+
+            extras = {}
+            for key, idx in extra_idx:
+                if idx is None:
+                    continue
+                text = cells[idx].get_text(strip=True)
+                extras[key] = _parse_pct(text) if key in PCT_COLUMNS else _parse_int(text)
                 
         except (ValueError, IndexError) as e:
             # Debug: print which hero failed
             print(f"    ⚠ Parse error for {hero_name}: {str(e)}")
             continue
 
-        hero_data.append({
-            "hero": hero_name,
-            "pick_total": pick_total,
-            "pick_wins": pick_wins,
-            "pick_losses": pick_losses,
-            "ban_count": ban_count,
-            "win_rate": round((pick_wins / pick_total * 100), 2) if pick_total else 0,
-            "tournament_year": tournament.get("year"),
-            "tournament_title": tournament.get("title"),
-            "tournament_url": tournament.get("url")
-        })
+        hero_data.append(HeroStatRow(hero_name, pick_total, pick_wins, pick_losses, ban_count, **extras))
+
+    if short_rows:
+        print(f"    ⚠ {title}: {short_rows} hero rows have fewer than {min_cells} cells; layout drift?")
 
     return hero_data
 
@@ -373,75 +546,203 @@ def safe_get(url: str, timeout=REQUEST_TIMEOUT, retries=RETRIES) -> requests.Res
 # ---------------------------
 # Worker: fetch + parse tournament
 # ---------------------------
-def process_tournament(tournament: Dict) -> tuple:
-    """Process single tournament and return (rows, debug_info)"""
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_archive() -> HtmlArchive:
+    """Shared raw-page archive (created on first use)"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = HtmlArchive(ARCHIVE_DIR)
+    return _archive
+
+def fetch_tournament(tournament: Dict) -> tuple:
+    """Fetch a tournament /Statistics page and return (raw_html_bytes, error)"""
     url = tournament["url"]
     title = tournament["title"]
-    
+
     print(f"\n[DEBUG] Processing: {title}")
     print(f"        URL: {url}")
-    
+
     response = safe_get(url)
     if not response:
         print(f"    ✗ No response received")
-        return [], {"title": title, "heroes": [], "error": "No response"}
+        return None, "No response"
+
+    if ARCHIVE_PAGES:
+        get_archive().put(url, response.content)
+
+    return response.content, None
+
+def dedupe_tables(tables_rows: List[List[HeroStatRow]]) -> tuple:
+    """Keep one row per hero from the authoritative (overall) table
+
+    Fingerprints every table and row in one pass. Identical tables (e.g. a
+    wrapper table re-reading a nested one) are dropped; of the remaining
+    tables the one with the most picks is the overall table, as per-stage
+    or per-side tables are subsets of it. Rows elsewhere that contradict it
+    (more picks or bans than the overall row, or heroes it lacks) are
+    reported as conflicts. Returns (rows, report).
+    """
+    seen = set()
+    unique = []                 # (fingerprint, {hero: row}, total picks)
+    duplicate_tables = 0
+    duplicate_rows = 0
+
+    for rows in tables_rows:
+        if not rows:
+            continue
+        fingerprint = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        if fingerprint in seen:
+            duplicate_tables += 1
+            continue
+        seen.add(fingerprint)
+
+        by_hero = {}
+        for row in rows:
+            if row.hero in by_hero:
+                duplicate_rows += 1
+                continue
+            by_hero[row.hero] = row
+        unique.append((fingerprint, by_hero, sum(r.pick_total for r in by_hero.values())))
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    report = {"stat_tables": len(unique) + duplicate_tables, "duplicate_tables": duplicate_tables,
+              "duplicate_rows": duplicate_rows, "authoritative": None, "dropped_rows": 0,
+              "conflicts": []}
+    if not unique:
+        return [], report
+
+    overall_fp, overall, _ = max(unique, key=lambda t: t[2])
+    report["authoritative"] = overall_fp
+
+    conflicts = set()
+    for fingerprint, by_hero, _ in unique:
+        if fingerprint == overall_fp:
+            continue
+        report["dropped_rows"] += len(by_hero)
+        for hero, row in by_hero.items():
+            main = overall.get(hero)
+            if main is None or row.pick_total > main.pick_total or row.ban_count > main.ban_count:
+                conflicts.add(hero)
+    report["conflicts"] = sorted(conflicts)
+
+    return list(overall.values()), report
+
+def parse_tournament_page(html: bytes, tournament: Dict) -> tuple:
+    """Parse all tables of a fetched page and return (rows, debug_info)
+
+    CPU-bound: runs in the parse process pool. Rows are HeroStatRow tuples
+    without tournament fields, which keeps the pickled result compact.
+    """
+    title = tournament["title"]
+
+    soup = BeautifulSoup(html, "html.parser")
     tables = soup.find_all("table")
-    
+
     if not tables:
-        print(f"    ✗ No tables found")
+        print(f"    ✗ No tables found ({title})")
         return [], {"title": title, "heroes": [], "error": "No tables"}
 
-    all_rows = []
-    heroes_found = set()
-    
+    tables_rows = []
+
     for table in tables:
         try:
-            hero_rows = parse_stats_table(table, tournament)
-            if hero_rows:
-                all_rows.extend(hero_rows)
-                for row in hero_rows:
-                    heroes_found.add(row["hero"])
+            tables_rows.append(parse_stats_table(table, tournament))
         except Exception as e:
             print(f"    ⚠ Error parsing table: {str(e)[:50]}")
             continue
 
-    heroes_list = sorted(list(heroes_found))
-    
+    all_rows, dedup = dedupe_tables(tables_rows)
+    if dedup["duplicate_tables"] or dedup["duplicate_rows"] or dedup["dropped_rows"]:
+        print(f"    ⚠ {title}: {dedup['stat_tables']} stat tables, kept {dedup['authoritative']} "
+              f"({dedup['duplicate_tables']} duplicate tables, {dedup['dropped_rows']} rows from "
+              f"other tables dropped, {dedup['duplicate_rows']} repeated hero rows)")
+    if dedup["conflicts"]:
+        print(f"    ⚠ {title}: rows disagree with the overall table for "
+              f"{', '.join(dedup['conflicts'][:10])}")
+
+    heroes_list = sorted(row.hero for row in all_rows)
+
     if heroes_list:
-        print(f"    ✓ Found {len(heroes_list)} heroes: {', '.join(heroes_list[:10])}")
+        print(f"    ✓ {title}: found {len(heroes_list)} heroes: {', '.join(heroes_list[:10])}")
         if len(heroes_list) > 10:
             print(f"      ... and {len(heroes_list) - 10} more")
     else:
-        print(f"    ✗ No heroes found")
-    
+        print(f"    ✗ No heroes found ({title})")
+
     debug_info = {
         "title": title,
         "heroes": heroes_list,
         "count": len(heroes_list),
+        "dedup": dedup,
         "error": None if heroes_list else "No heroes parsed"
     }
-    
+
     return all_rows, debug_info
 
+def expand_rows(rows: List[HeroStatRow], tournament: Dict) -> List[Dict]:
+    """Join HeroStatRows with their tournament's fields into RECORD_FIELDS dicts"""
+    extra = {
+        "tournament_year": tournament.get("year"),
+        "tournament_title": tournament.get("title"),
+        "tournament_url": tournament.get("url"),
+    }
+    return [{**row._asdict(), "win_rate": row.win_rate, **extra} for row in rows]
+
+def tournament_csv_path(title: str) -> str:
+    """Per-tournament CSV under OUTPUT_DIR"""
+    pername = re.sub(r"[^\w\-]+", "_", title).strip("_")[:120]
+    return os.path.join(OUTPUT_DIR, f"{pername}.csv")
+
+def process_tournament(tournament: Dict) -> tuple:
+    """Process single tournament and return (rows, debug_info)"""
+    html, error = fetch_tournament(tournament)
+    if error:
+        return [], {"title": tournament["title"], "heroes": [], "error": error}
+
+    rows, debug_info = parse_tournament_page(html, tournament)
+    return expand_rows(rows, tournament), debug_info
+
+def parse_archived_page(archive_dir: str, entry: Dict, tournament: Dict) -> tuple:
+    """Reparse worker: load a page from the archive and parse it (no network)"""
+    html = HtmlArchive(archive_dir).get(entry)
+    return parse_tournament_page(html, tournament)
+
+def _fetch_into_queue(tournament: Dict, raw_queue: queue.Queue):
+    """I/O stage: fetch one page and hand the raw bytes to the parse stage"""
+    try:
+        html, error = fetch_tournament(tournament)
+    except Exception as e:
+        html, error = None, str(e)
+    # Blocks while the queue is full, so fetching never runs far ahead of parsing
+    raw_queue.put((tournament, html, error))
+
 # ---------------------------
 # Main runner
 # ---------------------------
-def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS):
+def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS,
+         parse_workers=PARSE_WORKERS, queue_size=PARSE_QUEUE_SIZE, reparse=False):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print(f"\n{'='*70}")
-    print(f"MLBB Tournament Scraper")
+    print(f"MLBB Tournament Scraper" + (" (reparse from archive)" if reparse else ""))
     print(f"{'='*70}")
     print(f"Tournaments to scrape: {len(tournaments_list)}")
-    print(f"Thread workers: {max_workers}")
+    print(f"Thread workers (fetch): {max_workers}")
+    print(f"Process workers (parse): {parse_workers}")
+    print(f"Parse queue size: {queue_size}")
     print(f"Proxies: {', '.join(PROXIES_LIST)}")
     print(f"{'='*70}\n")
+
+    # Checked before each tournament is written; suspect ones go to the quarantine dir
+    monitor = None
+    if MONITOR_SCRAPES and os.path.exists(MONITOR_HISTORY):
+        monitor = ScrapeMonitor.from_csv(MONITOR_HISTORY)
     
     # Prepare master CSV
-    master_fields = ["hero", "pick_total", "pick_wins", "pick_losses", "ban_count", 
-                     "win_rate", "tournament_year", "tournament_title", "tournament_url"]
+    master_fields = RECORD_FIELDS
     master_file = open(MASTER_CSV, "w", newline="", encoding="utf-8")
     master_writer = csv.DictWriter(master_file, fieldnames=master_fields)
     master_writer.writeheader()
@@ -450,56 +751,109 @@ def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS):
         "total_tournaments": 0,
         "total_rows": 0,
         "successful": [],
-        "failed": []
+        "failed": [],
+        "quarantined": []
     }
 
     print(f"{'='*70}")
     print(f"SCRAPING PROGRESS")
     print(f"{'='*70}\n")
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_t = {executor.submit(process_tournament, t): t for t in tournaments_list}
+    def record_result(t: Dict, rows: List[Dict], debug_info: Dict):
+        summary["total_tournaments"] += 1
+
+        if rows and monitor is not None:
+            check = monitor.check(rows, t["title"])
+            debug_info["monitor"] = check
+            for message in check["warnings"]:
+                print(f"    ⚠ {t['title']}: {message}")
+            if check["quarantine"]:
+                path = quarantine(t["title"], rows, check, master_fields)
+                summary["quarantined"].append(debug_info)
+                print(f"    ✗ {t['title']} quarantined ({path}): {'; '.join(check['errors'])}")
+                return
+            monitor.observe(rows, t["title"])
+
+        # Save debug info
+        if debug_info.get("error"):
+            summary["failed"].append(debug_info)
+        else:
+            summary["successful"].append(debug_info)
+
+        # Write per-tournament CSV
+        perpath = tournament_csv_path(t["title"])
         
-        for future in as_completed(future_to_t):
-            t = future_to_t[future]
-            summary["total_tournaments"] += 1
+        with open(perpath, "w", newline="", encoding="utf-8") as pf:
+            w = csv.DictWriter(pf, fieldnames=master_fields)
+            w.writeheader()
             
-            try:
-                rows, debug_info = future.result()
-            except Exception as e:
-                rows = []
-                debug_info = {"title": t["title"], "heroes": [], "error": str(e)}
-                print(f"\n[ERROR] Exception in {t['title']}: {str(e)[:100]}")
-
-            # Save debug info
-            if debug_info.get("error"):
-                summary["failed"].append(debug_info)
-            else:
-                summary["successful"].append(debug_info)
-
-            # Write per-tournament CSV
-            pername = re.sub(r"[^\w\-]+", "_", t["title"]).strip("_")[:120]
-            perpath = os.path.join(OUTPUT_DIR, f"{pername}.csv")
-            
-            with open(perpath, "w", newline="", encoding="utf-8") as pf:
-                w = csv.DictWriter(pf, fieldnames=master_fields)
-                w.writeheader()
-                
-                for r in rows:
-                    rec = {k: r.get(k, 0) for k in master_fields}
-                    w.writerow(rec)
-                    master_writer.writerow(rec)
-                    summary["total_rows"] += 1
-
-            # Show current progress
-            success_count = len(summary["successful"])
-            fail_count = len(summary["failed"])
-            progress_pct = (summary["total_tournaments"] / len(tournaments_list)) * 100
-            
-            print(f"\n{'─'*70}")
-            print(f"Progress: {summary['total_tournaments']}/{len(tournaments_list)} ({progress_pct:.1f}%)")
-            print(f"Success: {success_count} | Failed: {fail_count} | Total Rows: {summary['total_rows']}")
-            print(f"{'─'*70}")
+            for r in rows:
+                rec = {k: r.get(k) for k in master_fields}
+                w.writerow(rec)
+                master_writer.writerow(rec)
+                summary["total_rows"] += 1
+
+        # Show current progress
+        success_count = len(summary["successful"])
+        fail_count = len(summary["failed"])
+        progress_pct = (summary["total_tournaments"] / len(tournaments_list)) * 100
+        
+        print(f"\n{'─'*70}")
+        print(f"Progress: {summary['total_tournaments']}/{len(tournaments_list)} ({progress_pct:.1f}%)")
+        print(f"Success: {success_count} | Failed: {fail_count} | Total Rows: {summary['total_rows']}")
+        print(f"{'─'*70}")
+
+    def collect(future, t: Dict):
+        try:
+            stat_rows, debug_info = future.result()
+            rows = expand_rows(stat_rows, t)
+        except Exception as e:
+            rows = []
+            debug_info = {"title": t["title"], "heroes": [], "error": str(e)}
+            print(f"\n[ERROR] Exception in {t['title']}: {str(e)[:100]}")
+        record_result(t, rows, debug_info)
+
+    if reparse:
+        # Offline: run the current parser over the archived pages on all cores
+        archived = HtmlArchive(ARCHIVE_DIR).latest()
+        with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+            pending = {}
+            for t in tournaments_list:
+                entry = archived.get(t["url"])
+                if entry is None:
+                    record_result(t, [], {"title": t["title"], "heroes": [], "error": "Not in archive"})
+                    continue
+                pending[parse_pool.submit(parse_archived_page, ARCHIVE_DIR, entry, t)] = t
+
+            for future in as_completed(pending):
+                collect(future, pending[future])
+    else:
+        # Two-stage pipeline: I/O threads push raw HTML into a bounded queue, the
+        # process pool parses it. Both the queue and the number of pages handed to
+        # the pool are capped by queue_size, which provides the backpressure.
+        raw_queue = queue.Queue(maxsize=queue_size)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as io_pool, \
+                ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+            for t in tournaments_list:
+                io_pool.submit(_fetch_into_queue, t, raw_queue)
+
+            pending = {}
+            for _ in range(len(tournaments_list)):
+                t, html, error = raw_queue.get()
+                if error:
+                    record_result(t, [], {"title": t["title"], "heroes": [], "error": error})
+                    continue
+
+                pending[parse_pool.submit(parse_tournament_page, html, t)] = t
+
+                while len(pending) >= queue_size:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+
+            for future in as_completed(pending):
+                collect(future, pending[future])
 
     master_file.close()
 
@@ -510,6 +864,7 @@ def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS):
     print(f"Total tournaments processed: {summary['total_tournaments']}")
     print(f"Successful: {len(summary['successful'])}")
     print(f"Failed: {len(summary['failed'])}")
+    print(f"Quarantined: {len(summary['quarantined'])}")
     print(f"Total hero-stat rows written: {summary['total_rows']}")
     print(f"Master CSV: {MASTER_CSV}")
     print(f"Per-tournament CSVs: ./{OUTPUT_DIR}/")
@@ -522,6 +877,23 @@ def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS):
             print(f"  ✗ {fail['title']}")
             print(f"    Error: {fail.get('error', 'Unknown')}")
     
+    if summary["quarantined"]:
+        print(f"\n{'='*70}")
+        print(f"QUARANTINED TOURNAMENTS ({len(summary['quarantined'])}) - not in {MASTER_CSV}, see ./{QUARANTINE_DIR}/")
+        print(f"{'='*70}")
+        for info in summary["quarantined"]:
+            print(f"  ✗ {info['title']}")
+            for message in info["monitor"]["errors"]:
+                print(f"    {message}")
+
+    conflicted = [s for s in summary["successful"] if s.get("dedup", {}).get("conflicts")]
+    if conflicted:
+        print(f"\n{'='*70}")
+        print(f"TABLE CONFLICTS ({len(conflicted)}) - check these pages by hand")
+        print(f"{'='*70}")
+        for info in conflicted:
+            print(f"  ⚠ {info['title']}: {', '.join(info['dedup']['conflicts'])}")
+
     if summary["successful"]:
         print(f"\n{'='*70}")
         print(f"SUCCESSFUL TOURNAMENTS - HERO COUNTS")
@@ -534,8 +906,19 @@ def main(tournaments_list: List[Dict], max_workers=MAX_WORKERS):
     print(f"\n{'='*70}\n")
 
 if __name__ == "__main__":
+    # Usage: lp_tournament.py [scrape|reparse|train-dict]
+    mode = sys.argv[1] if len(sys.argv) > 1 else "scrape"
+    if mode == "train-dict":
+        archive = HtmlArchive(ARCHIVE_DIR)
+        print(f"Trained zstd dictionary {archive.train_dictionary()}")
+        pages, raw, stored = archive.stats()
+        print(f"Archive: {pages} pages, {raw / 1e6:.1f} MB raw, {stored / 1e6:.1f} MB stored")
+        sys.exit(0)
+    if mode not in ("scrape", "reparse"):
+        sys.exit(f"Unknown mode: {mode} (expected scrape, reparse or train-dict)")
+
     start = time.time()
-    main(tournaments, max_workers=MAX_WORKERS)
+    main(tournaments, max_workers=MAX_WORKERS, reparse=(mode == "reparse"))
     elapsed = time.time() - start
     print(f"Finished in {elapsed:.1f} seconds ({elapsed/60:.1f} minutes)")
     print(f"{'='*70}\n")
\ No newline at end of file
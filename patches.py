@@ -0,0 +1,406 @@
+"""Game patches: date ranges, tournament -> patch mapping, per-patch aggregates.
+
+PATCHES_CSV (patch, start_date) is the patch table; a patch runs until the
+next one starts. `python patches.py fetch` fills it from Liquipedia's patch
+list. TOURNAMENT_DATES_CSV (tournament_title, start_date, end_date) is read
+from the infobox of the archived tournament pages (`python patches.py dates`).
+
+PatchTable is a sorted interval index: lookups are bisects over the patch
+start dates. A tournament maps to every patch it overlaps; since match dates
+are not scraped, its rows are counted under the patch covering most of its
+days. PatchAggregates holds per-patch hero totals as a HeroStats store whose
+"tournament" axis is the patch list. It records each tournament's patch and
+a hash of its rows; when either changes (a re-scraped ongoing tournament,
+new dates, a refetched patch table) or a tournament disappears, the rows of
+the patches involved are rebuilt from the dataset.
+
+    python patches.py fetch            patch table from Liquipedia
+    python patches.py dates [--fetch]  tournament dates from the page archive
+    python patches.py build            update the per-patch totals from the dataset
+    python patches.py current          current-patch view with META categories
+"""
+import csv
+import hashlib
+import os
+import sys
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from hero_stats import COUNT_FIELDS, HeroStats
+
+PATCHES_CSV = "mlbb_patches.csv"
+TOURNAMENT_DATES_CSV = "mlbb_tournament_dates.csv"
+PATCH_AGGREGATES = "mlbb_patch_aggregates.npz"
+PATCH_LIST_URL = "https://liquipedia.net/mobilelegends/Patches"
+
+DATE_FORMATS = ("%Y-%m-%d", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y")
+
+
+def parse_date(text):
+    """Liquipedia date text -> date, None for empty / partial ('2019-03-??') dates"""
+    text = (text or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# ---------------------------
+# Patch interval index
+# ---------------------------
+class PatchTable:
+    """Patches sorted by start date; each runs until the next one starts"""
+
+    def __init__(self, patches, starts):
+        order = sorted(range(len(starts)), key=lambda i: starts[i])
+        self.patches = [patches[i] for i in order]
+        self.starts = [starts[i] for i in order]
+        self._ordinals = [d.toordinal() for d in self.starts]
+        self.index = {p: i for i, p in enumerate(self.patches)}
+
+    @classmethod
+    def load(cls, path=PATCHES_CSV):
+        patches, starts = [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                start = parse_date(row["start_date"])
+                if start is not None:
+                    patches.append(row["patch"])
+                    starts.append(start)
+        return cls(patches, starts)
+
+    def save(self, path=PATCHES_CSV):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["patch", "start_date"])
+            writer.writerows((p, s.isoformat()) for p, s in zip(self.patches, self.starts))
+
+    def __len__(self):
+        return len(self.patches)
+
+    def end(self, i):
+        """Last day of patch i (None for the current patch)"""
+        return self.starts[i + 1] - timedelta(days=1) if i + 1 < len(self.starts) else None
+
+    def patch_at(self, day):
+        """Index of the patch live on `day`, None before the first patch"""
+        i = bisect_right(self._ordinals, day.toordinal()) - 1
+        return i if i >= 0 else None
+
+    def overlapping(self, start, end):
+        """[(patch index, days of overlap)] for the closed range [start, end]"""
+        first = max(bisect_right(self._ordinals, start.toordinal()) - 1, 0)
+        last = bisect_right(self._ordinals, end.toordinal()) - 1
+        spans = []
+        for i in range(first, last + 1):
+            patch_end = self.end(i) or end
+            days = (min(end, patch_end) - max(start, self.starts[i])).days + 1
+            if days > 0:
+                spans.append((i, days))
+        return spans
+
+
+# ---------------------------
+# Tournament dates / mapping
+# ---------------------------
+def parse_tournament_dates(html):
+    """(start, end) from a Liquipedia tournament infobox, (None, None) if absent"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("div", class_="fo-nttax-infobox"))
+    values = {}
+    for desc in soup.find_all("div", class_="infobox-description"):
+        label = desc.get_text(strip=True).rstrip(":").lower()
+        value = desc.find_next_sibling("div")
+        if label in ("start date", "end date", "date") and value is not None:
+            values[label] = parse_date(value.get_text(strip=True))
+    start = values.get("start date") or values.get("date")
+    end = values.get("end date") or start
+    return start, end
+
+
+def load_tournament_dates(path=TOURNAMENT_DATES_CSV):
+    """{tournament_title: (start, end)}"""
+    dates = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            start, end = parse_date(row["start_date"]), parse_date(row["end_date"])
+            if start is not None:
+                dates[row["tournament_title"]] = (start, end or start)
+    return dates
+
+
+def collect_tournament_dates(tournaments, fetch_missing=False, path=TOURNAMENT_DATES_CSV):
+    """Read dates from archived pages (optionally fetching the main tournament page) and save them"""
+    import lp_tournament
+
+    archive = lp_tournament.get_archive()
+    latest = archive.latest()
+    rows, missing = [], []
+    for t in tournaments:
+        # Statistics subpage first, then the main tournament page
+        start = end = None
+        for url in (t["url"], t["url"].rsplit("/Statistics", 1)[0]):
+            entry = latest.get(url)
+            if entry is None and fetch_missing and url != t["url"]:
+                response = lp_tournament.safe_get(url)
+                if response is not None:
+                    entry = archive.put(url, response.content)
+            if entry is not None:
+                start, end = parse_tournament_dates(archive.get(entry))
+                if start is not None:
+                    break
+        if start is None:
+            missing.append(t["title"])
+            continue
+        rows.append((t["title"], start.isoformat(), (end or start).isoformat()))
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["tournament_title", "start_date", "end_date"])
+        writer.writerows(rows)
+    return len(rows), missing
+
+
+def assign_tournaments(table, dates):
+    """{title: (primary patch, [all overlapping patches])}; undated / pre-patch titles are left out"""
+    assignment = {}
+    for title, (start, end) in dates.items():
+        spans = table.overlapping(start, end)
+        if spans:
+            primary = max(spans, key=lambda s: s[1])[0]
+            assignment[title] = (table.patches[primary], [table.patches[i] for i, _ in spans])
+    return assignment
+
+
+def fetch_patch_table():
+    """Patch table from Liquipedia's patch list (header-driven, like the stats parser)"""
+    from bs4 import BeautifulSoup
+    import lp_tournament
+
+    response = lp_tournament.safe_get(PATCH_LIST_URL)
+    if response is None:
+        raise RuntimeError(f"Could not fetch {PATCH_LIST_URL}")
+
+    patches, starts = [], []
+    for table in BeautifulSoup(response.content, "html.parser").find_all("table"):
+        rows = table.find_all("tr")
+        if not rows:
+            continue
+        header = [c.get_text(strip=True).lower() for c in rows[0].find_all(["th", "td"])]
+        version_col = next((i for i, h in enumerate(header) if "version" in h or "patch" in h), None)
+        date_col = next((i for i, h in enumerate(header) if "date" in h), None)
+        if version_col is None or date_col is None:
+            continue
+        for row in rows[1:]:
+            cells = row.find_all(["th", "td"])
+            if len(cells) <= max(version_col, date_col):
+                continue
+            start = parse_date(cells[date_col].get_text(strip=True))
+            name = cells[version_col].get_text(strip=True)
+            if start is not None and name and name not in patches:
+                patches.append(name)
+                starts.append(start)
+    if not patches:
+        raise RuntimeError(f"No patch table found on {PATCH_LIST_URL}")
+    return PatchTable(patches, starts)
+
+
+# ---------------------------
+# Per-patch aggregates (incremental)
+# ---------------------------
+def contribution_key(stats, i):
+    """Hash of tournament i's hero counts (heroes with any count, in name order)"""
+    counts = np.stack([getattr(stats, field)[i] for field in COUNT_FIELDS])
+    h = hashlib.blake2b(digest_size=16)
+    for j in sorted(np.flatnonzero(counts.any(axis=0)), key=lambda j: stats.heroes[j]):
+        h.update(f"{stats.heroes[j]}:{counts[:, j].tolist()};".encode())
+    return h.hexdigest()
+
+
+class PatchAggregates:
+    """Per-patch hero totals; `stats` is a HeroStats with one 'tournament' row per patch
+
+    `included` maps each counted tournament to (patch, contribution_key).
+    """
+
+    def __init__(self, stats=None, included=None):
+        self.stats = stats
+        self.included = dict(included or {})
+
+    @classmethod
+    def load(cls, path=PATCH_AGGREGATES):
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            stats = HeroStats(
+                data["heroes"].tolist(), data["roles"].tolist(),
+                *(data[field] for field in COUNT_FIELDS),
+                tournaments=data["patches"].tolist(), years=data["years"],
+            )
+            titles = data["included"].tolist()
+            if "included_keys" in data.files:
+                included = zip(data["included_patches"].tolist(), data["included_keys"].tolist())
+            else:                   # older files: patch unknown, rebuilt on the next update
+                included = [(None, None)] * len(titles)
+            return cls(stats, dict(zip(titles, included)))
+
+    def save(self, path=PATCH_AGGREGATES):
+        s = self.stats
+        titles = sorted(self.included)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            heroes=np.array(s.heroes), roles=np.array([s.role_names[c] for c in s.role_codes]),
+            patches=np.array(s.tournaments), years=s.years,
+            included=np.array(titles, dtype=str),
+            included_patches=np.array([self.included[t][0] for t in titles], dtype=str),
+            included_keys=np.array([self.included[t][1] for t in titles], dtype=str),
+            **{field: getattr(s, field) for field in COUNT_FIELDS},
+        )
+        os.replace(tmp, path)
+
+    def update(self, rows_stats, assignment, table):
+        """Bring the totals in line with `rows_stats`; returns the titles added, changed or removed
+
+        Only patches that gain, lose or change a tournament are rebuilt; the
+        other rows are kept.
+        """
+        keys = {t: (assignment[t][0], contribution_key(rows_stats, i))
+                for i, t in enumerate(rows_stats.tournaments) if t in assignment}
+        changed = sorted({t for t in keys if self.included.get(t) != keys[t]}
+                         | {t for t in self.included if t not in keys})
+        if not changed:
+            return []
+
+        old = self.stats
+        affected = {keys[t][0] for t in changed if t in keys}
+        for t in changed:
+            if t not in self.included:
+                continue
+            patch = self.included[t][0]
+            if patch is None:                   # older file: which patch it went to is unknown
+                affected.update(old.tournaments)
+            else:
+                affected.add(patch)
+
+        # Hero / patch axes: existing order kept, new entries appended
+        heroes = list(old.heroes) if old else []
+        roles = [old.role_names[c] for c in old.role_codes] if old else []
+        for hero, code in zip(rows_stats.heroes, rows_stats.role_codes):
+            if hero not in heroes:
+                heroes.append(hero)
+                roles.append(rows_stats.role_names[code])
+        patches = list(old.tournaments) if old else []
+        for patch, _ in keys.values():
+            if patch not in patches:
+                patches.append(patch)
+        patches.sort(key=lambda p: table.index.get(p, len(table)))
+
+        hero_pos = {h: i for i, h in enumerate(heroes)}
+        patch_pos = {p: i for i, p in enumerate(patches)}
+        rebuild = [i for i, t in enumerate(rows_stats.tournaments) if t in keys and keys[t][0] in affected]
+        hero_cols = np.array([hero_pos[h] for h in rows_stats.heroes])
+        patch_rows = np.array([patch_pos[keys[rows_stats.tournaments[i]][0]] for i in rebuild], dtype=np.int64)
+        affected_rows = [patch_pos[p] for p in affected if p in patch_pos]
+        counts = {}
+        for field in COUNT_FIELDS:
+            arr = np.zeros((len(patches), len(heroes)), dtype=np.int32)
+            if old is not None:
+                arr[np.ix_([patch_pos[p] for p in old.tournaments],
+                           [hero_pos[h] for h in old.heroes])] = getattr(old, field)
+            arr[affected_rows] = 0
+            np.add.at(arr, (patch_rows[:, None], hero_cols[None, :]), getattr(rows_stats, field)[rebuild])
+            counts[field] = arr
+
+        years = [table.starts[table.index[p]].year if p in table.index else 0 for p in patches]
+        self.stats = HeroStats(heroes, roles, tournaments=patches, years=years, **counts)
+        self.included = keys
+        return changed
+
+    def patch_stats(self, patch):
+        """HeroStats for one patch"""
+        return self.stats.select(np.array(self.stats.tournaments) == patch)
+
+    def current_patch(self):
+        """Latest patch with any picks"""
+        played = self.stats.picks.sum(axis=1) > 0
+        return [p for p, keep in zip(self.stats.tournaments, played) if keep][-1]
+
+    def patch_frame(self, patch):
+        """Aggregated frame (mlbb_heroes_aggregated.csv layout) for heroes played on `patch`"""
+        frame = self.patch_stats(patch).to_frame()
+        return frame[frame["total_matches"] > 0].reset_index(drop=True)
+
+    def count_scale(self, patch):
+        """The patch's share of all picks, for scaling the category cutoffs"""
+        total = self.stats.total_picks.sum()
+        return float(self.patch_stats(patch).total_picks.sum() / total) if total else 1.0
+
+
+def current_patch_view(aggregates, n_clusters=5, engine="K-Means", win_rate_feature="overall_win_rate"):
+    """(patch, frame with cluster + category) for the current patch"""
+    from sklearn.preprocessing import StandardScaler
+    from clustering import fit_clusters
+    from hero_analysis import categorize_clusters
+    from winrate_stats import add_win_rate_intervals
+
+    patch = aggregates.current_patch()
+    frame = add_win_rate_intervals(aggregates.patch_frame(patch))
+    stats = HeroStats.from_aggregated(frame)
+    features = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+    X_scaled = StandardScaler().fit_transform(stats.feature_matrix(features))
+    clusters = fit_clusters(engine, X_scaled, min(n_clusters, len(frame))).labels
+    categories, _ = categorize_clusters(stats, clusters, win_rate_feature,
+                                        count_scale=aggregates.count_scale(patch))
+    frame["cluster"] = clusters
+    frame["category"] = frame["cluster"].map(categories)
+    return patch, frame
+
+
+def build_aggregates(normalized_csv="mlbb_dataset_normalized.csv"):
+    """Load saved aggregates, update them from the dataset, save; returns (aggregates, changed, unassigned)"""
+    import pandas as pd
+
+    table = PatchTable.load()
+    assignment = assign_tournaments(table, load_tournament_dates())
+    rows_stats = HeroStats.from_tournament_rows(pd.read_csv(normalized_csv))
+    aggregates = PatchAggregates.load()
+    changed = aggregates.update(rows_stats, assignment, table)
+    if changed:
+        aggregates.save()
+    unassigned = [t for t in rows_stats.tournaments if t not in assignment]
+    return aggregates, changed, unassigned
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == "fetch":
+        table = fetch_patch_table()
+        table.save()
+        print(f"Saved {len(table)} patches ({table.patches[0]} .. {table.patches[-1]}) to {PATCHES_CSV}")
+    elif command == "dates":
+        from lp_tournament import tournaments
+        found, missing = collect_tournament_dates(tournaments, fetch_missing="--fetch" in sys.argv)
+        print(f"Saved dates for {found} tournaments to {TOURNAMENT_DATES_CSV}")
+        if missing:
+            print(f"No dates for {len(missing)}: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+    elif command == "build":
+        aggregates, changed, unassigned = build_aggregates()
+        print(f"Updated {len(changed)} tournaments; {len(aggregates.included)} in {PATCH_AGGREGATES}")
+        if unassigned:
+            print(f"{len(unassigned)} tournaments without dates / patch are not in the per-patch totals")
+    elif command == "current":
+        patch, frame = current_patch_view(PatchAggregates.load())
+        print(f"Current patch {patch}: {len(frame)} heroes played")
+        print(frame.sort_values("total_picks", ascending=False)
+              [["hero", "Primary_Role", "total_picks", "overall_win_rate", "ban_rate", "category"]]
+              .head(20).to_string(index=False))
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,432 @@
+"""Static HTML/PNG report: every analysis chart for one or more slices of the data.
+
+Renders the charts of latests.py (role pies, top-10 lines, box plots, bubble
+scatter, correlation heatmap, elbow, PCA cluster plot) headless with the Agg
+backend, one (slice, chart) job per task on a process pool, and writes
+<out>/index.html next to the PNGs.
+
+Each chart's content hash covers its source code, the analysis code it
+calls (ANALYSIS_MODULES, _scaled_features), REPORT_VERSION, its parameters
+and the slice's data; charts whose hash matches the previous run's
+manifest.json (and whose PNG still exists) are not rendered again.
+
+Slices:
+    all                 every tournament
+    year:2025           one year (years:2023-2025 for a range)
+    title:MPL Indonesia tournaments whose title contains the text (region reports)
+    patch:current       one patch from the per-patch aggregates (patch:<name>)
+
+    python report.py [--slice all --slice "title:MPL Indonesia" ...] [--per-year]
+                     [--out reports] [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from hero_stats import HeroStats
+
+REPORT_DIR = "reports"
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+DPI = 110
+N_CLUSTERS = 5
+FEATURES = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+REPORT_VERSION = 1          # bump to re-render everything after chart-affecting changes elsewhere
+ANALYSIS_MODULES = ("hero_stats", "clustering", "hero_analysis")     # hashed with every chart
+
+
+# ---------------------------
+# Charts (one figure each, same content as latests.py)
+# ---------------------------
+def chart_roles(frame, params):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    role_counts = frame['Primary_Role'].value_counts()
+    axes[0].pie(role_counts.values, labels=role_counts.index, autopct='%1.1f%%',
+                startangle=90, colors=plt.cm.Set3.colors)
+    axes[0].set_title('Hero Role Distribution')
+    role_avg_winrate = frame.groupby('Primary_Role')['overall_win_rate'].mean()
+    axes[1].pie(role_avg_winrate.values, labels=role_avg_winrate.index, autopct='%1.1f%%',
+                startangle=90, colors=plt.cm.Paired.colors)
+    axes[1].set_title('Average Win Rate by Role')
+    return fig
+
+
+def chart_top10(frame, params):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(15, 5))
+    for ax, column, title, marker, color in (
+            (axes[0], 'total_picks', 'Top 10 Most Picked Heroes', 'o', None),
+            (axes[1], 'total_bans', 'Top 10 Most Banned Heroes', 's', 'orange')):
+        top = frame.nlargest(10, column).sort_values(column)
+        ax.plot(top['hero'], top[column], marker=marker, linewidth=2, color=color)
+        ax.set_title(title)
+        ax.set_xlabel('Hero')
+        ax.set_ylabel(column.replace('_', ' ').title())
+        ax.tick_params(axis='x', rotation=45)
+        ax.grid(True, alpha=0.3)
+    return fig
+
+
+def chart_boxplots(frame, params):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, axes = plt.subplots(1, 2, figsize=(15, 5))
+    sns.boxplot(data=frame, x='Primary_Role', y='overall_win_rate', ax=axes[0])
+    axes[0].set_title('Win Rate Distribution by Role')
+    axes[0].set_xlabel('Role')
+    axes[0].set_ylabel('Win Rate (%)')
+    axes[0].tick_params(axis='x', rotation=45)
+    axes[0].axhline(y=50, color='r', linestyle='--', alpha=0.5)
+    sns.boxplot(data=frame, x='Primary_Role', y='total_picks', ax=axes[1])
+    axes[1].set_title('Pick Rate Distribution by Role')
+    axes[1].set_xlabel('Role')
+    axes[1].set_ylabel('Total Picks')
+    axes[1].tick_params(axis='x', rotation=45)
+    axes[1].set_yscale('log')
+    return fig
+
+
+def chart_bubble(frame, params):
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(frame['total_picks'], frame['overall_win_rate'],
+               c=pd.Categorical(frame['Primary_Role']).codes, cmap='tab10',
+               s=frame['total_bans'] / (10 * params['count_scale']) + 30,
+               alpha=0.7, edgecolors='black')
+    ax.set_title('Pick Rate vs Win Rate (Bubble Size = Ban Count)')
+    ax.set_xlabel('Total Picks')
+    ax.set_ylabel('Win Rate (%)')
+    ax.axhline(y=50, color='r', linestyle='--', alpha=0.5)
+    ax.grid(True, alpha=0.3)
+    roles = frame['Primary_Role'].unique()
+    legend_elements = [Line2D([0], [0], marker='o', color='w', label=role,
+                              markerfacecolor=plt.cm.tab10(i / len(roles)), markersize=10)
+                       for i, role in enumerate(roles)]
+    ax.legend(handles=legend_elements, title='Roles', bbox_to_anchor=(1.05, 1), loc='upper left')
+    return fig
+
+
+def chart_correlation(frame, params):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(frame[FEATURES].corr(), annot=True, fmt='.2f', cmap='coolwarm', ax=ax)
+    ax.set_title('Correlation Matrix')
+    return fig
+
+
+def _scaled_features(frame):
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler().fit_transform(HeroStats.from_aggregated(frame).feature_matrix(FEATURES))
+
+
+def chart_elbow(frame, params):
+    import matplotlib.pyplot as plt
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    X_scaled = _scaled_features(frame)
+    k_range = range(2, min(11, len(frame)))
+    wcss, silhouette_scores = [], []
+    for k in k_range:
+        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(X_scaled)
+        wcss.append(kmeans.inertia_)
+        silhouette_scores.append(silhouette_score(X_scaled, kmeans.labels_))
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 4))
+    for ax, values, title, ylabel, marker, color in (
+            (axes[0], wcss, 'Elbow Method', 'WCSS', 'o', None),
+            (axes[1], silhouette_scores, 'Silhouette Scores', 'Silhouette Score', 's', 'green')):
+        ax.plot(k_range, values, marker=marker, color=color)
+        ax.set_title(title)
+        ax.set_xlabel('Number of Clusters (K)')
+        ax.set_ylabel(ylabel)
+        ax.grid(True, alpha=0.3)
+        ax.axvline(x=params['n_clusters'], color='r', linestyle='--', alpha=0.5,
+                   label=f"K={params['n_clusters']} (Selected)")
+        ax.legend()
+    return fig
+
+
+def chart_clusters(frame, params):
+    import matplotlib.pyplot as plt
+    from sklearn.decomposition import PCA
+    from clustering import fit_clusters
+    from hero_analysis import CATEGORY_COLOR_MAP, categorize_clusters
+
+    stats = HeroStats.from_aggregated(frame)
+    X_scaled = _scaled_features(frame)
+    n_clusters = min(params['n_clusters'], len(frame))
+    clustering = fit_clusters(params['engine'], X_scaled, n_clusters)
+    categories, colors = categorize_clusters(stats, clustering.labels, 'overall_win_rate',
+                                             count_scale=params['count_scale'])
+    category = np.array([categories[c] for c in clustering.labels])
+    pca = PCA(n_components=2)
+    X_pca = pca.fit_transform(X_scaled)
+
+    fig, ax = plt.subplots(figsize=(18, 13))
+    for name, color in CATEGORY_COLOR_MAP.items():
+        mask = category == name
+        if mask.any():
+            ax.scatter(X_pca[mask, 0], X_pca[mask, 1], c=color, label=name, s=100,
+                       alpha=0.6, edgecolors='black', linewidth=0.5)
+    for hero, (x, y), c in zip(frame['hero'], X_pca, clustering.labels):
+        ax.annotate(hero, (x, y), fontsize=7, alpha=0.9, ha='center', color=colors[c], fontweight='bold')
+    centers_pca = pca.transform(clustering.centers)
+    ax.scatter(centers_pca[:, 0], centers_pca[:, 1], c='white', s=400, marker='X',
+               edgecolors='black', linewidths=3, label='Cluster Centers', zorder=5)
+    ax.set_title(f"PCA Visualization of Hero Clusters (K={n_clusters}) - Colored by Category",
+                 fontsize=16, fontweight='bold')
+    ax.set_xlabel(f'Principal Component 1 ({pca.explained_variance_ratio_[0]:.1%} variance)', fontsize=12)
+    ax.set_ylabel(f'Principal Component 2 ({pca.explained_variance_ratio_[1]:.1%} variance)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=11, loc='best', framealpha=0.9)
+    return fig
+
+
+# Chart name -> (title, renderer); report order
+CHARTS = {
+    "roles": ("Roles", chart_roles),
+    "top10": ("Most picked / banned", chart_top10),
+    "boxplots": ("Distributions by role", chart_boxplots),
+    "bubble": ("Pick rate vs win rate", chart_bubble),
+    "correlation": ("Feature correlation", chart_correlation),
+    "elbow": ("Choosing K", chart_elbow),
+    "clusters": ("Hero clusters", chart_clusters),
+}
+
+
+# ---------------------------
+# Slices
+# ---------------------------
+def build_slices(specs, stats, patch_aggregates=None):
+    """{slice name: (frame, count_scale)}; heroes without a match in the slice are dropped"""
+    total_picks = stats.total_picks.sum()
+    slices = {}
+    for spec in specs:
+        kind, _, value = spec.partition(":")
+        if kind == "all":
+            view = stats
+        elif kind == "year":
+            view = stats.window(int(value), int(value))
+        elif kind == "years":
+            start, _, end = value.partition("-")
+            view = stats.window(int(start), int(end or start))
+        elif kind == "title":
+            view = stats.select([value.lower() in t.lower() for t in stats.tournaments])
+        elif kind == "patch":
+            if patch_aggregates is None:
+                raise ValueError(f"{spec}: no per-patch aggregates (run `python patches.py build`)")
+            patch = patch_aggregates.current_patch() if value == "current" else value
+            slices[f"patch:{patch}"] = (patch_aggregates.patch_frame(patch),
+                                        patch_aggregates.count_scale(patch))
+            continue
+        else:
+            raise ValueError(f"Unknown slice: {spec} (expected all, year:, years:, title: or patch:)")
+
+        frame = view.to_frame()
+        frame = frame[frame['total_matches'] > 0].reset_index(drop=True)
+        if frame.empty:
+            raise ValueError(f"{spec}: slice matches no tournaments")
+        scale = float(view.total_picks.sum() / total_picks) if total_picks else 1.0
+        slices[spec] = (frame, scale)
+    return slices
+
+
+def slice_dirname(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+# ---------------------------
+# Rendering
+# ---------------------------
+@lru_cache(maxsize=1)
+def _analysis_source():
+    """Source of the helpers the charts call, hashed once per process"""
+    import importlib
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{REPORT_VERSION}\n".encode())
+    h.update(inspect.getsource(_scaled_features).encode())
+    for name in ANALYSIS_MODULES:
+        h.update(inspect.getsource(importlib.import_module(name)).encode())
+    return h.digest()
+
+
+def chart_hash(chart, frame, params):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_analysis_source())
+    h.update(inspect.getsource(CHARTS[chart][1]).encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    h.update(frame.to_csv(index=False).encode())
+    return h.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_chart(chart, frame, params, path):
+    """Worker: draw one chart to `path`; returns render seconds"""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    fig = CHARTS[chart][1](frame, params)
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def render_report(slices, out_dir=REPORT_DIR, workers=None, force=False,
+                  n_clusters=N_CLUSTERS, engine="K-Means"):
+    """Render every (slice, chart) whose hash changed; returns {"rendered", "skipped", "failed"}"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    # Entries of slices not in this run are kept for the next one
+    jobs, new_manifest, skipped = [], dict(manifest), []
+    for name, (frame, count_scale) in slices.items():
+        os.makedirs(os.path.join(out_dir, slice_dirname(name)), exist_ok=True)
+        params = {"n_clusters": n_clusters, "engine": engine, "count_scale": count_scale}
+        for chart in CHARTS:
+            key = f"{slice_dirname(name)}/{chart}.png"
+            digest = chart_hash(chart, frame, params)
+            new_manifest[key] = digest
+            if manifest.get(key) == digest and os.path.exists(os.path.join(out_dir, key)):
+                skipped.append(key)
+            else:
+                jobs.append((key, chart, frame, params))
+
+    rendered, failed = [], {}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker()
+        for key, chart, frame, params in jobs:
+            try:
+                render_chart(chart, frame, params, os.path.join(out_dir, key))
+                rendered.append(key)
+            except Exception as e:
+                failed[key] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(render_chart, chart, frame, params, os.path.join(out_dir, key)): key
+                       for key, chart, frame, params in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    rendered.append(futures[future])
+                except Exception as e:
+                    failed[futures[future]] = str(e)
+
+    for key in failed:
+        new_manifest.pop(key)
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    return {"rendered": rendered, "skipped": skipped, "failed": failed}
+
+
+# ---------------------------
+# HTML
+# ---------------------------
+def _table(frame, columns):
+    head = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(f'{v:.2f}' if isinstance(v, float) else str(v))}</td>"
+                         for v in row) + "</tr>"
+        for row in frame[columns].itertuples(index=False))
+    return f"<table><tr>{head}</tr>{rows}</table>"
+
+
+def write_index(slices, out_dir=REPORT_DIR, title="MLBB Hero Meta Report"):
+    sections, nav = [], []
+    for name, (frame, _) in slices.items():
+        anchor = slice_dirname(name)
+        nav.append(f'<a href="#{anchor}">{html.escape(name)}</a>')
+        top = frame.nlargest(10, 'total_picks')
+        charts = "".join(
+            f'<h3>{html.escape(chart_title)}</h3><img src="{anchor}/{chart}.png" alt="{chart}">'
+            for chart, (chart_title, _) in CHARTS.items()
+            if os.path.exists(os.path.join(out_dir, anchor, f"{chart}.png")))
+        sections.append(
+            f'<section id="{anchor}"><h2>{html.escape(name)}</h2>'
+            f"<p>{len(frame)} heroes, {int(frame['total_picks'].sum())} picks, "
+            f"{int(frame['total_bans'].sum())} bans</p>"
+            f"{_table(top, ['hero', 'Primary_Role', 'total_picks', 'overall_win_rate', 'ban_rate'])}"
+            f"{charts}</section>")
+
+    page = (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif;margin:2em}img{max-width:100%}"
+        "table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:2px 8px}</style></head>"
+        f"<body><h1>{html.escape(title)}</h1><p>Generated {time.strftime('%Y-%m-%d %H:%M')}</p>"
+        f"<nav>{' | '.join(nav)}</nav>{''.join(sections)}</body></html>"
+    )
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the static hero report")
+    parser.add_argument("--data", default=NORMALIZED_CSV)
+    parser.add_argument("--slice", action="append", dest="slices",
+                        help="all, year:Y, years:A-B, title:TEXT or patch:NAME|current (repeatable)")
+    parser.add_argument("--per-year", action="store_true", help="add one slice per tournament year")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--k", type=int, default=N_CLUSTERS)
+    parser.add_argument("--engine", default="K-Means")
+    parser.add_argument("--force", action="store_true", help="re-render unchanged charts")
+    args = parser.parse_args()
+
+    stats = HeroStats.from_tournament_rows(pd.read_csv(args.data))
+    specs = list(args.slices or ["all"])
+    if args.per_year:
+        specs += [f"year:{y}" for y in sorted(set(int(y) for y in stats.years))]
+
+    patch_aggregates = None
+    if any(s.startswith("patch:") for s in specs):
+        from patches import PATCH_AGGREGATES, PatchAggregates
+        if os.path.exists(PATCH_AGGREGATES):
+            patch_aggregates = PatchAggregates.load()
+
+    start = time.time()
+    slices = build_slices(specs, stats, patch_aggregates)
+    result = render_report(slices, args.out, workers=args.workers, force=args.force,
+                           n_clusters=args.k, engine=args.engine)
+    index = write_index(slices, args.out)
+    print(f"{len(slices)} slices: {len(result['rendered'])} charts rendered, "
+          f"{len(result['skipped'])} unchanged, {len(result['failed'])} failed "
+          f"in {time.time() - start:.1f}s")
+    for key, error in result["failed"].items():
+        print(f"  ✗ {key}: {error[:100]}")
+    print(f"Report: {index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Per-role clustering: each Primary_Role (optionally each role x lane) on its own.
+
+Clustering all heroes together mostly separates popular roles from
+unpopular ones. Here every partition is scaled and clustered separately,
+on a process pool, and categorized with the usual rules, so the categories
+read as "META among Marksmen" rather than "a popular role". Labels are
+merged back with a global cluster id per (partition, cluster).
+
+Partition results are cached by a fingerprint of the partition's rows and
+the settings, so a change to one role's data refits only that role.
+Partitions too small for K clusters (MIN_PER_CLUSTER heroes per cluster)
+get fewer. A partition left with a single cluster (too few heroes, or one
+density cluster from HDBSCAN) is not a tier list: its heroes are marked
+UNCLUSTERED instead of sharing one category.
+
+Lanes come from the normalized rows (most frequent Lane per hero, ties
+alphabetical), see add_primary_lane().
+
+    python role_clustering.py [--data normalized.csv] [--k 3] [--lane] [--workers N]
+"""
+import argparse
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from hero_analysis import CATEGORY_COLOR_MAP, categorize_clusters
+from hero_stats import HeroStats
+
+FEATURES = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+MIN_PER_CLUSTER = 3
+CACHE_ENTRIES = 128
+LANE_COLUMN = "Primary_Lane"
+UNCLUSTERED = "UNCLUSTERED"
+UNCLUSTERED_COLOR = "#999999"
+
+
+class PartitionResult(NamedTuple):
+    key: tuple              # (role,) or (role, lane)
+    heroes: list
+    labels: np.ndarray
+    categories: dict        # cluster -> category
+    silhouette: float
+    fingerprint: str
+
+
+# ---------------------------
+# Lanes
+# ---------------------------
+def primary_lanes(rows):
+    """{hero: most frequent Lane} from hero x tournament rows"""
+    counts = rows.assign(Lane=rows["Lane"].fillna("Unknown")).groupby(["hero", "Lane"]).size()
+    counts = counts.rename("n").reset_index().sort_values(["hero", "n", "Lane"], ascending=[True, False, True])
+    return counts.drop_duplicates("hero").set_index("hero")["Lane"].to_dict()
+
+
+def add_primary_lane(frame, rows):
+    """Copy of an aggregated frame with a Primary_Lane column from the normalized rows"""
+    frame = frame.copy()
+    frame[LANE_COLUMN] = frame["hero"].map(primary_lanes(rows)).fillna("Unknown")
+    return frame
+
+
+# ---------------------------
+# Fitting
+# ---------------------------
+def _fingerprint(key, part, settings):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((key, settings)).encode())
+    columns = ["hero", "total_picks", "total_wins", "total_losses", "total_bans"]
+    h.update(part[columns].to_csv(index=False).encode())
+    return h.hexdigest()
+
+
+def fit_partition(key, part, n_clusters, engine, win_rate_feature, count_scale, fingerprint=""):
+    """Worker: scale, cluster and categorize one partition"""
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+    from clustering import fit_clusters
+
+    stats = HeroStats.from_aggregated(part)
+    k = max(1, min(n_clusters, len(part) // MIN_PER_CLUSTER))
+    labels = np.zeros(len(part), dtype=np.int64)
+    silhouette = float("nan")
+    if k > 1:
+        X_scaled = StandardScaler().fit_transform(stats.feature_matrix(FEATURES))
+        labels = np.asarray(fit_clusters(engine, X_scaled, k).labels)
+        if 1 < len(np.unique(labels)) < len(labels):
+            silhouette = float(silhouette_score(X_scaled, labels))
+    if len(np.unique(labels)) > 1:
+        categories, _ = categorize_clusters(stats, labels, win_rate_feature, count_scale)
+    else:
+        categories = {int(c): UNCLUSTERED for c in np.unique(labels)}
+    return PartitionResult(key, part["hero"].tolist(), labels, categories, silhouette, fingerprint)
+
+
+class PartitionCache:
+    """Thread-safe LRU of PartitionResults keyed by fingerprint"""
+
+    def __init__(self, entries=CACHE_ENTRIES):
+        self.entries = entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            result = self._results.get(fingerprint)
+            if result is not None:
+                self._results.move_to_end(fingerprint)
+            return result
+
+    def put(self, result):
+        with self._lock:
+            self._results[result.fingerprint] = result
+            while len(self._results) > self.entries:
+                self._results.popitem(last=False)
+
+
+_cache = PartitionCache()
+
+
+def fit_role_clusters(frame, n_clusters=3, engine="K-Means", win_rate_feature="overall_win_rate",
+                      count_scale=1.0, by=("Primary_Role",), workers=None, cache=None):
+    """Cluster every partition of `frame` (aggregated layout) separately
+
+    Returns (merged, results, refit): a copy of `frame` with partition /
+    role_cluster / cluster / category / category_color columns, the
+    {key: PartitionResult} map and the keys that were actually refitted.
+    """
+    missing = [c for c in by if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Cannot partition by {', '.join(missing)}: not in the data"
+                         + (" (see add_primary_lane)" if LANE_COLUMN in missing else ""))
+    cache = _cache if cache is None else cache
+    settings = (n_clusters, engine, win_rate_feature, round(float(count_scale), 12))
+
+    results, todo = {}, []
+    for key, part in frame.groupby(list(by), sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        part = part.reset_index(drop=True)
+        fingerprint = _fingerprint(key, part, settings)
+        cached = cache.get(fingerprint)
+        if cached is not None:
+            results[key] = cached
+        else:
+            todo.append((key, part, *settings, fingerprint))
+
+    workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+    if workers == 1:
+        fitted = [fit_partition(*args) for args in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fitted = list(pool.map(fit_partition, *zip(*todo)))
+    for result in fitted:
+        cache.put(result)
+        results[result.key] = result
+
+    # Merge: global cluster ids in partition order
+    merged = frame.copy()
+    position = {h: i for i, h in enumerate(merged["hero"])}
+    partition = np.empty(len(merged), dtype=object)
+    role_cluster = np.zeros(len(merged), dtype=np.int64)
+    cluster = np.zeros(len(merged), dtype=np.int64)
+    category = np.empty(len(merged), dtype=object)
+    offset = 0
+    for key in sorted(results):
+        result = results[key]
+        rows = np.fromiter((position[h] for h in result.heroes), dtype=np.int64, count=len(result.heroes))
+        partition[rows] = " / ".join(str(k) for k in key)
+        role_cluster[rows] = result.labels
+        cluster[rows] = result.labels + offset
+        category[rows] = [result.categories[int(c)] for c in result.labels]
+        offset += int(result.labels.max()) + 1
+    merged["partition"] = partition
+    merged["role_cluster"] = role_cluster
+    merged["cluster"] = cluster
+    merged["category"] = category
+    merged["category_color"] = merged["category"].map({**CATEGORY_COLOR_MAP, UNCLUSTERED: UNCLUSTERED_COLOR})
+    return merged, results, [args[0] for args in todo]
+
+
+def tier_list(merged):
+    """One row per (partition, category): heroes by picks, categories in CATEGORY_COLOR_MAP order"""
+    import pandas as pd
+
+    order = {c: i for i, c in enumerate([*CATEGORY_COLOR_MAP, UNCLUSTERED])}
+    rows = []
+    for (part, cat), group in merged.groupby(["partition", "category"]):
+        group = group.sort_values("total_picks", ascending=False)
+        rows.append({"partition": part, "category": cat, "heroes": len(group),
+                     "avg_win_rate": round(group["overall_win_rate"].mean(), 2),
+                     "members": ", ".join(group["hero"])})
+    tiers = pd.DataFrame(rows)
+    tiers["_order"] = tiers["category"].map(order)
+    return tiers.sort_values(["partition", "_order"]).drop(columns="_order").reset_index(drop=True)
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Per-role hero clustering")
+    parser.add_argument("--data", default="mlbb_dataset_normalized.csv",
+                        help="normalized rows (needed for --lane) or an aggregated CSV")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--engine", default="K-Means")
+    parser.add_argument("--lane", action="store_true", help="partition by role x lane")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="mlbb_role_tiers.csv")
+    args = parser.parse_args()
+
+    rows = pd.read_csv(args.data)
+    if "tournament_title" in rows.columns:
+        frame = HeroStats.from_tournament_rows(rows).to_frame()
+        if args.lane:
+            frame = add_primary_lane(frame, rows)
+    else:
+        frame = rows
+    by = ("Primary_Role", LANE_COLUMN) if args.lane else ("Primary_Role",)
+    merged, results, refit = fit_role_clusters(frame, args.k, args.engine, by=by, workers=args.workers)
+
+    for key, result in sorted(results.items()):
+        print(f"{' / '.join(map(str, key))}: {len(result.heroes)} heroes, "
+              f"{int(result.labels.max()) + 1} clusters, silhouette {result.silhouette:.3f}")
+    tiers = tier_list(merged)
+    print()
+    print(tiers.to_string(index=False, max_colwidth=80))
+    tiers.to_csv(args.out, index=False)
+    print(f"\nSaved {args.out} ({len(refit)} partitions fitted)")
+
+
+if __name__ == "__main__":
+    main()
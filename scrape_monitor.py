@@ -0,0 +1,277 @@
+"""Sanity and drift checks for newly scraped tournaments.
+
+Runs inline in the lp_tournament writer: every tournament's rows are checked
+before they reach the CSVs, and suspect tournaments go to QUARANTINE_DIR
+instead of the master CSV. All checks are vectorized over the heroes of one
+tournament (a few hundred microseconds per tournament).
+
+Errors (quarantine):
+    - negative counts, wins + losses != picks, win_rate != wins / picks
+    - a hero listed twice
+    - a hero picked or banned in more games than the tournament has
+      (games = total picks / 10)
+    - total wins and total losses differ by more than WIN_LOSS_TOLERANCE
+      (every game has five winners and five losers)
+    - more than MAX_BANS_PER_GAME bans per game
+    - %T columns disagreeing with the counts (e.g. a table counted twice)
+    - win rates scattered far beyond sampling noise vs the heroes' history
+
+Warnings (drift, reported only):
+    - pick / ban share distribution further from history (Jensen-Shannon)
+      than DRIFT_QUANTILE of past tournaments were from the rest
+    - heroes never seen before, unusually large tournaments
+
+A tournament already in the history (a re-scrape) is checked against the
+history without its own earlier rows, and observing it replaces them.
+
+    python scrape_monitor.py [normalized.csv]    audit every tournament vs the others
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+HISTORY_CSV = "mlbb_dataset_normalized.csv"
+QUARANTINE_DIR = "quarantine"
+
+WIN_LOSS_TOLERANCE = 0.03   # |wins - losses| / picks; real pages stay under ~1%
+MAX_BANS_PER_GAME = 10.5
+PCT_TOLERANCE = 0.05        # relative games-count disagreement between %T and counts
+DISPERSION_LIMIT = 4.0      # mean squared win-rate z-score; ~1 for real tournaments
+DRIFT_QUANTILE = 0.99
+SIZE_FACTOR = 1.5           # games above this x the largest past tournament -> warning
+MIN_PICKS_Z = 5             # heroes with fewer picks are left out of the win-rate test
+
+
+def _jsd(p, q):
+    """Row-wise Jensen-Shannon divergence (natural log) of count vectors"""
+    p = p / np.maximum(p.sum(axis=-1, keepdims=True), 1)
+    q = q / np.maximum(q.sum(axis=-1, keepdims=True), 1)
+    m = (p + q) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_p = np.where(p > 0, p * np.log(p / m), 0.0).sum(axis=-1)
+        kl_q = np.where(q > 0, q * np.log(q / m), 0.0).sum(axis=-1)
+    return (kl_p + kl_q) / 2
+
+
+def _dispersion(picks, wins, ref_picks, ref_wins):
+    """Mean squared binomial z-score of each row's win counts vs the reference rates"""
+    rate = np.where(ref_picks > 0, ref_wins / np.maximum(ref_picks, 1), 0.5)
+    rate = np.clip(rate, 0.02, 0.98)
+    z2 = (wins - picks * rate) ** 2 / (picks * rate * (1 - rate) + 1e-9)
+    used = (picks >= MIN_PICKS_Z) & (ref_picks > 0)
+    return np.where(used, z2, 0.0).sum(axis=-1) / np.maximum(used.sum(axis=-1), 1)
+
+
+def _arrays(rows):
+    """Row dicts / DataFrame in RECORD_FIELDS or normalized layout -> column arrays"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows) if not isinstance(rows, pd.DataFrame) else rows
+    columns = {
+        "hero": frame["hero"].astype(str).str.lower().to_numpy(),
+        "picks": frame["pick_total"].to_numpy(dtype=np.int64),
+        "wins": frame["pick_wins"].to_numpy(dtype=np.int64),
+        "losses": frame["pick_losses"].to_numpy(dtype=np.int64),
+        "bans": frame["ban_count"].to_numpy(dtype=np.int64),
+    }
+    for name in ("win_rate", "pick_pct"):
+        if name in frame.columns:
+            columns[name] = pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=np.float64)
+    return columns
+
+
+class ScrapeMonitor:
+    """History of accepted tournaments + per-check reference thresholds"""
+
+    def __init__(self, heroes, picks, wins, bans, titles=()):
+        self.heroes = list(heroes)
+        self.hero_index = {h: i for i, h in enumerate(self.heroes)}
+        picks, wins, bans = (np.asarray(a, dtype=np.float64) for a in (picks, wins, bans))
+        self.picks, self.wins, self.bans = picks.sum(axis=0), wins.sum(axis=0), bans.sum(axis=0)
+        # title -> (picks, wins, bans) on the hero axis of the time, so re-scrapes can be taken out
+        self.tournaments = {t: (picks[i], wins[i], bans[i]) for i, t in enumerate(titles)}
+        self.max_games = float(picks.sum(axis=1).max() / 10) if len(picks) else 0.0
+
+        # Leave-one-out scores of the past tournaments set the drift thresholds
+        self.thresholds = {"pick_drift": np.inf, "ban_drift": np.inf, "dispersion": np.inf}
+        if len(picks) >= 10:
+            rest_p, rest_w, rest_b = self.picks - picks, self.wins - wins, self.bans - bans
+            self.thresholds = {
+                "pick_drift": float(np.quantile(_jsd(picks, rest_p), DRIFT_QUANTILE)),
+                "ban_drift": float(np.quantile(_jsd(bans, rest_b), DRIFT_QUANTILE)),
+                "dispersion": float(np.quantile(_dispersion(picks, wins, rest_p, rest_w), DRIFT_QUANTILE)),
+            }
+
+    @classmethod
+    def from_frame(cls, df):
+        """From hero x tournament rows (mlbb_dataset_normalized.csv layout)"""
+        heroes, hero_codes = np.unique(df["hero"].astype(str).str.lower().to_numpy(), return_inverse=True)
+        titles, t_codes = np.unique(df["tournament_title"].astype(str).to_numpy(), return_inverse=True)
+        shape = (t_codes.max() + 1 if len(t_codes) else 0, len(heroes))
+        matrices = []
+        for column in ("pick_total", "pick_wins", "ban_count"):
+            arr = np.zeros(shape)
+            np.add.at(arr, (t_codes, hero_codes), df[column].to_numpy(dtype=np.float64))
+            matrices.append(arr)
+        return cls(heroes, *matrices, titles=titles.tolist())
+
+    @classmethod
+    def from_csv(cls, path=HISTORY_CSV):
+        import pandas as pd
+
+        return cls.from_frame(pd.read_csv(path, usecols=["hero", "tournament_title", "pick_total",
+                                                         "pick_wins", "ban_count"]))
+
+    def _align(self, heroes, values):
+        """Per-tournament counts laid out on the history's hero axis (+ unseen heroes dropped)"""
+        out = np.zeros(len(self.heroes))
+        idx = np.fromiter((self.hero_index.get(h, -1) for h in heroes), dtype=np.int64, count=len(heroes))
+        known = idx >= 0
+        np.add.at(out, idx[known], values[known])
+        return out
+
+    def _history(self, title):
+        """(picks, wins, bans) totals without `title`'s own rows"""
+        own = self.tournaments.get(title)
+        if own is None:
+            return self.picks, self.wins, self.bans
+        return tuple(total - np.pad(part, (0, len(total) - len(part))) for total, part in
+                     zip((self.picks, self.wins, self.bans), own))
+
+    # ---------------------------
+    # Checks
+    # ---------------------------
+    def check(self, rows, title=""):
+        """Report dict: errors / warnings (lists of str), stats, quarantine flag"""
+        c = _arrays(rows)
+        errors, warnings = [], []
+
+        def heroes_where(mask):
+            names = c["hero"][mask]
+            return ", ".join(names[:5]) + (f" (+{len(names) - 5})" if len(names) > 5 else "")
+
+        counts = np.stack([c["picks"], c["wins"], c["losses"], c["bans"]])
+        if (counts < 0).any():
+            errors.append(f"negative counts: {heroes_where((counts < 0).any(axis=0))}")
+        bad = c["wins"] + c["losses"] != c["picks"]
+        if bad.any():
+            errors.append(f"wins + losses != picks: {heroes_where(bad)}")
+        if "win_rate" in c:
+            expected = np.where(c["picks"] > 0, c["wins"] / np.maximum(c["picks"], 1) * 100, 0.0)
+            bad = np.abs(np.nan_to_num(c["win_rate"], nan=expected) - expected) > 0.01
+            if bad.any():
+                errors.append(f"win_rate does not match wins / picks: {heroes_where(bad)}")
+        _, first, repeats = np.unique(c["hero"], return_index=True, return_counts=True)
+        if (repeats > 1).any():
+            errors.append(f"heroes listed twice: {', '.join(c['hero'][first[repeats > 1]][:5])}")
+
+        total_picks = int(c["picks"].sum())
+        games = total_picks / 10
+        stats = {"rows": len(c["hero"]), "picks": total_picks, "games": games}
+        if total_picks == 0:
+            errors.append("no picks")
+            return {"title": title, "errors": errors, "warnings": warnings, "stats": stats, "quarantine": True}
+
+        limit = np.ceil(games)
+        if (c["picks"] > limit).any() or (c["bans"] > limit).any():
+            errors.append(f"picked / banned in more than the {games:.0f} games played: "
+                          f"{heroes_where((c['picks'] > limit) | (c['bans'] > limit))}")
+        imbalance = abs(int(c["wins"].sum()) - int(c["losses"].sum())) / total_picks
+        stats["win_loss_imbalance"] = imbalance
+        if imbalance > WIN_LOSS_TOLERANCE:
+            errors.append(f"total wins and losses differ by {imbalance:.1%} of picks")
+        bans_per_game = c["bans"].sum() / games
+        stats["bans_per_game"] = bans_per_game
+        if bans_per_game > MAX_BANS_PER_GAME:
+            errors.append(f"{bans_per_game:.1f} bans per game")
+        if "pick_pct" in c:
+            pct = c["pick_pct"]
+            used = (pct > 0) & (c["picks"] > 0)
+            if used.any():
+                implied = np.median(c["picks"][used] * 100 / pct[used])
+                stats["pct_games"] = float(implied)
+                if abs(implied - games) / games > PCT_TOLERANCE:
+                    errors.append(f"%T columns imply {implied:.0f} games, counts imply {games:.0f}")
+
+        # Drift against history (without this tournament's earlier scrape)
+        hist_picks, hist_wins, hist_bans = self._history(title)
+        unseen = ~np.isin(c["hero"], [h for h, n in zip(self.heroes, hist_picks + hist_bans) if n > 0])
+        if unseen.any():
+            warnings.append(f"heroes not seen before: {heroes_where(unseen)}")
+        if self.max_games and games > SIZE_FACTOR * self.max_games:
+            warnings.append(f"{games:.0f} games, largest past tournament had {self.max_games:.0f}")
+        picks = self._align(c["hero"], c["picks"].astype(np.float64))
+        wins = self._align(c["hero"], c["wins"].astype(np.float64))
+        bans = self._align(c["hero"], c["bans"].astype(np.float64))
+        stats["pick_drift"] = float(_jsd(picks, hist_picks))
+        stats["ban_drift"] = float(_jsd(bans, hist_bans))
+        stats["dispersion"] = float(_dispersion(picks, wins, hist_picks, hist_wins))
+        if stats["dispersion"] > DISPERSION_LIMIT:
+            errors.append(f"win rates scattered {stats['dispersion']:.1f}x beyond sampling noise "
+                          f"(columns swapped or misread?)")
+        for key, label in (("pick_drift", "pick shares"), ("ban_drift", "ban shares"),
+                           ("dispersion", "win rates")):
+            if stats[key] > self.thresholds[key] and not (key == "dispersion" and errors):
+                warnings.append(f"{label} unusual vs history ({key} {stats[key]:.3f} > "
+                                f"p{DRIFT_QUANTILE * 100:.0f} {self.thresholds[key]:.3f})")
+
+        return {"title": title, "errors": errors, "warnings": warnings, "stats": stats,
+                "quarantine": bool(errors)}
+
+    def observe(self, rows, title=None):
+        """Add an accepted tournament to the history, replacing `title`'s earlier rows (thresholds are kept)"""
+        if title in self.tournaments:
+            self.picks, self.wins, self.bans = self._history(title)
+        c = _arrays(rows)
+        new = [h for h in dict.fromkeys(c["hero"]) if h not in self.hero_index]
+        if new:
+            for h in new:
+                self.hero_index[h] = len(self.heroes)
+                self.heroes.append(h)
+            pad = np.zeros(len(new))
+            self.picks, self.wins, self.bans = (np.concatenate([a, pad]) for a in (self.picks, self.wins, self.bans))
+        own = tuple(self._align(c["hero"], c[k].astype(np.float64)) for k in ("picks", "wins", "bans"))
+        self.picks, self.wins, self.bans = (total + part for total, part in zip((self.picks, self.wins, self.bans), own))
+        if title is not None:
+            self.tournaments[title] = own
+        self.max_games = max(self.max_games, c["picks"].sum() / 10)
+
+
+def quarantine(title, rows, report, fields, directory=QUARANTINE_DIR):
+    """Write a suspect tournament's rows + report aside; returns the CSV path"""
+    import csv
+    import re
+
+    os.makedirs(directory, exist_ok=True)
+    name = re.sub(r"[^\w\-]+", "_", title).strip("_")[:120]
+    path = os.path.join(directory, f"{name}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, default=float)
+    return path
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    df = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else HISTORY_CSV)
+    flagged = 0
+    elapsed = 0.0
+    for title, rows in df.groupby("tournament_title", sort=False):
+        monitor = ScrapeMonitor.from_frame(df[df["tournament_title"] != title])
+        start = time.perf_counter()
+        report = monitor.check(rows, title)
+        elapsed += time.perf_counter() - start
+        if report["errors"] or report["warnings"]:
+            flagged += 1
+            print(f"{'✗' if report['quarantine'] else '⚠'} {title}")
+            for message in report["errors"] + report["warnings"]:
+                print(f"    {message}")
+    n = df["tournament_title"].nunique()
+    print(f"\n{flagged}/{n} tournaments flagged; {elapsed / n * 1000:.2f} ms per check")
@@ -0,0 +1,476 @@
+"""Long-running scrape scheduler, in place of the cron'd one-shot scrapers.
+
+Keeps a priority queue of scrape jobs and re-runs each one on its own
+interval. When several jobs are due, the lowest priority number runs first:
+
+    0  tournament  ongoing (start <= today <= end)     every ONGOING_INTERVAL
+    1  aggregate   rebuild the dataset after rows changed
+    2  tournament  finished within RECENT_DAYS          every RECENT_INTERVAL
+    3  heroes      hero metadata (lp_heroes registry)   every HEROES_INTERVAL
+    4  tournament  older or undated                     once, unless already in the dataset
+
+Tournament dates come from TOURNAMENT_DATES_CSV (`python patches.py dates`).
+An undated tournament of the current year counts as recently finished.
+
+Jobs wait in a heap ordered by due time and move to a heap ordered by
+priority when they fall due. A job key is queued at most once and never
+runs twice at the same time. Scheduling a queued key keeps the earlier due
+time and the better priority; scheduling a running key is deferred until it
+finishes. Every job that goes to the network first waits for the shared
+rate limiter (MIN_REQUEST_INTERVAL between jobs; lp_tournament.safe_get's
+retries come on top).
+
+A tournament's rows are hashed after parsing. Only a changed hash rewrites
+its CSV and schedules an aggregate job; changes within AGGREGATE_DELAY share
+one. The aggregate job replaces those tournaments' rows in the normalized
+CSV, then rebuilds the SQLite store, the aggregated CSV and, when
+`patches.py build` has created them, the per-patch totals. The dashboard
+picks these up through their file signatures. Heroes keep the dataset's
+Lane / Role_Normalized; the hero registry only fills them in for new
+heroes. Rows that fail the scrape_monitor checks are quarantined as in
+lp_tournament.
+
+Due times, row hashes and pending changes are saved to STATE_FILE after
+every job, so a restart resumes the queue instead of rescraping everything.
+
+    python scrape_scheduler.py run [--workers 2]    run until interrupted
+    python scrape_scheduler.py once                 run the due jobs, then exit (cron)
+    python scrape_scheduler.py status               queue from the saved state
+"""
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+STATE_FILE = "mlbb_scheduler_state.json"
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+AGGREGATED_CSV = "mlbb_heroes_aggregated.csv"
+
+WORKERS = 2
+MIN_REQUEST_INTERVAL = 2.0          # seconds between network jobs (Liquipedia's page request limit)
+ONGOING_INTERVAL = 5 * 60
+RECENT_INTERVAL = 6 * 3600
+RECENT_DAYS = 14
+HEROES_INTERVAL = 24 * 3600
+HEROES_THREADS = 1                  # lp_heroes page threads; revision checks keep it to a few pages
+AGGREGATE_DELAY = 60                # coalesce row changes arriving close together
+RETRY_DELAY = 10 * 60               # doubled per consecutive failure, up to MAX_RETRY_DELAY
+MAX_RETRY_DELAY = 6 * 3600
+POLL_SECONDS = 30                   # longest sleep, so new state / Ctrl-C are noticed
+
+PRIORITY = {"ongoing": 0, "aggregate": 1, "recent": 2, "heroes": 3, "finished": 4}
+ROLES = ("Tank", "Fighter", "Assassin", "Mage", "Marksman")
+# Registry lane word prefix -> the dataset's lane
+LANE_PREFIXES = {"exp": "Exp Lane", "gold": "Gold Lane", "mid": "Mid Lane", "jungl": "Jungle", "roam": "Roam"}
+
+
+class RateLimiter:
+    """At most one start per `interval` seconds, across threads"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+# ---------------------------
+# Tournaments
+# ---------------------------
+def tournament_status(tournament, dates, today=None):
+    """ongoing / recent / finished from the tournament's dates (year for undated ones)"""
+    today = today or date.today()
+    span = dates.get(tournament["title"])
+    if span is None:
+        return "recent" if tournament.get("year", 0) >= today.year else "finished"
+    start, end = span
+    if start <= today <= end:
+        return "ongoing"
+    if end < today <= end + timedelta(days=RECENT_DAYS):
+        return "recent"
+    return "recent" if today < start else "finished"     # announced tournaments are polled like recent ones
+
+
+def rows_hash(rows, fields):
+    """Order-independent hash of parsed tournament rows"""
+    records = sorted(json.dumps({k: r.get(k) for k in fields}, sort_keys=True, default=str) for r in rows)
+    return hashlib.sha1("\n".join(records).encode()).hexdigest()
+
+
+def normalize_role(text):
+    """First of ROLES named in a registry Role ('Fighter / Assassin' -> Fighter), else Other"""
+    for word in re.split(r"[^A-Za-z]+", text or ""):
+        if word.title() in ROLES:
+            return word.title()
+    return "Other"
+
+
+def normalize_lane(text):
+    """First of LANES named in a registry Lane ('Gold Laner / Roam' -> Gold Lane), else None"""
+    for word in re.split(r"[^A-Za-z]+", text or ""):
+        for prefix, lane in LANE_PREFIXES.items():
+            if word.lower().startswith(prefix):
+                return lane
+    return None
+
+
+def hero_roles(frame):
+    """hero -> (Lane, Role_Normalized): the dataset's for heroes it has, the hero registry for new ones"""
+    from lp_heroes import hero_lookup
+
+    roles, lanes = {}, {}
+    if "Lane" in frame.columns:
+        known = frame.dropna(subset=["Lane"]).drop_duplicates("hero", keep="last")
+        lanes = dict(zip(known["hero"], known["Lane"]))
+    if "Role_Normalized" in frame.columns:
+        known = frame.dropna(subset=["Role_Normalized"]).drop_duplicates("hero", keep="last")
+        roles = {hero: (lanes.get(hero), role) for hero, role in zip(known["hero"], known["Role_Normalized"])}
+    for hero, meta in hero_lookup().items():
+        if hero not in roles and meta.get("Role"):
+            roles[hero] = (normalize_lane(meta.get("Lane")) or lanes.get(hero), normalize_role(meta["Role"]))
+    for hero, lane in lanes.items():
+        roles.setdefault(hero, (lane, "Other"))
+    return roles
+
+
+def update_dataset(titles, normalized=NORMALIZED_CSV, aggregated=AGGREGATED_CSV):
+    """Replace `titles`' rows in the normalized CSV, then rebuild the store and the aggregated CSV
+
+    The per-patch totals are updated too when PATCH_AGGREGATES exists.
+    """
+    import pandas as pd
+    import hero_store
+    import patches
+    from chunked_aggregate import aggregate
+    from lp_tournament import tournament_csv_path
+
+    frame = pd.read_csv(normalized) if os.path.exists(normalized) else pd.DataFrame()
+    fresh = [pd.read_csv(tournament_csv_path(t)) for t in titles if os.path.exists(tournament_csv_path(t))]
+    if len(frame):
+        frame = frame[~frame["tournament_title"].isin(titles)]
+    frame = pd.concat([frame, *fresh], ignore_index=True)
+    frame["hero"] = frame["hero"].str.lower()           # the dataset keys heroes in lowercase
+    roles = hero_roles(frame)
+    frame["Lane"] = frame["hero"].map(lambda h: roles.get(h, (None, None))[0])
+    frame["Role_Normalized"] = frame["hero"].map(lambda h: roles.get(h, (None, "Other"))[1])
+
+    tmp = normalized + ".tmp"
+    frame.to_csv(tmp, index=False)
+    os.replace(tmp, normalized)
+    hero_store.build_store(normalized, hero_store.DB_PATH).close()
+    totals, _ = aggregate(normalized, workers=1)
+    tmp = aggregated + ".tmp"
+    totals.to_csv(tmp, index=False, lineterminator="\r\n")
+    os.replace(tmp, aggregated)
+    if os.path.exists(patches.PATCH_AGGREGATES):
+        patches.build_aggregates(normalized)
+    return len(frame), len(totals)
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+class Scheduler:
+    def __init__(self, tournaments, state_path=STATE_FILE, workers=WORKERS,
+                 min_interval=MIN_REQUEST_INTERVAL, aggregate_delay=AGGREGATE_DELAY):
+        self.tournaments = {t["title"]: t for t in tournaments}
+        self.state_path = state_path
+        self.workers = workers
+        self.limiter = RateLimiter(min_interval)
+        self.aggregate_delay = aggregate_delay
+
+        self.jobs = {}              # key -> {"due", "priority", "last_run", "status", "failures", "hash"}
+        self.changed = set()        # tournaments whose rows are not aggregated yet
+        self.roles_changed = False
+        self._delayed = []          # (due, seq, key)
+        self._ready = []            # (priority, due, seq, key)
+        self._queued = {}           # key -> seq of its live heap entry
+        self._in_flight = set()
+        self._deferred = {}         # key -> (due, priority) asked for while running
+        self._seq = itertools.count()
+        self.monitor = None
+        self.dates = {}
+
+    # Queue
+    def schedule(self, key, due, priority):
+        if key in self._in_flight:
+            old = self._deferred.get(key)
+            self._deferred[key] = (min(due, old[0]), min(priority, old[1])) if old else (due, priority)
+            return
+        job = self.jobs.setdefault(key, {})
+        if key in self._queued:
+            due, priority = min(due, job["due"]), min(priority, job["priority"])
+            if (due, priority) == (job["due"], job["priority"]):
+                return
+        job["due"], job["priority"] = due, priority
+        seq = next(self._seq)
+        self._queued[key] = seq
+        heapq.heappush(self._delayed, (due, seq, key))
+
+    def _promote(self, now):
+        while self._delayed and self._delayed[0][0] <= now:
+            due, seq, key = heapq.heappop(self._delayed)
+            if self._queued.get(key) == seq:
+                heapq.heappush(self._ready, (self.jobs[key]["priority"], due, seq, key))
+
+    def _pop_ready(self):
+        while self._ready:
+            _, _, seq, key = heapq.heappop(self._ready)
+            if self._queued.get(key) == seq:
+                del self._queued[key]
+                return key
+        return None
+
+    def _next_due(self):
+        while self._delayed and self._queued.get(self._delayed[0][2]) != self._delayed[0][1]:
+            heapq.heappop(self._delayed)
+        return self._delayed[0][0] if self._delayed else None
+
+    # State
+    def load(self):
+        """Saved state + any tournaments / jobs not seen before"""
+        from patches import TOURNAMENT_DATES_CSV, load_tournament_dates
+
+        self.dates = load_tournament_dates() if os.path.exists(TOURNAMENT_DATES_CSV) else {}
+        saved = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        self.changed = set(saved.get("changed", []))
+        self.roles_changed = saved.get("roles_changed", False)
+        in_dataset = set()
+        if os.path.exists(NORMALIZED_CSV):
+            import pandas as pd
+            in_dataset = set(pd.read_csv(NORMALIZED_CSV, usecols=["tournament_title"])["tournament_title"])
+
+        now = time.time()
+        for key, job in saved.get("jobs", {}).items():
+            self.jobs[key] = {k: v for k, v in job.items() if k not in ("due", "priority")}
+            if job.get("due") is not None:
+                self.schedule(key, job["due"], job["priority"])
+        for title, t in self.tournaments.items():
+            key = f"tournament:{title}"
+            if key in self.jobs:
+                continue
+            status = tournament_status(t, self.dates)
+            if status == "finished" and title in in_dataset:
+                self.jobs[key] = {"status": "in dataset"}
+            else:
+                self.schedule(key, now, PRIORITY[status])
+        if "heroes" not in self.jobs:
+            self.schedule("heroes", now, PRIORITY["heroes"])
+        if self.changed or self.roles_changed:
+            self.schedule("aggregate", now, PRIORITY["aggregate"])
+        self._load_monitor()
+
+    def save(self):
+        jobs = {}
+        for key, job in self.jobs.items():
+            queued = key in self._queued or key in self._in_flight
+            jobs[key] = {**job, "due": job.get("due") if queued else None}
+        for key, (due, priority) in self._deferred.items():
+            jobs[key].update(due=due, priority=priority)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"updated": int(time.time()), "jobs": jobs, "changed": sorted(self.changed),
+                       "roles_changed": self.roles_changed}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _load_monitor(self):
+        from lp_tournament import MONITOR_HISTORY, MONITOR_SCRAPES
+        from scrape_monitor import ScrapeMonitor
+
+        if MONITOR_SCRAPES and os.path.exists(MONITOR_HISTORY):
+            self.monitor = ScrapeMonitor.from_csv(MONITOR_HISTORY)
+
+    # Jobs (worker threads; results are applied on the scheduler thread)
+    def scrape_tournament(self, title, previous_hash):
+        import csv
+        import lp_tournament
+        from scrape_monitor import quarantine
+
+        t = self.tournaments[title]
+        self.limiter.wait()
+        html, error = lp_tournament.fetch_tournament(t)
+        if error:
+            return {"error": error}
+        stat_rows, debug_info = lp_tournament.parse_tournament_page(html, t)
+        rows = lp_tournament.expand_rows(stat_rows, t)
+        if not rows:
+            return {"error": debug_info.get("error") or "No rows parsed"}
+
+        fields = lp_tournament.RECORD_FIELDS
+        if self.monitor is not None:
+            check = self.monitor.check(rows, title)
+            if check["quarantine"]:
+                path = quarantine(title, rows, check, fields)
+                return {"error": f"quarantined ({path}): {'; '.join(check['errors'])}"}
+        digest = rows_hash(rows, fields)
+        if digest == previous_hash:
+            return {"hash": digest, "changed": False}
+
+        os.makedirs(lp_tournament.OUTPUT_DIR, exist_ok=True)
+        path = lp_tournament.tournament_csv_path(title)
+        with open(path + ".tmp", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows({k: r.get(k) for k in fields} for r in rows)
+        os.replace(path + ".tmp", path)
+        return {"hash": digest, "changed": True, "rows": len(rows)}
+
+    def refresh_heroes(self, previous_hash):
+        from lp_heroes import refresh_registry, write_csv
+
+        self.limiter.wait()
+        registry = refresh_registry(max_threads=HEROES_THREADS)
+        write_csv(registry)
+        digest = hashlib.sha1(json.dumps(
+            {name: [meta.get("Role"), meta.get("Lane")] for name, meta in registry.items()}, sort_keys=True
+        ).encode()).hexdigest()
+        return {"hash": digest, "changed": digest != previous_hash}
+
+    def aggregate(self, titles):
+        rows, heroes = update_dataset(sorted(titles))
+        return {"titles": titles, "rows": rows, "heroes": heroes}
+
+    def _start(self, pool, key):
+        job = self.jobs[key]
+        if key == "aggregate":
+            return pool.submit(self.aggregate, set(self.changed))
+        if key == "heroes":
+            return pool.submit(self.refresh_heroes, job.get("hash"))
+        return pool.submit(self.scrape_tournament, key.split(":", 1)[1], job.get("hash"))
+
+    def _next_run(self, key, result, now):
+        """(due, priority) of the next run, None when the job is done for good"""
+        job = self.jobs[key]
+        if result.get("error"):
+            delay = min(RETRY_DELAY * 2 ** (job["failures"] - 1), MAX_RETRY_DELAY)
+            return now + delay, job["priority"]
+        if key == "aggregate":
+            return None
+        if key == "heroes":
+            return now + HEROES_INTERVAL, PRIORITY["heroes"]
+        status = tournament_status(self.tournaments[key.split(":", 1)[1]], self.dates)
+        if status == "finished":
+            return None
+        return now + (ONGOING_INTERVAL if status == "ongoing" else RECENT_INTERVAL), PRIORITY[status]
+
+    def _finish(self, key, future):
+        now = time.time()
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        self._in_flight.discard(key)
+        job = self.jobs[key]
+        job["last_run"] = now
+        job["failures"] = job.get("failures", 0) + 1 if result.get("error") else 0
+        job["status"] = result.get("error") or ("changed" if result.get("changed") else "ok")
+        if "hash" in result:
+            job["hash"] = result["hash"]
+
+        stamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{stamp}] {key}: {job['status']}")
+        if key == "aggregate" and not result.get("error"):
+            self.changed -= result["titles"]
+            self.roles_changed = False
+            self._load_monitor()
+            print(f"           dataset: {result['rows']} rows, {result['heroes']} heroes")
+            if self.changed:            # rows that changed while aggregating
+                self.schedule("aggregate", now + self.aggregate_delay, PRIORITY["aggregate"])
+        elif result.get("changed"):
+            if key == "heroes":
+                self.roles_changed = True
+            else:
+                self.changed.add(key.split(":", 1)[1])
+            self.schedule("aggregate", now + self.aggregate_delay, PRIORITY["aggregate"])
+
+        following = self._next_run(key, result, now)
+        deferred = self._deferred.pop(key, None)
+        if deferred is not None:
+            following = deferred if following is None else (min(following[0], deferred[0]),
+                                                             min(following[1], deferred[1]))
+        if following is not None:
+            self.schedule(key, *following)
+        self.save()
+
+    def run(self, once=False):
+        """Run jobs as they fall due; `once` stops when nothing is due any more"""
+        if once:
+            self.aggregate_delay = 0
+        print(f"Scheduler: {len(self._queued)} jobs queued, {self.workers} workers, "
+              f"state {self.state_path}")
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    now = time.time()
+                    self._promote(now)
+                    while len(running) < self.workers:
+                        key = self._pop_ready()
+                        if key is None:
+                            break
+                        self._in_flight.add(key)
+                        running[self._start(pool, key)] = key
+
+                    next_due = self._next_due()
+                    if once and not running and (next_due is None or next_due > time.time()):
+                        break
+                    timeout = POLL_SECONDS if next_due is None else min(POLL_SECONDS, max(next_due - time.time(), 0))
+                    if running:
+                        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._finish(running.pop(future), future)
+                    else:
+                        time.sleep(timeout)
+            except KeyboardInterrupt:
+                print("Stopping: waiting for running jobs")
+                for future in list(running):
+                    self._finish(running.pop(future), future)
+        self.save()
+
+    def status(self):
+        """(key, due, priority, last status) of every known job, due jobs first"""
+        rows = []
+        for key, job in self.jobs.items():
+            queued = key in self._queued
+            rows.append((key, job.get("due") if queued else None, job.get("priority"), job.get("status", "")))
+        return sorted(rows, key=lambda r: (r[1] is None, r[1] or 0, r[2] or 0))
+
+
+def main():
+    from lp_tournament import tournaments
+
+    parser = argparse.ArgumentParser(description="Priority-queue scrape scheduler")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "once", "status"])
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--state", default=STATE_FILE)
+    args = parser.parse_args()
+
+    scheduler = Scheduler(tournaments, args.state, args.workers)
+    scheduler.load()
+    if args.command == "status":
+        now = time.time()
+        for key, due, priority, status in scheduler.status():
+            when = "-" if due is None else ("due" if due <= now else f"in {(due - now) / 60:.0f} min")
+            print(f"{when:>12}  p{priority if priority is not None else '-'}  {key}  {status}")
+        return
+    scheduler.run(once=args.command == "once")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,10 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-from sklearn.decomposition import PCA
+from hero_analysis import CATEGORY_COLOR_MAP, CATEGORY_EMOJI, WIN_RATE_BASES, categorize_clusters
+import hero_store
+import hashlib
+import io
+import os
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -21,23 +19,398 @@ st.set_page_config(
 st.title("🎮 Mobile Legends Hero Clustering Analysis")
 st.markdown("---")
 
-# File uploader
-uploaded_file = st.file_uploader("Upload MLBB Heroes Dataset (CSV)", type=['csv'])
+# ---------------------------
+# Comparison mode (shared cached preprocessing)
+# ---------------------------
+# pandas / numpy / matplotlib / seaborn / sklearn are imported where they are
+# first needed, so the landing page (and every worker spawn) skips their import cost.
+@st.cache_data(show_spinner=False)
+def prepare_dataset(data, window):
+    """Parse one dataset (or one year window of a normalized file) into features + moments"""
+    import numpy as np
+    import pandas as pd
+    from hero_stats import HeroStats
+    from dataset_comparison import FEATURES, aggregate_window, feature_moments
+
+    df = pd.read_csv(io.BytesIO(data))
+    if window is not None:
+        df = aggregate_window(df, *window).to_frame()
+        df = df[df['total_matches'] > 0].reset_index(drop=True)
+    stats = HeroStats.from_aggregated(df)
+    X = np.array(stats.feature_matrix(FEATURES))
+    return stats.to_frame(), X, feature_moments(X)
+
+
+@st.cache_data(show_spinner=False)
+def union_clusters(dataset_keys, _scaled_list, n_clusters):
+    """Cluster the union once per (dataset set, K); keys stand in for the arrays"""
+    from dataset_comparison import fit_union_clusters
+
+    model, labels = fit_union_clusters(_scaled_list, n_clusters)
+    return model.cluster_centers_, labels
+
+
+def render_comparison():
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    from hero_stats import HeroStats
+    from dataset_comparison import UnionProjection, cluster_moves, is_tournament_rows, parse_windows
+
+    st.header("🔀 Dataset Comparison")
+    files = st.file_uploader(
+        "Upload two or more MLBB datasets (aggregated or normalized CSV)",
+        type=['csv'], accept_multiple_files=True
+    )
+    n_clusters = st.sidebar.slider("Number of Clusters", 2, 10, 5)
+
+    datasets = []   # (label, cache key, frame, features, moments)
+    for f in files or []:
+        data = f.getvalue()
+        digest = hashlib.sha1(data).hexdigest()
+        if is_tournament_rows(pd.read_csv(io.BytesIO(data), nrows=0)):
+            text = st.sidebar.text_input(
+                f"Year windows for {f.name}", key=f"windows_{digest}",
+                placeholder="e.g. 2018-2021, 2022-2025 (empty = all years)"
+            )
+            try:
+                windows = parse_windows(text) or [(None, None)]
+            except ValueError:
+                st.sidebar.error(f"Invalid year windows for {f.name}")
+                continue
+        else:
+            windows = [None]
+
+        for window in windows:
+            label = f.name if window in (None, (None, None)) else f"{f.name} [{window[0]}-{window[1]}]"
+            df, X, moments = prepare_dataset(data, window)
+            datasets.append((label, (digest, window), df, X, moments))
+
+    if len(datasets) < 2:
+        st.info("👆 Upload at least two datasets, or one normalized file with two or more year windows.")
+        return
+
+    # Shared space: scaler + PCA from the combined moments, one KMeans on the union
+    projection = UnionProjection.from_moments([d[4] for d in datasets])
+    scaled = [projection.scale(d[3]) for d in datasets]
+    centers, labels = union_clusters(tuple(d[1] for d in datasets), scaled, n_clusters)
+
+    frames = {}
+    for (label, _, df, _, _), X_scaled, cluster_labels in zip(datasets, scaled, labels):
+        frame = df.copy()
+        frame['cluster'] = cluster_labels
+        pcs = projection.project(X_scaled)
+        frame['pca1'] = pcs[:, 0]
+        frame['pca2'] = pcs[:, 1]
+        cluster_categories, _ = categorize_clusters(HeroStats.from_aggregated(frame), cluster_labels)
+        frame['category'] = frame['cluster'].map(cluster_categories)
+        frames[label] = frame
+
+    # Overview
+    summary = pd.DataFrame([{
+        "Dataset": label,
+        "Heroes": len(frame),
+        "Total Picks": int(frame['total_picks'].sum()),
+        "Avg Win Rate": round(frame['overall_win_rate'].mean(), 2),
+        **{f"Cluster {c}": int((frame['cluster'] == c).sum()) for c in range(n_clusters)}
+    } for label, frame in frames.items()])
+    st.dataframe(summary, hide_index=True)
+    st.caption(f"Shared PCA space explains {projection.explained_variance_ratio_.sum():.1%} of the union variance")
+
+    # All datasets in the shared PCA space
+    st.subheader("🗺️ Shared PCA Space")
+    fig_all, ax_all = plt.subplots(figsize=(12, 8))
+    markers = ['o', 's', '^', 'D', 'v', 'P', '*', 'X']
+    for i, (label, frame) in enumerate(frames.items()):
+        ax_all.scatter(frame['pca1'], frame['pca2'], c=frame['cluster'], cmap='tab10',
+                       vmin=0, vmax=9, marker=markers[i % len(markers)], s=60,
+                       alpha=0.6, edgecolors='black', linewidth=0.5, label=label)
+    centers_pca = projection.project(centers)
+    ax_all.scatter(centers_pca[:, 0], centers_pca[:, 1], c='white', s=400, marker='X',
+                   edgecolors='black', linewidths=3, label='Cluster Centers', zorder=5)
+    ax_all.set_xlabel(f'PC1 ({projection.explained_variance_ratio_[0]:.1%} variance)')
+    ax_all.set_ylabel(f'PC2 ({projection.explained_variance_ratio_[1]:.1%} variance)')
+    ax_all.grid(True, alpha=0.3)
+    ax_all.legend(fontsize=9, loc='best', framealpha=0.9)
+    plt.tight_layout()
+    st.pyplot(fig_all)
+
+    # Pairwise diff
+    st.subheader("↔️ Hero Movement Between Datasets")
+    labels_list = list(frames)
+    col1, col2 = st.columns(2)
+    with col1:
+        base_label = st.selectbox("Base dataset", labels_list, index=0)
+    with col2:
+        other_label = st.selectbox("Compared dataset", labels_list, index=1)
+    top_n = st.slider("Heroes to draw (largest moves)", 5, 50, 15)
+
+    moves = cluster_moves(frames[base_label], frames[other_label])
+    drawn = moves.nlargest(top_n, 'shift')
+
+    fig_mv, ax_mv = plt.subplots(figsize=(12, 8))
+    ax_mv.scatter(moves['pca1_base'], moves['pca2_base'], c='lightgray', s=30, label=base_label)
+    for _, row in drawn.iterrows():
+        ax_mv.annotate('', xy=(row['pca1_other'], row['pca2_other']),
+                       xytext=(row['pca1_base'], row['pca2_base']),
+                       arrowprops=dict(arrowstyle='->', color='red' if row['moved'] else 'gray', alpha=0.8))
+        ax_mv.annotate(row['hero'], (row['pca1_other'], row['pca2_other']), fontsize=8, fontweight='bold')
+    ax_mv.set_title(f'{base_label} → {other_label} (red = changed cluster)')
+    ax_mv.set_xlabel('PC1')
+    ax_mv.set_ylabel('PC2')
+    ax_mv.grid(True, alpha=0.3)
+    plt.tight_layout()
+    st.pyplot(fig_mv)
+
+    moved = moves[moves['moved']].sort_values('shift', ascending=False)
+    st.write(f"**{len(moved)} of {len(moves)} shared heroes changed cluster**")
+    st.dataframe(
+        moved[['hero', 'cluster_base', 'category_base', 'cluster_other', 'category_other',
+               'delta_picks', 'delta_win_rate']],
+        hide_index=True
+    )
+
+
+# ---------------------------
+# Single dataset (process-wide shared caches)
+# ---------------------------
+# Pipeline outputs the dashboard can read directly, in order of preference
+PIPELINE_SOURCES = {
+    "Pipeline store (SQLite)": hero_store.DB_PATH,
+    "Aggregated CSV": "mlbb_heroes_aggregated.csv",
+    "Normalized CSV (aggregated on load)": "mlbb_dataset_normalized.csv",
+}
+
+
+def file_signature(path):
+    """(mtime_ns, size): changes whenever the pipeline rewrites the file"""
+    info = os.stat(path)
+    return info.st_mtime_ns, info.st_size
+
+
+def _aggregated(df):
+    from hero_stats import HeroStats
+    from dataset_comparison import is_tournament_rows
+
+    if is_tournament_rows(df):
+        rows = df
+        df = HeroStats.from_tournament_rows(rows).to_frame()
+        if 'Lane' in rows.columns:
+            from role_clustering import add_primary_lane
+            df = add_primary_lane(df, rows)
+    return df
+
+
+# cache_resource hands every session the same object instead of a pickled copy,
+# so everything below returns frames/models that the page must treat as read-only.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_pipeline_output(path, signature):
+    """Parse a pipeline output once per file version (signature = file_signature)"""
+    import pandas as pd
+
+    if path.endswith(".sqlite"):
+        conn = hero_store.connect(path, read_only=True)
+        try:
+            df = hero_store.load_aggregated(conn, with_sides=True)
+        finally:
+            conn.close()
+        return df.dropna(axis=1, how='all')     # side columns are NULL for older scrapes
+    return _aggregated(pd.read_csv(path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_patch_aggregates(path, signature):
+    """Per-patch hero totals (patches.py build), once per file version"""
+    from patches import PatchAggregates
+
+    return PatchAggregates.load(path)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def load_patch_frame(path, signature, patch):
+    """Aggregated frame of one patch, sliced from the pre-built per-patch totals"""
+    return load_patch_aggregates(path, signature).patch_frame(patch)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_upload(digest, _data):
+    """Parse an uploaded CSV once per content hash"""
+    import pandas as pd
+
+    return _aggregated(pd.read_csv(io.BytesIO(_data)))
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def fit_models(source_key, _raw, n_clusters, engine):
+    """Derived columns, scaler, clustering and PCA for one dataset version, K and engine"""
+    from sklearn.decomposition import PCA
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+    from hero_stats import HeroStats
+    from winrate_stats import add_win_rate_intervals
+    from clustering import fit_clusters
+
+    df = _raw.copy()
+    stats = HeroStats.from_aggregated(df)
+    df['total_matches'] = stats.total_matches
+    df['ban_rate'] = stats.ban_rate
+    if stats.has_sides:
+        df['blue_win_rate'] = stats.blue_win_rate
+        df['red_win_rate'] = stats.red_win_rate
+        df['side_bias'] = stats.side_bias
+
+    start = time.perf_counter()
+    add_win_rate_intervals(df)
+    interval_ms = (time.perf_counter() - start) * 1000
+
+    features = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(stats.feature_matrix(features))
+    start = time.perf_counter()
+    clustering = fit_clusters(engine, X_scaled, n_clusters)
+    fit_ms = (time.perf_counter() - start) * 1000
+    clusters = clustering.labels
+    df['cluster'] = clusters
+
+    pca = PCA(n_components=2)
+    X_pca = pca.fit_transform(X_scaled)
+    df['pca1'] = X_pca[:, 0]
+    df['pca2'] = X_pca[:, 1]
+
+    return {
+        "frame": df,
+        "stats": stats,
+        "features": features,
+        "X_scaled": X_scaled,
+        "clustering": clustering,
+        "clusters": clusters,
+        "cluster_means": stats.group_means(clusters, features),
+        "pca": pca,
+        "silhouette": (silhouette_score(X_scaled, clusters)
+                       if 1 < clustering.n_clusters < len(X_scaled) else float('nan')),
+        "interval_ms": interval_ms,
+        "fit_ms": fit_ms,
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def categorized_frame(source_key, n_clusters, engine, win_rate_feature, _models, count_scale=1.0):
+    """Fitted frame + category columns for one win-rate basis"""
+    cluster_categories, cluster_colors = categorize_clusters(
+        _models["stats"], _models["clusters"], win_rate_feature, count_scale
+    )
+    df = _models["frame"].copy()
+    df['category'] = df['cluster'].map(cluster_categories)
+    df['category_color'] = df['cluster'].map(cluster_colors)
+    return df, cluster_categories, cluster_colors
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def role_models(source_key, n_clusters, engine, win_rate_feature, by, _frame, count_scale=1.0):
+    """Per-role (or role x lane) clustering; unchanged partitions come from role_clustering's cache"""
+    from role_clustering import fit_role_clusters
+
+    return fit_role_clusters(_frame, n_clusters, engine, win_rate_feature, count_scale, by=by)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def elbow_scores(source_key, _X_scaled):
+    """WCSS and silhouette for K = 2..10"""
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    wcss = []
+    silhouette_scores = []
+    for k in range(2, 11):
+        kmeans_temp = KMeans(n_clusters=k, random_state=42, n_init=10)
+        kmeans_temp.fit(_X_scaled)
+        wcss.append(kmeans_temp.inertia_)
+        silhouette_scores.append(silhouette_score(_X_scaled, kmeans_temp.labels_))
+    return wcss, silhouette_scores
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def similarity_index(source_key, _stats):
+    """Nearest-neighbour index over the scaled features, one per dataset version"""
+    from hero_similarity import SimilarityIndex
+
+    return SimilarityIndex.build(_stats)
+
+
+# Mode selection
+mode = st.sidebar.radio("Mode", ["Single dataset", "Compare datasets"])
+if mode == "Compare datasets":
+    render_comparison()
+    st.stop()
+
+# Data source: pipeline output (shared, invalidated on file change) or an upload
+source_key, raw = None, None
+count_scale = 1.0       # category pick / ban cutoffs, scaled down for a single patch
+data_source = st.sidebar.radio("Data Source", ["Pipeline output", "Upload CSV"])
+if data_source == "Pipeline output":
+    available = {label: path for label, path in PIPELINE_SOURCES.items() if os.path.exists(path)}
+    if available:
+        source_label = st.sidebar.selectbox("Pipeline Output", list(available))
+        path = available[source_label]
+        source_key = (path, file_signature(path))
+        raw = load_pipeline_output(*source_key)
+        
+        # Optional patch filter over the pre-built per-patch totals
+        from patches import PATCH_AGGREGATES
+        if os.path.exists(PATCH_AGGREGATES):
+            patch_key = (PATCH_AGGREGATES, file_signature(PATCH_AGGREGATES))
+            aggregates = load_patch_aggregates(*patch_key)
+            patch = st.sidebar.selectbox("Patch", ["All patches"] + aggregates.stats.tournaments[::-1])
+            if patch != "All patches":
+                source_key = patch_key + (patch,)
+                raw = load_patch_frame(*source_key)
+                count_scale = aggregates.count_scale(patch)
+    else:
+        st.sidebar.warning("No pipeline output found in the working directory; upload a CSV instead.")
+else:
+    uploaded_file = st.file_uploader("Upload MLBB Heroes Dataset (CSV)", type=['csv'])
+    if uploaded_file is not None:
+        data = uploaded_file.getvalue()
+        source_key = ("upload", hashlib.sha256(data).hexdigest())
+        raw = load_upload(source_key[1], data)
+
+if raw is not None:
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+    from clustering import ENGINES
 
-if uploaded_file is not None:
-    # Load dataset
-    df = pd.read_csv(uploaded_file)
-    
-    # Calculate additional metrics
-    df['total_matches'] = df['total_picks'] + df['total_bans']
-    df['ban_rate'] = df['total_bans'] / df['total_matches'] * 100
-    
     # Sidebar
     st.sidebar.header("📊 Analysis Settings")
     show_elbow = st.sidebar.checkbox("Show Elbow Method Analysis", value=True)
-    n_clusters = 3  # Fixed to 5
+    n_clusters = 3  # Fixed to 3
     st.sidebar.info(f"**Number of Clusters: {n_clusters}** (Fixed)")
+    engine = st.sidebar.selectbox(
+        "Clustering Engine",
+        list(ENGINES),
+        help="HDBSCAN chooses its own number of clusters; its noise points form one extra group"
+    )
     show_labels = st.sidebar.checkbox("Show Hero Labels on Cluster Plot", value=True)
+    win_rate_basis = st.sidebar.selectbox(
+        "Win Rate Used for Categories",
+        list(WIN_RATE_BASES),
+        help="Lower bound / shrunk rates keep low-sample heroes out of META and HIGH WIN RATE"
+    )
+    per_role = st.sidebar.checkbox(
+        "Cluster Each Role Separately", value=False,
+        help="Adds per-role tier lists: categories relative to heroes of the same role"
+    )
+    role_partition = ("Primary_Role",)
+    if per_role and "Primary_Lane" in raw.columns:
+        if st.sidebar.checkbox("Split Roles by Lane", value=False):
+            role_partition = ("Primary_Role", "Primary_Lane")
+    
+    # Shared, read-only analysis for this dataset version (derived metrics, clusters, PCA)
+    with st.spinner(f"Performing {engine} clustering..."):
+        models = fit_models(source_key, raw, n_clusters, engine)
+        df, cluster_categories, cluster_colors = categorized_frame(
+            source_key, n_clusters, engine, WIN_RATE_BASES[win_rate_basis], models, count_scale
+        )
+    stats = models["stats"]
     
     # Dataset Overview
     st.header("📋 Dataset Overview")
@@ -168,247 +541,305 @@ if uploaded_file is not None:
     
     st.markdown("---")
     
-    # K-Means Clustering
-    st.header("🤖 K-Means Clustering Analysis")
+    # Win Rate Reliability
+    st.header("📏 Win Rate Reliability")
+    st.caption(f"Wilson 95% intervals and Bayesian-shrunk win rates for {len(df)} heroes "
+               f"(computed in {models['interval_ms']:.1f} ms, cached per dataset version)")
     
-    with st.spinner("Performing K-Means clustering..."):
-        # Prepare features
-        features = ['total_picks', 'total_bans', 'overall_win_rate', 'ban_rate']
-        X = df[features].copy()
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # Show Elbow Method if enabled
-        if show_elbow:
-            st.subheader("📈 Elbow Method Analysis")
-            st.info("Finding optimal K using Elbow Method and Silhouette Score (using K=5)")
-            
-            wcss = []
-            silhouette_scores = []
-            k_range = range(2, 11)
-            
-            for k in k_range:
-                kmeans_temp = KMeans(n_clusters=k, random_state=42, n_init=10)
-                kmeans_temp.fit(X_scaled)
-                wcss.append(kmeans_temp.inertia_)
-                silhouette_scores.append(silhouette_score(X_scaled, kmeans_temp.labels_))
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig_elbow, ax_elbow = plt.subplots(figsize=(8, 6))
-                ax_elbow.plot(k_range, wcss, marker='o', linewidth=2, markersize=8)
-                ax_elbow.axvline(x=5, color='r', linestyle='--', alpha=0.7, linewidth=2, label='K=5 (Selected)')
-                ax_elbow.set_title('Elbow Method', fontsize=12, fontweight='bold')
-                ax_elbow.set_xlabel('Number of Clusters (K)')
-                ax_elbow.set_ylabel('WCSS (Within-Cluster Sum of Squares)')
-                ax_elbow.grid(True, alpha=0.3)
-                ax_elbow.legend()
-                plt.tight_layout()
-                st.pyplot(fig_elbow)
-            
-            with col2:
-                fig_sil, ax_sil = plt.subplots(figsize=(8, 6))
-                ax_sil.plot(k_range, silhouette_scores, marker='s', linewidth=2, 
-                           markersize=8, color='green')
-                ax_sil.axvline(x=5, color='r', linestyle='--', alpha=0.7, linewidth=2, label='K=5 (Selected)')
-                ax_sil.set_title('Silhouette Scores', fontsize=12, fontweight='bold')
-                ax_sil.set_xlabel('Number of Clusters (K)')
-                ax_sil.set_ylabel('Silhouette Score')
-                ax_sil.grid(True, alpha=0.3)
-                ax_sil.legend()
-                plt.tight_layout()
-                st.pyplot(fig_sil)
-            
-            st.markdown("---")
-        
-        # Apply K-Means with K=5
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(X_scaled)
-        df['cluster'] = clusters
-        
-        # Define category color map
-        category_color_map = {
-            "META": "#FF4444",
-            "PRIORITY BAN": "#FF8800",
-            "POPULAR BUT WEAK": "#FFDD00",
-            "HIGH WIN RATE": "#44FF44",
-            "SITUATIONAL": "#4444FF"
-        }
-        
-        # Determine category for each cluster
-        cluster_categories = {}
-        cluster_colors = {}
-        
-        for cluster_id in sorted(df['cluster'].unique()):
-            cluster_data = df[df['cluster'] == cluster_id]
-            
-            avg_picks = cluster_data['total_picks'].mean()
-            avg_bans = cluster_data['total_bans'].mean()
-            avg_winrate = cluster_data['overall_win_rate'].mean()
-            avg_banrate = cluster_data['ban_rate'].mean()
-            
-            # Determine cluster category
-            if avg_picks > 1000 and avg_winrate > 52:
-                category = "META"
-            elif avg_bans > 500 and avg_banrate > 40:
-                category = "PRIORITY BAN"
-            elif avg_picks > 500 and avg_winrate < 48:
-                category = "POPULAR BUT WEAK"
-            elif avg_winrate > 54:
-                category = "HIGH WIN RATE"
-            else:
-                category = "SITUATIONAL"
-            
-            cluster_categories[cluster_id] = category
-            cluster_colors[cluster_id] = category_color_map[category]
-        
-        # Add category to dataframe
-        df['category'] = df['cluster'].map(cluster_categories)
-        df['category_color'] = df['cluster'].map(cluster_colors)
-        
-        # PCA for visualization
-        pca = PCA(n_components=2)
-        X_pca = pca.fit_transform(X_scaled)
-        df['pca1'] = X_pca[:, 0]
-        df['pca2'] = X_pca[:, 1]
-        
-        # Calculate metrics
-        silhouette_avg = silhouette_score(X_scaled, clusters)
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        contenders = df[df['overall_win_rate'] > 52].sort_values('overall_win_rate')
+        fig_ci, ax_ci = plt.subplots(figsize=(10, max(4, len(contenders) * 0.3)))
+        ax_ci.errorbar(contenders['overall_win_rate'], contenders['hero'],
+                       xerr=[contenders['overall_win_rate'] - contenders['win_rate_lower'],
+                             contenders['win_rate_upper'] - contenders['overall_win_rate']],
+                       fmt='o', capsize=3, color='#1f77b4', label='Raw win rate (95% CI)')
+        ax_ci.scatter(contenders['win_rate_shrunk'], contenders['hero'],
+                      marker='D', color='orange', zorder=3, label='Bayesian shrunk')
+        ax_ci.axvline(x=50, color='r', linestyle='--', alpha=0.5)
+        ax_ci.set_xlabel('Win Rate (%)')
+        ax_ci.set_title('Heroes Above 52% Raw Win Rate')
+        ax_ci.grid(True, alpha=0.3)
+        ax_ci.legend()
+        plt.tight_layout()
+        st.pyplot(fig_ci)
+    with col2:
+        st.dataframe(
+            df[['hero', 'total_picks', 'overall_win_rate', 'win_rate_lower',
+                'win_rate_upper', 'win_rate_shrunk']]
+            .sort_values('win_rate_lower', ascending=False),
+            hide_index=True
+        )
+    
+    st.markdown("---")
+    
+    # Side Win Rates (datasets scraped with the Blue/Red side columns)
+    if stats.has_sides:
+        st.header("🔵🔴 Side Win Rates")
+        min_side_picks = st.slider("Minimum picks per side", 0, 200, 20)
+        side_df = df[(df['total_blue_picks'] >= min_side_picks) & (df['total_red_picks'] >= min_side_picks)]
         
-        # Display metrics
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns([3, 2])
         with col1:
-            st.metric("Number of Clusters", n_clusters)
+            fig_side, ax_side = plt.subplots(figsize=(10, 7))
+            ax_side.scatter(side_df['blue_win_rate'], side_df['red_win_rate'],
+                            s=side_df['total_picks'] / 10 + 20, alpha=0.6,
+                            c=side_df['side_bias'], cmap='coolwarm_r', edgecolors='black')
+            ax_side.plot([0, 100], [0, 100], color='gray', linestyle='--', alpha=0.5)
+            for _, row in side_df.nlargest(10, 'side_bias').iterrows():
+                ax_side.annotate(row['hero'], (row['blue_win_rate'], row['red_win_rate']), fontsize=8)
+            for _, row in side_df.nsmallest(10, 'side_bias').iterrows():
+                ax_side.annotate(row['hero'], (row['blue_win_rate'], row['red_win_rate']), fontsize=8)
+            ax_side.set_xlabel('Blue Side Win Rate (%)')
+            ax_side.set_ylabel('Red Side Win Rate (%)')
+            ax_side.set_title('Blue vs Red Side Win Rate (below diagonal = blue-favoured)')
+            ax_side.grid(True, alpha=0.3)
+            plt.tight_layout()
+            st.pyplot(fig_side)
         with col2:
-            st.metric("Silhouette Score", f"{silhouette_avg:.3f}")
-        with col3:
-            st.metric("PCA Variance Explained", f"{pca.explained_variance_ratio_.sum():.1%}")
+            st.dataframe(
+                side_df[['hero', 'total_blue_picks', 'blue_win_rate', 'total_red_picks',
+                         'red_win_rate', 'side_bias']]
+                .sort_values('side_bias', key=abs, ascending=False),
+                hide_index=True
+            )
         
         st.markdown("---")
+    
+    # Clustering
+    st.header(f"🤖 {engine} Clustering Analysis")
+    
+    X_scaled = models["X_scaled"]
+    
+    # Show Elbow Method if enabled
+    if show_elbow:
+        st.subheader("📈 Elbow Method Analysis")
+        st.info("Finding optimal K using Elbow Method and Silhouette Score (using K=5)")
         
-        # Cluster Visualization with Category Colors
-        st.subheader("🎨 Cluster Visualization (Colored by Category)")
-        
-        fig9, ax9 = plt.subplots(figsize=(18, 13))
-        
-        # Plot each category with its color
-        for category, color in category_color_map.items():
-            mask = df['category'] == category
-            if mask.any():
-                ax9.scatter(df[mask]['pca1'], df[mask]['pca2'], 
-                           c=color, 
-                           label=category,
-                           s=100, 
-                           alpha=0.6,
-                           edgecolors='black',
-                           linewidth=0.5)
-        
-        # Add hero labels if enabled
-        if show_labels:
-            for idx, row in df.iterrows():
-                ax9.annotate(row['hero'], 
-                            (row['pca1'], row['pca2']),
-                            fontsize=7,
-                            alpha=0.9,
-                            ha='center',
-                            color=row['category_color'],
-                            fontweight='bold')
-        
-        # Plot cluster centers
-        centers_pca = pca.transform(kmeans.cluster_centers_)
-        ax9.scatter(centers_pca[:, 0], centers_pca[:, 1], 
-                   c='white', s=400, marker='X',
-                   edgecolors='black', linewidths=3,
-                   label='Cluster Centers', zorder=5)
-        
-        ax9.set_xlabel(f'PC1 ({pca.explained_variance_ratio_[0]:.1%} variance)', fontsize=12)
-        ax9.set_ylabel(f'PC2 ({pca.explained_variance_ratio_[1]:.1%} variance)', fontsize=12)
-        ax9.set_title(f'PCA Visualization of Hero Clusters (K={n_clusters}) - Colored by Category', 
-                     fontsize=14, fontweight='bold')
-        ax9.grid(True, alpha=0.3)
-        ax9.legend(fontsize=11, loc='best', framealpha=0.9)
-        plt.tight_layout()
-        st.pyplot(fig9)
-        
-        st.markdown("---")
+        k_range = range(2, 11)
+        wcss, silhouette_scores = elbow_scores(source_key, X_scaled)
         
-        # Category Distribution
-        st.subheader("📊 Category Distribution")
-        category_counts = df['category'].value_counts()
+        col1, col2 = st.columns(2)
         
-        col1, col2 = st.columns([1, 2])
         with col1:
-            for category, count in category_counts.items():
-                color = category_color_map[category]
-                st.markdown(f"<div style='background-color: {color}; padding: 10px; margin: 5px; border-radius: 5px; color: black; font-weight: bold;'>{category}: {count} heroes</div>", unsafe_allow_html=True)
+            fig_elbow, ax_elbow = plt.subplots(figsize=(8, 6))
+            ax_elbow.plot(k_range, wcss, marker='o', linewidth=2, markersize=8)
+            ax_elbow.axvline(x=5, color='r', linestyle='--', alpha=0.7, linewidth=2, label='K=5 (Selected)')
+            ax_elbow.set_title('Elbow Method', fontsize=12, fontweight='bold')
+            ax_elbow.set_xlabel('Number of Clusters (K)')
+            ax_elbow.set_ylabel('WCSS (Within-Cluster Sum of Squares)')
+            ax_elbow.grid(True, alpha=0.3)
+            ax_elbow.legend()
+            plt.tight_layout()
+            st.pyplot(fig_elbow)
         
         with col2:
-            fig_cat, ax_cat = plt.subplots(figsize=(8, 6))
-            colors_list = [category_color_map[cat] for cat in category_counts.index]
-            ax_cat.bar(category_counts.index, category_counts.values, color=colors_list, edgecolor='black', linewidth=1.5)
-            ax_cat.set_xlabel('Category', fontsize=12)
-            ax_cat.set_ylabel('Number of Heroes', fontsize=12)
-            ax_cat.set_title('Heroes per Category', fontsize=14, fontweight='bold')
-            ax_cat.tick_params(axis='x', rotation=45)
+            fig_sil, ax_sil = plt.subplots(figsize=(8, 6))
+            ax_sil.plot(k_range, silhouette_scores, marker='s', linewidth=2, 
+                       markersize=8, color='green')
+            ax_sil.axvline(x=5, color='r', linestyle='--', alpha=0.7, linewidth=2, label='K=5 (Selected)')
+            ax_sil.set_title('Silhouette Scores', fontsize=12, fontweight='bold')
+            ax_sil.set_xlabel('Number of Clusters (K)')
+            ax_sil.set_ylabel('Silhouette Score')
+            ax_sil.grid(True, alpha=0.3)
+            ax_sil.legend()
             plt.tight_layout()
-            st.pyplot(fig_cat)
+            st.pyplot(fig_sil)
         
         st.markdown("---")
+    
+    # Clustering / PCA fitted once per dataset version (see fit_models)
+    clustering = models["clustering"]
+    pca = models["pca"]
+    cluster_means = models["cluster_means"]
+    silhouette_avg = models["silhouette"]
+    
+    # Define category color map
+    category_color_map = CATEGORY_COLOR_MAP
+    
+    # Display metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Number of Clusters", clustering.n_clusters)
+    with col2:
+        st.metric("Silhouette Score", f"{silhouette_avg:.3f}")
+        st.caption(f"{engine} fit in {models['fit_ms']:.0f} ms")
+    with col3:
+        st.metric("PCA Variance Explained", f"{pca.explained_variance_ratio_.sum():.1%}")
+    
+    st.markdown("---")
+    
+    # Cluster Visualization with Category Colors
+    st.subheader("🎨 Cluster Visualization (Colored by Category)")
+    
+    fig9, ax9 = plt.subplots(figsize=(18, 13))
+    
+    # Plot each category with its color
+    for category, color in category_color_map.items():
+        mask = df['category'] == category
+        if mask.any():
+            ax9.scatter(df[mask]['pca1'], df[mask]['pca2'], 
+                       c=color, 
+                       label=category,
+                       s=100, 
+                       alpha=0.6,
+                       edgecolors='black',
+                       linewidth=0.5)
+    
+    # Add hero labels if enabled
+    if show_labels:
+        for idx, row in df.iterrows():
+            ax9.annotate(row['hero'], 
+                        (row['pca1'], row['pca2']),
+                        fontsize=7,
+                        alpha=0.9,
+                        ha='center',
+                        color=row['category_color'],
+                        fontweight='bold')
+    
+    # Plot cluster centers
+    centers_pca = pca.transform(clustering.centers)
+    ax9.scatter(centers_pca[:, 0], centers_pca[:, 1], 
+               c='white', s=400, marker='X',
+               edgecolors='black', linewidths=3,
+               label='Cluster Centers', zorder=5)
+    
+    ax9.set_xlabel(f'PC1 ({pca.explained_variance_ratio_[0]:.1%} variance)', fontsize=12)
+    ax9.set_ylabel(f'PC2 ({pca.explained_variance_ratio_[1]:.1%} variance)', fontsize=12)
+    ax9.set_title(f'PCA Visualization of Hero Clusters ({engine}, K={clustering.n_clusters}) - Colored by Category', 
+                 fontsize=14, fontweight='bold')
+    ax9.grid(True, alpha=0.3)
+    ax9.legend(fontsize=11, loc='best', framealpha=0.9)
+    plt.tight_layout()
+    st.pyplot(fig9)
+    
+    st.markdown("---")
+    
+    # Category Distribution
+    st.subheader("📊 Category Distribution")
+    category_counts = df['category'].value_counts()
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        for category, count in category_counts.items():
+            color = category_color_map[category]
+            st.markdown(f"<div style='background-color: {color}; padding: 10px; margin: 5px; border-radius: 5px; color: black; font-weight: bold;'>{category}: {count} heroes</div>", unsafe_allow_html=True)
+    
+    with col2:
+        fig_cat, ax_cat = plt.subplots(figsize=(8, 6))
+        colors_list = [category_color_map[cat] for cat in category_counts.index]
+        ax_cat.bar(category_counts.index, category_counts.values, color=colors_list, edgecolor='black', linewidth=1.5)
+        ax_cat.set_xlabel('Category', fontsize=12)
+        ax_cat.set_ylabel('Number of Heroes', fontsize=12)
+        ax_cat.set_title('Heroes per Category', fontsize=14, fontweight='bold')
+        ax_cat.tick_params(axis='x', rotation=45)
+        plt.tight_layout()
+        st.pyplot(fig_cat)
+    
+    st.markdown("---")
+    
+    # Cluster Analysis
+    st.subheader("📊 Detailed Cluster Analysis")
+    
+    for cluster_id in sorted(df['cluster'].unique()):
+        cluster_data = df[df['cluster'] == cluster_id]
         
-        # Cluster Analysis
-        st.subheader("📊 Detailed Cluster Analysis")
+        avg_picks, avg_bans, avg_winrate, avg_banrate = cluster_means[cluster_id]
         
-        for cluster_id in sorted(df['cluster'].unique()):
-            cluster_data = df[df['cluster'] == cluster_id]
-            
-            avg_picks = cluster_data['total_picks'].mean()
-            avg_bans = cluster_data['total_bans'].mean()
-            avg_winrate = cluster_data['overall_win_rate'].mean()
-            avg_banrate = cluster_data['ban_rate'].mean()
-            
-            category = cluster_categories[cluster_id]
-            color = cluster_colors[cluster_id]
-            
-            # Emoji mapping
-            emoji_map = {
-                "META": "🔴",
-                "PRIORITY BAN": "🟠",
-                "POPULAR BUT WEAK": "🟡",
-                "HIGH WIN RATE": "🟢",
-                "SITUATIONAL": "🔵"
-            }
+        category = cluster_categories[cluster_id]
+        color = cluster_colors[cluster_id]
+        
+        noise = " (HDBSCAN noise)" if cluster_id == clustering.noise_label else ""
+        with st.expander(f"{CATEGORY_EMOJI[category]} Cluster {cluster_id}{noise} - {category} ({len(cluster_data)} heroes)"):
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Avg Picks", f"{avg_picks:.0f}")
+            with col2:
+                st.metric("Avg Bans", f"{avg_bans:.0f}")
+            with col3:
+                st.metric("Avg Win Rate", f"{avg_winrate:.2f}%")
+            with col4:
+                st.metric("Avg Ban Rate", f"{avg_banrate:.2f}%")
             
-            with st.expander(f"{emoji_map[category]} Cluster {cluster_id} - {category} ({len(cluster_data)} heroes)"):
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Avg Picks", f"{avg_picks:.0f}")
-                with col2:
-                    st.metric("Avg Bans", f"{avg_bans:.0f}")
-                with col3:
-                    st.metric("Avg Win Rate", f"{avg_winrate:.2f}%")
-                with col4:
-                    st.metric("Avg Ban Rate", f"{avg_banrate:.2f}%")
-                
-                st.write("**Heroes in this cluster:**")
-                st.write(", ".join(sorted(cluster_data['hero'].tolist())))
+            st.write("**Heroes in this cluster:**")
+            st.write(", ".join(sorted(cluster_data['hero'].tolist())))
+    
+    st.markdown("---")
+    
+    # Per-role tier lists
+    if per_role:
+        from role_clustering import UNCLUSTERED, tier_list
+        st.header("🧩 Per-Role Tier Lists")
+        with st.spinner("Clustering each role..."):
+            role_df, role_results, _ = role_models(
+                source_key, n_clusters, engine, WIN_RATE_BASES[win_rate_basis], role_partition,
+                df, count_scale
+            )
+        tiers = tier_list(role_df)
+        partitions = sorted(tiers['partition'].unique())
+        for tab, partition in zip(st.tabs(partitions), partitions):
+            with tab:
+                for _, tier in tiers[tiers['partition'] == partition].iterrows():
+                    st.markdown(f"**{CATEGORY_EMOJI.get(tier['category'], '⚪')} {tier['category']}** "
+                                f"({tier['heroes']} heroes, avg win rate {tier['avg_win_rate']:.2f}%)")
+                    st.write(tier['members'])
+        if (tiers['category'] == UNCLUSTERED).any():
+            st.caption(f"{UNCLUSTERED}: partitions too small (or too uniform) for more than one cluster")
+        silhouettes = {" / ".join(map(str, key)): result.silhouette for key, result in role_results.items()}
+        st.caption("Silhouette per partition: " + ", ".join(
+            f"{name} {score:.3f}" for name, score in sorted(silhouettes.items()) if score == score
+        ))
         
         st.markdown("---")
-        
-        # Download results
-        st.subheader("💾 Download Results")
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download Clustered Data as CSV",
-            data=csv,
-            file_name="mlbb_heroes_clustered.csv",
-            mime="text/csv"
+    
+    # Similar Heroes
+    st.header("🧭 Similar Heroes")
+    index = similarity_index(source_key, stats)
+    indexed_heroes = sorted(index.partition().heroes)
+    
+    col1, col2, col3 = st.columns([1, 2, 2])
+    with col1:
+        target = st.selectbox("Hero", indexed_heroes)
+        k_similar = st.slider("Heroes to show", 3, 15, 5)
+        unavailable = st.multiselect("Unavailable (banned / already picked)", indexed_heroes)
+    categories = df.set_index('hero')['category']
+    with col2:
+        st.subheader(f"Most like {target}")
+        similar = pd.DataFrame(index.most_similar(target, k=k_similar), columns=['hero', 'distance'])
+        similar['category'] = similar['hero'].map(categories)
+        st.dataframe(similar.round(3), hide_index=True)
+    with col3:
+        st.subheader(f"Replacements if {target} is banned")
+        replacements = pd.DataFrame(index.replacements(target, k=k_similar, exclude=unavailable),
+                                    columns=['hero', 'distance'])
+        replacements['category'] = replacements['hero'].map(categories)
+        st.dataframe(replacements.round(3), hide_index=True)
+    st.caption("Euclidean distance between standardized pick / ban / win rate / ban rate vectors")
+    
+    st.markdown("---")
+    
+    # Download results: serialised only when the button is clicked, cached per clustering result
+    st.subheader("💾 Download Results")
+    from exports import available_formats, export, file_name, mime_type, result_key
+    export_key = result_key(source_key, n_clusters, engine, WIN_RATE_BASES[win_rate_basis], count_scale)
+    export_format = st.selectbox("Format", available_formats())
+    
+    def clustered_export():
+        summary = df.groupby(['cluster', 'category'], as_index=False).agg(
+            heroes=('hero', 'count'), avg_picks=('total_picks', 'mean'), avg_bans=('total_bans', 'mean'),
+            avg_win_rate=('overall_win_rate', 'mean'), avg_ban_rate=('ban_rate', 'mean')
         )
+        return export(df, export_format, export_key, sheets={"Clusters": summary})
+    
+    st.download_button(
+        label=f"Download Clustered Data as {export_format}",
+        data=clustered_export,
+        file_name=file_name(export_format),
+        mime=mime_type(export_format)
+    )
 
 else:
-    st.info("👆 Please upload the MLBB Heroes dataset (CSV file) to begin the analysis.")
+    st.info("👆 Please upload the MLBB Heroes dataset (CSV file) or run the pipeline to begin the analysis.")
     st.markdown("""
     ### Expected CSV Format:
     The CSV should contain the following columns:
@@ -419,6 +850,7 @@ else:
     - `total_losses`: Total losses
     - `total_bans`: Total bans
     - `overall_win_rate`: Win rate percentage
+    - Optional: `total_blue_picks`, `total_blue_wins`, `total_red_picks`, `total_red_wins` for side win rates
     
     ### Categories:
     - 🔴 **META**: High picks (>1000) and high win rate (>52%)
@@ -0,0 +1,245 @@
+"""Synthetic hero x tournament rows in the mlbb_dataset_normalized.csv layout.
+
+Tournaments are simulated game by game from a profile of the real data, so
+the invariants of the scraped tables hold exactly:
+
+    pick_wins + pick_losses = pick_total
+    pick_total + ban_count <= games     (a hero is picked or banned at most once per game)
+    sum(pick_total) = 10 x games, sum(pick_wins) = sum(pick_losses) = 5 x games
+
+Profile (Profile.from_csv): each hero's role, lane, pick and ban popularity,
+a strength taken from its shrunk win rate, and its first year in the data
+(it is unavailable before that). Each real tournament contributes its games
+and bans per game. Tournaments resample those sizes with jitter and reweight
+popularity (META_SIGMA), so metas differ between tournaments. About 90 of
+130 heroes are picked per tournament, against about 70 in the real data.
+Each game draws 10 picks and up to 10 bans without replacement. Teams
+alternate down the pick order, and the stronger team wins more often.
+
+Asking for more heroes than the real pool adds clones of real heroes. The
+clones keep the role and lane mix, with jittered popularity and strength.
+Each tournament then plays a window of as many heroes as the real pool.
+
+Only picked heroes get a row, as on the Liquipedia statistics pages. The
+result has at least `rows` rows (whole tournaments).
+
+    python synthetic_data.py 100000 [--heroes 130] [--seed 42] [--out synthetic.csv|.parquet]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+NORMALIZED_CSV = "mlbb_dataset_normalized.csv"
+META_SIGMA = 1.5            # per-tournament log-popularity noise
+BAN_SIGMA = 0.5             # extra noise of ban popularity on top of the meta
+CLONE_SIGMA = 0.5           # log-popularity jitter of cloned heroes
+GAMES_SIGMA = 0.15          # log jitter of resampled tournament sizes
+MIN_GAMES = 10
+PICKS_PER_GAME = 10
+MAX_BANS_PER_GAME = 10
+BATCH_GAMES = 20_000        # games simulated per vectorized batch
+SHRINK_PICKS = 100          # win rate shrinkage towards 50% for the strengths
+
+
+class Profile:
+    """Per-hero and per-tournament statistics the generator samples from"""
+
+    def __init__(self, heroes, roles, lanes, pick_weight, ban_weight, strength, released,
+                 games, bans_per_game, years):
+        self.heroes = np.asarray(heroes, dtype=object)
+        self.roles = np.asarray(roles, dtype=object)
+        self.lanes = np.asarray(lanes, dtype=object)
+        self.pick_weight = np.asarray(pick_weight, dtype=np.float64)
+        self.ban_weight = np.asarray(ban_weight, dtype=np.float64)
+        self.strength = np.asarray(strength, dtype=np.float64)
+        self.released = np.asarray(released, dtype=np.int64)
+        self.games = np.asarray(games, dtype=np.float64)
+        self.bans_per_game = np.asarray(bans_per_game, dtype=np.float64)
+        self.years = np.asarray(years, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df):
+        """From hero x tournament rows (mlbb_dataset_normalized.csv layout)"""
+        heroes = df.groupby("hero").agg(picks=("pick_total", "sum"), wins=("pick_wins", "sum"),
+                                        bans=("ban_count", "sum"), lane=("Lane", "first"),
+                                        role=("Role_Normalized", "first"),
+                                        released=("tournament_year", "min"))
+        shrunk = (heroes["wins"] + SHRINK_PICKS / 2) / (heroes["picks"] + SHRINK_PICKS)
+        tournaments = df.groupby("tournament_title").agg(picks=("pick_total", "sum"), bans=("ban_count", "sum"),
+                                                         year=("tournament_year", "first"))
+        games = tournaments["picks"] / PICKS_PER_GAME
+        return cls(
+            heroes.index, heroes["role"].fillna("Other"), heroes["lane"],
+            (heroes["picks"] + 1) / (heroes["picks"] + 1).sum(),
+            (heroes["bans"] + 1) / (heroes["bans"] + 1).sum(),
+            np.log(shrunk / (1 - shrunk)), heroes["released"],
+            games, (tournaments["bans"] / games).clip(0, MAX_BANS_PER_GAME), tournaments["year"],
+        )
+
+    @classmethod
+    def from_csv(cls, path=NORMALIZED_CSV):
+        return cls.from_frame(pd.read_csv(path))
+
+    def with_heroes(self, n, rng):
+        """Profile with `n` heroes: the real ones plus jittered clones"""
+        real = len(self.heroes)
+        if n <= real:
+            return self
+        source = rng.integers(0, real, size=n - real)
+        copy = np.arange(real, n)
+        names = np.array([f"{self.heroes[s]} #{c}" for s, c in zip(source, copy)], dtype=object)
+
+        def jitter(weight):
+            return weight[source] * rng.lognormal(0, CLONE_SIGMA, size=len(source))
+
+        return Profile(
+            np.concatenate([self.heroes, names]), np.concatenate([self.roles, self.roles[source]]),
+            np.concatenate([self.lanes, self.lanes[source]]),
+            np.concatenate([self.pick_weight, jitter(self.pick_weight)]),
+            np.concatenate([self.ban_weight, jitter(self.ban_weight)]),
+            np.concatenate([self.strength, self.strength[source] + rng.normal(0, 0.05, len(source))]),
+            np.concatenate([self.released, self.released[source]]),
+            self.games, self.bans_per_game, self.years,
+        )
+
+
+def _top(keys, k):
+    """Column indices of the k largest keys per row, largest first"""
+    idx = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(keys, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _simulate(profile, pool, games, bans_per_game, years, rng):
+    """Counts (picks, wins, bans) of shape (tournaments, pool width) for one batch"""
+    n_tournaments, width = pool.shape
+    # Heroes released after the tournament's year cannot be picked or banned
+    meta = np.where(profile.released[pool] <= years[:, None], rng.normal(0, META_SIGMA, size=pool.shape), -np.inf)
+    log_pick = np.log(profile.pick_weight[pool]) + meta
+    log_ban = np.log(profile.ban_weight[pool]) + meta + rng.normal(0, BAN_SIGMA, size=pool.shape)
+    strength = profile.strength[pool]
+
+    game_t = np.repeat(np.arange(n_tournaments), games)
+    rows = np.arange(len(game_t))[:, None]
+    picks = _top(log_pick[game_t] + rng.gumbel(size=(len(game_t), width)), PICKS_PER_GAME)
+    team_a, team_b = picks[:, 0::2], picks[:, 1::2]
+    edge = strength[game_t[:, None], team_a].sum(axis=1) - strength[game_t[:, None], team_b].sum(axis=1)
+    a_wins = rng.random(len(game_t)) < 1 / (1 + np.exp(-edge))
+    winners = np.where(a_wins[:, None], team_a, team_b)
+
+    ban_keys = log_ban[game_t] + rng.gumbel(size=(len(game_t), width))
+    ban_keys[rows, picks] = -np.inf
+    n_bans = min(MAX_BANS_PER_GAME, width - PICKS_PER_GAME)
+    bans = _top(ban_keys, n_bans)
+    rate = bans_per_game[game_t]
+    per_game = np.floor(rate) + (rng.random(len(game_t)) < rate - np.floor(rate))
+    banned = (np.arange(n_bans)[None, :] < per_game[:, None]) & np.isfinite(np.take_along_axis(ban_keys, bans, axis=1))
+
+    flat = game_t[:, None] * width
+    size = n_tournaments * width
+    counts = [np.bincount((flat + picks).ravel(), minlength=size),
+              np.bincount((flat + winners).ravel(), minlength=size),
+              np.bincount((flat + bans)[banned], minlength=size)]
+    return [c.reshape(n_tournaments, width) for c in counts]
+
+
+def generate(rows, heroes=None, seed=42, profile=None):
+    """DataFrame of at least `rows` synthetic rows (mlbb_dataset_normalized.csv layout)"""
+    rng = np.random.default_rng(seed)
+    profile = profile or Profile.from_csv()
+    real = len(profile.heroes)
+    profile = profile.with_heroes(heroes or real, rng)
+    n_heroes = len(profile.heroes)
+    width = min(n_heroes, real)         # heroes available per tournament
+    order = rng.permutation(n_heroes)
+
+    parts, total, tournament = [], 0, 0
+    while total < rows:
+        # Batch size from the real sizes: ~width * 0.55 rows and ~mean(games) games per tournament
+        n = int(np.clip((rows - total) / (0.5 * width) + 1, 1, BATCH_GAMES / profile.games.mean()))
+        sample = rng.integers(0, len(profile.games), size=n)
+        games = np.maximum(np.rint(profile.games[sample] * rng.lognormal(0, GAMES_SIGMA, n)), MIN_GAMES).astype(int)
+        if width == n_heroes:
+            pool = np.broadcast_to(np.arange(n_heroes), (n, width))
+        else:
+            pool = order[(rng.integers(0, n_heroes, size=n)[:, None] + np.arange(width)) % n_heroes]
+        picks, wins, bans = _simulate(profile, pool, games, profile.bans_per_game[sample],
+                                      profile.years[sample], rng)
+
+        t, slot = np.nonzero(picks)
+        hero = pool[t, slot]
+        ids = tournament + t
+        parts.append(pd.DataFrame({
+            "hero": profile.heroes[hero],
+            "pick_total": picks[t, slot],
+            "pick_wins": wins[t, slot],
+            "pick_losses": picks[t, slot] - wins[t, slot],
+            "ban_count": bans[t, slot],
+            "win_rate": np.round(wins[t, slot] / picks[t, slot] * 100, 2),
+            "tournament_year": profile.years[sample][t],
+            "tournament_id": ids,
+            "Lane": profile.lanes[hero],
+            "Role_Normalized": profile.roles[hero],
+        }))
+        total += len(t)
+        tournament += n
+
+    frame = pd.concat(parts, ignore_index=True)
+    # Whole tournaments up to the one that reaches `rows`
+    last = frame["tournament_id"].iloc[rows - 1]
+    frame = frame[frame["tournament_id"] <= last]
+    ids = frame.pop("tournament_id")
+    frame.insert(7, "tournament_title", "Synthetic Cup " + ids.astype(str).str.zfill(6))
+    frame.insert(8, "tournament_url", "https://liquipedia.net/mobilelegends/Synthetic/Cup_"
+                 + ids.astype(str) + "/Statistics")
+    return frame.reset_index(drop=True)
+
+
+def validate(frame):
+    """Invariant violations (empty list when the rows are consistent)"""
+    problems = []
+    if (frame["pick_wins"] + frame["pick_losses"] != frame["pick_total"]).any():
+        problems.append("pick_wins + pick_losses != pick_total")
+    if (frame[["pick_total", "pick_wins", "pick_losses", "ban_count"]] < 0).any(axis=None):
+        problems.append("negative counts")
+    totals = frame.groupby("tournament_title")[["pick_total", "pick_wins", "pick_losses"]].transform("sum")
+    games = totals["pick_total"] / PICKS_PER_GAME
+    if (frame["pick_total"] + frame["ban_count"] > games).any():
+        problems.append("hero picked / banned in more games than the tournament has")
+    if (totals["pick_wins"] != totals["pick_losses"]).any():
+        problems.append("tournament wins != losses")
+    if frame.duplicated(["tournament_title", "hero"]).any():
+        problems.append("hero listed twice in a tournament")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic hero x tournament data")
+    parser.add_argument("rows", type=float, help="minimum number of rows (1e6 works)")
+    parser.add_argument("--heroes", type=int, default=None, help="hero pool size (default: the real pool)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--profile", default=NORMALIZED_CSV, help="real rows to take the profile from")
+    parser.add_argument("--out", default="mlbb_synthetic.csv", help=".csv or .parquet")
+    args = parser.parse_args()
+
+    start = time.time()
+    frame = generate(int(args.rows), args.heroes, args.seed, Profile.from_csv(args.profile))
+    elapsed = time.time() - start
+    problems = validate(frame)
+    per_tournament = frame.groupby("tournament_title").size()
+    print(f"{len(frame)} rows, {per_tournament.size} tournaments ({per_tournament.mean():.0f} heroes each), "
+          f"{frame['hero'].nunique()} heroes in {elapsed:.1f}s")
+    print(frame["Role_Normalized"].value_counts(normalize=True).round(3).to_string())
+    if problems:
+        print("Invariant violations: " + "; ".join(problems))
+    if args.out.endswith(".parquet"):
+        frame.to_parquet(args.out, index=False)
+    else:
+        frame.to_csv(args.out, index=False)
+    print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
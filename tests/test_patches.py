@@ -0,0 +1,57 @@
+import csv
+
+import pandas as pd
+
+import patches
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_rows(path, counts):
+    """counts: {(tournament, hero): picks}; every pick is a win"""
+    rows = [{"hero": hero, "pick_total": picks, "pick_wins": picks, "pick_losses": 0, "ban_count": 1,
+             "win_rate": 100.0, "tournament_year": 2025, "tournament_title": title,
+             "tournament_url": "", "Lane": "Roam", "Role_Normalized": "Tank"}
+            for (title, hero), picks in counts.items()]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def picks(aggregates, patch):
+    stats = aggregates.patch_stats(patch)
+    return dict(zip(stats.heroes, stats.total_picks.tolist()))
+
+
+def test_build_aggregates_replaces_changed_tournaments(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_csv(patches.PATCHES_CSV, ["patch", "start_date"], [("1.0", "2025-01-01"), ("2.0", "2025-03-01")])
+    write_csv(patches.TOURNAMENT_DATES_CSV, ["tournament_title", "start_date", "end_date"],
+              [("Cup A", "2025-01-10", "2025-01-20"), ("Cup B", "2025-03-05", "2025-03-10")])
+    write_rows("rows.csv", {("Cup A", "tigreal"): 4, ("Cup A", "layla"): 2, ("Cup B", "tigreal"): 3})
+
+    aggregates, changed, _ = patches.build_aggregates("rows.csv")
+    assert changed == ["Cup A", "Cup B"]
+    assert picks(aggregates, "1.0") == {"tigreal": 4, "layla": 2}
+
+    # Unchanged data: nothing to do
+    assert patches.build_aggregates("rows.csv")[1] == []
+
+    # Cup A re-scraped with more games
+    write_rows("rows.csv", {("Cup A", "tigreal"): 6, ("Cup A", "layla"): 2, ("Cup B", "tigreal"): 3})
+    aggregates, changed, _ = patches.build_aggregates("rows.csv")
+    assert changed == ["Cup A"]
+    assert picks(aggregates, "1.0") == {"tigreal": 6, "layla": 2}
+    assert picks(aggregates, "2.0") == {"tigreal": 3, "layla": 0}
+
+    # Cup A re-dated into patch 2.0
+    write_csv(patches.TOURNAMENT_DATES_CSV, ["tournament_title", "start_date", "end_date"],
+              [("Cup A", "2025-03-02", "2025-03-04"), ("Cup B", "2025-03-05", "2025-03-10")])
+    aggregates, changed, _ = patches.build_aggregates("rows.csv")
+    assert changed == ["Cup A"]
+    assert picks(aggregates, "1.0") == {"tigreal": 0, "layla": 0}
+    assert picks(aggregates, "2.0") == {"tigreal": 9, "layla": 2}
+    assert patches.PatchAggregates.load().included["Cup A"][0] == "2.0"
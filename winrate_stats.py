@@ -0,0 +1,95 @@
+"""Win rate reliability statistics, vectorized over all heroes at once.
+
+A hero at 39/71 and one at 799/1581 have similar raw win rates but very
+different uncertainty. Every function here takes arrays of wins and games
+(one entry per hero) and returns arrays in percent, without Python loops.
+"""
+import numpy as np
+
+Z_95 = 1.959964
+
+
+def _as_arrays(wins, games):
+    return np.asarray(wins, dtype=np.float64), np.asarray(games, dtype=np.float64)
+
+
+def wilson_interval(wins, games, z=Z_95):
+    """Closed-form Wilson score interval; returns (lower, upper) in %
+
+    Heroes with no games get the uninformative interval (0, 100).
+    """
+    w, n = _as_arrays(wins, games)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = w / n
+        z2 = z * z
+        denom = 1 + z2 / n
+        centre = (p + z2 / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denom
+    lower = np.where(n > 0, centre - half, 0.0)
+    upper = np.where(n > 0, centre + half, 1.0)
+    return lower * 100, upper * 100
+
+
+def beta_prior(wins, games):
+    """Empirical-Bayes Beta prior (mean, strength) by the method of moments
+
+    The spread of observed win rates minus the expected binomial noise
+    gives the true between-hero variance; strength = pseudo-games.
+    """
+    w, n = _as_arrays(wins, games)
+    played = n > 0
+    if not played.any():
+        return 0.5, 0.0
+    mean = w[played].sum() / n[played].sum()
+    rates = w[played] / n[played]
+    noise = np.mean(mean * (1 - mean) / n[played])
+    true_var = rates.var() - noise
+    if true_var <= 0:
+        # Everything explained by sampling noise: shrink hard
+        return mean, float(n[played].max())
+    strength = max(mean * (1 - mean) / true_var - 1, 1.0)
+    return mean, strength
+
+
+def shrunk_win_rate(wins, games, prior=None):
+    """Posterior-mean win rate in %, pulled towards the pool average"""
+    w, n = _as_arrays(wins, games)
+    mean, strength = prior if prior is not None else beta_prior(w, n)
+    return (w + strength * mean) / (n + strength) * 100
+
+
+def bootstrap_interval(wins, games, draws=2000, alpha=0.05, seed=42):
+    """Parametric bootstrap CI in %, resampling a (heroes x draws) binomial array"""
+    w, n = _as_arrays(wins, games)
+    rng = np.random.default_rng(seed)
+    n_int = n.astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(n > 0, w / n, 0.0)
+        sims = rng.binomial(n_int[:, None], p[:, None], size=(len(n), draws)) / n[:, None]
+    lower, upper = np.quantile(sims, [alpha / 2, 1 - alpha / 2], axis=1)
+    lower = np.where(n > 0, lower, 0.0)
+    upper = np.where(n > 0, upper, 1.0)
+    return lower * 100, upper * 100
+
+
+def win_rate_intervals(wins, games, method="wilson", **kwargs):
+    """Dict of per-hero arrays: win_rate_lower, win_rate_upper, win_rate_shrunk"""
+    if method == "wilson":
+        lower, upper = wilson_interval(wins, games, **kwargs)
+    elif method == "bootstrap":
+        lower, upper = bootstrap_interval(wins, games, **kwargs)
+    else:
+        raise ValueError(f"Unknown interval method: {method}")
+    return {
+        "win_rate_lower": lower,
+        "win_rate_upper": upper,
+        "win_rate_shrunk": shrunk_win_rate(wins, games),
+    }
+
+
+def add_win_rate_intervals(df, method="wilson", **kwargs):
+    """Add win_rate_lower / win_rate_upper / win_rate_shrunk columns to an aggregated frame"""
+    for column, values in win_rate_intervals(df["total_wins"], df["total_picks"],
+                                             method=method, **kwargs).items():
+        df[column] = values.round(2)
+    return df